@@ -18,6 +18,8 @@ class ActionsController(QObject):
         self.config_manager = None
         # Cache widget references for instant access
         self.output_path_label = None
+        self.auto_run_checkbox = None
+        self.is_running = False  # Keeps run button disabled while a run is active
         self.setup_ui()
         self.connect_signals()
         # Cache widget references after UI setup
@@ -28,6 +30,10 @@ class ActionsController(QObject):
     def set_config_manager(self, config_manager):
         """Set config manager reference for settings dialog"""
         self.config_manager = config_manager
+        # Restore auto-run preference
+        if self.auto_run_checkbox:
+            auto_run = self.config_manager.get("auto_run_on_load", {}).get("enabled", False)
+            self.auto_run_checkbox.setChecked(auto_run)
     
     def setup_ui(self):
         """Setup the UI elements with icons"""
@@ -39,6 +45,11 @@ class ActionsController(QObject):
                 gear_icon = qta.icon('fa6s.gear', color='white')
                 settings_button.setIcon(gear_icon)
             
+            # Find the run history button
+            history_button = self.actions_widget.findChild(QWidget, "historyButton")
+            if history_button:
+                history_button.setIcon(qta.icon('fa6s.clock-rotate-left', color='white'))
+            
             # Find the run button
             run_button = self.actions_widget.findChild(QWidget, "runButton")
             if run_button:
@@ -64,6 +75,7 @@ class ActionsController(QObject):
         """Cache widget references for instant access - prevents repeated findChild calls"""
         if self.actions_widget:
             self.output_path_label = self.actions_widget.findChild(QWidget, "outputPathLabel")
+            self.auto_run_checkbox = self.actions_widget.findChild(QWidget, "autoRunCheckBox")
 
     def connect_signals(self):
         """Connect button signals to slots"""
@@ -73,6 +85,10 @@ class ActionsController(QObject):
             if settings_button:
                 settings_button.clicked.connect(self.on_settings_clicked)
             
+            history_button = self.actions_widget.findChild(QWidget, "historyButton")
+            if history_button:
+                history_button.clicked.connect(self.on_history_clicked)
+            
             run_button = self.actions_widget.findChild(QWidget, "runButton")
             if run_button:
                 run_button.clicked.connect(self.on_run_clicked)
@@ -85,6 +101,43 @@ class ActionsController(QObject):
             output_button = self.actions_widget.findChild(QWidget, "outputDestinationButton")
             if output_button:
                 output_button.clicked.connect(self.on_output_destination_clicked)
+            
+            # Connect auto-run toggle
+            auto_run_checkbox = self.actions_widget.findChild(QWidget, "autoRunCheckBox")
+            if auto_run_checkbox:
+                auto_run_checkbox.toggled.connect(self.on_auto_run_toggled)
+    
+    def on_auto_run_toggled(self, checked):
+        """Persist auto-run on load preference"""
+        if self.config_manager:
+            self.config_manager.set_nested("auto_run_on_load", "enabled", checked)
+            self.config_manager.save_config()
+        if checked and not self.output_path:
+            self.status_helper.show_status("Auto-run needs an output destination before loading files", self.status_helper.PRIORITY_HIGH)
+    
+    def is_auto_run_enabled(self):
+        """Check if files should start processing while they are still loading"""
+        return bool(self.auto_run_checkbox and self.auto_run_checkbox.isChecked())
+    
+    def on_history_clicked(self):
+        """Open the run history view"""
+        try:
+            config_manager = self.config_manager or self.get_config_manager()
+            if not config_manager:
+                self.status_helper.show_error("Configuration manager not available")
+                return
+            
+            from App.helpers.run_history import RunHistory
+            history = RunHistory.from_config(config_manager)
+            if not history:
+                self.status_helper.show_status("Run history is disabled in the configuration", self.status_helper.PRIORITY_NORMAL)
+                return
+            
+            from App.gui.dialogs.run_history_dialog import RunHistoryDialog
+            RunHistoryDialog(history, self.actions_widget).exec()
+        except Exception as e:
+            print(f"Error opening run history: {e}")
+            self.status_helper.show_error(f"Run history error: {str(e)}")
     
     def on_settings_clicked(self):
         """Handle settings button click"""
@@ -254,6 +307,7 @@ class ActionsController(QObject):
         self.output_destination_changed.emit(path)    
     def set_running_state(self, is_running: bool):
         """Set the state of buttons based on running status"""
+        self.is_running = is_running
         if self.actions_widget:
             run_button = self.actions_widget.findChild(QWidget, "runButton")
             stop_button = self.actions_widget.findChild(QWidget, "stopButton")
@@ -270,6 +324,9 @@ class ActionsController(QObject):
     
     def set_ready_state(self, has_files: bool):
         """Set button state when ready for processing"""
+        # Files still arriving during an auto-run must not re-enable the run button
+        if self.is_running:
+            return
         if self.actions_widget:
             run_button = self.actions_widget.findChild(QWidget, "runButton")
             stop_button = self.actions_widget.findChild(QWidget, "stopButton")
@@ -286,6 +343,7 @@ class ActionsController(QObject):
     
     def set_processing_completed_state(self):
         """Set button state when processing is completed - both buttons disabled"""
+        self.is_running = False
         if self.actions_widget:
             run_button = self.actions_widget.findChild(QWidget, "runButton")
             stop_button = self.actions_widget.findChild(QWidget, "stopButton")
@@ -1,12 +1,18 @@
 from PySide6.QtWidgets import QWidget, QLabel, QFileDialog, QPushButton, QStackedWidget
 from PySide6.QtCore import QObject, Signal, Qt, QTimer
-from PySide6.QtGui import QDragEnterEvent, QDropEvent, QDragMoveEvent, QDragLeaveEvent
+from PySide6.QtGui import QDragEnterEvent, QDropEvent, QDragMoveEvent, QDragLeaveEvent, QShortcut, QKeySequence
 import qtawesome as qta
 import os
+from App.helpers.url_source import extract_urls, expand_url_lists, is_url_list_file
+from App.helpers import tracing
 
 class DndHandler(QObject):
     # Signal emitted when files are loaded
     files_loaded = Signal(list)
+    # Signals for auto-run on load (processing overlaps validation)
+    loading_started = Signal(list)   # candidate file paths
+    file_validated = Signal(str)     # file passed validation
+    loading_finished = Signal()      # no more files will be validated
     
     def __init__(self, dnd_widget: QWidget, workspace_widget: QWidget, open_files_btn: QPushButton, open_folder_btn: QPushButton, status_helper, work_handler=None):
         super().__init__()
@@ -91,6 +97,10 @@ class DndHandler(QObject):
         """Setup button connections"""
         open_files_btn.clicked.connect(self.open_files)
         open_folder_btn.clicked.connect(self.open_folder)
+        
+        # Paste a list of image URLs while the drop area is shown
+        self.paste_shortcut = QShortcut(QKeySequence.Paste, self.dnd_widget)
+        self.paste_shortcut.activated.connect(self.paste_urls)
     
     def setup_drag_drop(self):
         """Setup drag and drop functionality"""
@@ -167,7 +177,7 @@ class DndHandler(QObject):
 
     def new_drag_enter(self, event):
         """Handle drag enter event"""
-        if event.mimeData().hasUrls():
+        if event.mimeData().hasUrls() or event.mimeData().hasText():
             event.setDropAction(Qt.CopyAction)
             event.accept()
             self.on_drag_enter()
@@ -176,7 +186,7 @@ class DndHandler(QObject):
 
     def new_drag_move(self, event):
         """Handle drag move event"""
-        if event.mimeData().hasUrls():
+        if event.mimeData().hasUrls() or event.mimeData().hasText():
             event.setDropAction(Qt.CopyAction)
             event.accept()
         else:
@@ -188,24 +198,35 @@ class DndHandler(QObject):
 
     def new_drop(self, event):
         """Handle drop event - optimized for speed"""
-        if event.mimeData().hasUrls():
+        if event.mimeData().hasUrls() or event.mimeData().hasText():
             files = []
             urls = event.mimeData().urls()
             
+            # Dragged text (e.g. a selection from a spreadsheet) may hold image URLs
+            if not urls:
+                files.extend(extract_urls(event.mimeData().text()))
+            
             # Quick path collection without validation
             for url in urls:
+                if url.scheme() in ("http", "https"):
+                    # Image dragged from a browser - process it by URL
+                    files.append(url.toString())
+                    continue
                 file_path = url.toLocalFile()
-                if os.path.isfile(file_path):
+                if os.path.isfile(file_path) and is_url_list_file(file_path):
+                    files.extend(expand_url_lists([file_path]))
+                elif os.path.isfile(file_path):
                     files.append(file_path)
                 elif os.path.isdir(file_path):
                     # Quick folder scan - limit files for responsiveness
                     folder_files = []
                     try:
-                        for root, dirs, filenames in os.walk(file_path):
-                            for filename in filenames:
-                                folder_files.append(os.path.join(root, filename))
-                            if len(folder_files) > 500:  # Limit for drag-drop responsiveness
-                                break
+                        with tracing.span("folder_scan", folder=file_path):
+                            for root, dirs, filenames in os.walk(file_path):
+                                for filename in filenames:
+                                    folder_files.append(os.path.join(root, filename))
+                                if len(folder_files) > 500:  # Limit for drag-drop responsiveness
+                                    break
                     except:
                         pass
                     files.extend(folder_files)
@@ -246,7 +267,7 @@ class DndHandler(QObject):
         """Open file dialog to select multiple image files - optimized for speed"""
         # Create image file filter for common formats only
         image_filter = (
-            "Image Files (*.jpg *.jpeg *.png *.tiff *.tif *.webp);;All Files (*.*)"
+            "Image Files (*.jpg *.jpeg *.png *.tiff *.tif *.webp);;URL Lists (*.txt *.csv);;All Files (*.*)"
         )
         
         files, _ = QFileDialog.getOpenFileNames(
@@ -258,8 +279,17 @@ class DndHandler(QObject):
         if files:
             # Update last directory immediately
             self.last_directory = os.path.dirname(files[0])
-            # Cache files immediately without validation for speed
-            self._cache_files_immediately(files)
+            # Cache files immediately without validation for speed (URL lists expand to their URLs)
+            self._cache_files_immediately(expand_url_lists(files))
+
+    def paste_urls(self):
+        """Load image URLs pasted from the clipboard"""
+        from PySide6.QtWidgets import QApplication
+        urls = extract_urls(QApplication.clipboard().text())
+        if urls:
+            self._cache_files_immediately(urls)
+        else:
+            self.status_helper.show_status("No image URLs found in clipboard", self.status_helper.PRIORITY_NORMAL)
 
     def open_folder(self):
         """Open folder dialog to select a folder - optimized for speed"""
@@ -289,12 +319,13 @@ class DndHandler(QObject):
         files = []
         try:
             # Quick scan - only get file paths without validation
-            for root, dirs, filenames in os.walk(folder):
-                for filename in filenames:
-                    files.append(os.path.join(root, filename))
-                # Limit initial scan to prevent freeze
-                if len(files) > 1000:  # Stop at 1000 files for responsiveness
-                    break
+            with tracing.span("folder_scan", folder=folder):
+                for root, dirs, filenames in os.walk(folder):
+                    for filename in filenames:
+                        files.append(os.path.join(root, filename))
+                    # Limit initial scan to prevent freeze
+                    if len(files) > 1000:  # Stop at 1000 files for responsiveness
+                        break
         except Exception as e:
             print(f"Error scanning folder: {e}")
             self.status_helper.show_error("Error scanning folder")
@@ -334,10 +365,16 @@ class DndHandler(QObject):
         self.progress_dialog.cancel_requested.connect(self.cancel_file_loading)
         
         # Create and start worker thread
-        self.file_loader_worker = FileLoaderWorker(files)
+        detect_duplicates = self.work_handler.config_manager.get("duplicates", {}).get("enabled", True) if self.work_handler else False
+        self.file_loader_worker = FileLoaderWorker(files, detect_duplicates)
         self.file_loader_worker.progress_updated.connect(self.on_progress_updated)
         self.file_loader_worker.loading_completed.connect(self.on_loading_completed)
         self.file_loader_worker.loading_cancelled.connect(self.on_loading_cancelled)
+        self.file_loader_worker.file_processed.connect(self.on_file_validated)
+        self.file_loader_worker.duplicates_found.connect(self.on_duplicates_found)
+        
+        # Let auto-run prepare its processor before the first file is validated
+        self.loading_started.emit(files)
         
         # Show progress dialog and start worker immediately
         self.progress_dialog.show()
@@ -368,6 +405,16 @@ class DndHandler(QObject):
         """Legacy method - now just returns True for compatibility"""
         return True
     
+    def on_file_validated(self, file_path, is_valid):
+        """Forward each valid file as soon as it passes validation"""
+        if is_valid:
+            self.file_validated.emit(file_path)
+    
+    def on_duplicates_found(self, groups):
+        """Pass exact duplicate groups to the work handler before the files are loaded"""
+        if self.work_handler:
+            self.work_handler.set_duplicate_groups(groups)
+    
     def on_progress_updated(self, progress, status):
         """Handle progress updates from worker thread"""
         if self.progress_dialog:
@@ -375,6 +422,8 @@ class DndHandler(QObject):
             self.progress_dialog.set_status(status)
     def on_loading_completed(self, valid_files):
         """Handle completion of file validation - start widget creation"""
+        self.loading_finished.emit()
+        
         if self.progress_dialog:
             # Don't close progress dialog yet - it will be used for widget creation
             self.progress_dialog.set_stage("widgets", 0)
@@ -436,6 +485,8 @@ class DndHandler(QObject):
     
     def on_loading_cancelled(self):
         """Handle cancellation of file loading"""
+        self.loading_finished.emit()
+        
         if self.progress_dialog:
             self.progress_dialog.close()
             self.progress_dialog = None
@@ -4,6 +4,9 @@ from PySide6.QtGui import QPixmap
 import qtawesome as qta
 from PIL import Image, ImageQt
 import os
+from App.helpers.input_cache import get_input_cache
+from App.helpers.url_source import is_url, get_url_filename, get_url_host
+from App.helpers import tracing
 
 class LoadedItemWidget(QWidget):
     """Widget representing a single loaded file item"""
@@ -73,6 +76,12 @@ class LoadedItemWidget(QWidget):
         text_layout.addWidget(self.file_size_label)
         text_layout.addWidget(self.file_path_label)
         
+        # Near-duplicate group marker (hidden until analysis finds a match)
+        self.similar_label = QLabel()
+        self.similar_label.setObjectName("similar_label")
+        self.similar_label.setVisible(False)
+        text_layout.addWidget(self.similar_label)
+        
         # Add progress bar (initially hidden)
         self.progress_bar = QProgressBar()
         self.progress_bar.setObjectName("itemProgressBar")
@@ -107,6 +116,9 @@ class LoadedItemWidget(QWidget):
     
     def populate_data(self):
         """Populate the widget with file data"""
+        if is_url(self.file_path):
+            self.populate_url_data()
+            return
         if not os.path.exists(self.file_path):
             return
               # Get file info
@@ -132,6 +144,18 @@ class LoadedItemWidget(QWidget):
         if self.file_size_label:
             self.file_size_label.setText(file_size)
     
+    def populate_url_data(self):
+        """Populate the widget for a hosted image URL (nothing is downloaded for display)"""
+        if self.file_icon_label:
+            self.file_icon_label.setPixmap(qta.icon('fa6s.link', color='gray').pixmap(24, 24))
+        if self.file_name_label:
+            self.file_name_label.setText(self.truncate_filename(get_url_filename(self.file_path), 40))
+        if self.file_path_label:
+            self.file_path_label.setText(self.truncate_path(get_url_host(self.file_path), 50))
+            self.file_path_label.setToolTip(self.file_path)
+        if self.file_size_label:
+            self.file_size_label.setText("URL")
+    
     def get_file_size(self):
         """Get formatted file size"""
         try:
@@ -159,27 +183,33 @@ class LoadedItemWidget(QWidget):
                 icon = qta.icon('fa6s.file', color='gray')
                 return icon.pixmap(24, 24)
             
-            # Try to open and create thumbnail for image files
-            with Image.open(self.file_path) as img:
-                # Convert to RGB if necessary (for transparency handling)
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    # Create white background for transparent images
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    if img.mode == 'P':
-                        img = img.convert('RGBA')
-                    background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
-                    img = background
-                elif img.mode != 'RGB':
-                    img = img.convert('RGB')
+            # Try to open and create thumbnail for image files (reuses bytes read during validation)
+            with tracing.span("thumbnail", file=self.file_path):
+                img = get_input_cache().open_image(self.file_path)
+                if img is None:
+                    # Moved or deleted since loading
+                    icon = qta.icon('fa6s.file', color='gray')
+                    return icon.pixmap(24, 24)
+                with img:
+                    # Convert to RGB if necessary (for transparency handling)
+                    if img.mode in ('RGBA', 'LA', 'P'):
+                        # Create white background for transparent images
+                        background = Image.new('RGB', img.size, (255, 255, 255))
+                        if img.mode == 'P':
+                            img = img.convert('RGBA')
+                        background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
+                        img = background
+                    elif img.mode != 'RGB':
+                        img = img.convert('RGB')
                 
-                # Create thumbnail maintaining aspect ratio
-                img.thumbnail((50, 50), Image.Resampling.LANCZOS)
+                    # Create thumbnail maintaining aspect ratio
+                    img.thumbnail((50, 50), Image.Resampling.LANCZOS)
                 
-                # Convert PIL image to QPixmap
-                qt_image = ImageQt.ImageQt(img)
-                pixmap = QPixmap.fromImage(qt_image)
+                    # Convert PIL image to QPixmap
+                    qt_image = ImageQt.ImageQt(img)
+                    pixmap = QPixmap.fromImage(qt_image)
                 
-                return pixmap
+                    return pixmap
                 
         except Exception as e:
             # If thumbnail generation fails, return default file icon
@@ -221,12 +251,24 @@ class LoadedItemWidget(QWidget):
         """Handle close button click"""
         self.remove_requested.emit(self.file_path)
     
+    def set_similar_group(self, group_number, is_kept):
+        """Mark the item as part of a near-duplicate group"""
+        status = "kept" if is_kept else "can be excluded"
+        self.similar_label.setText(f"Similar group {group_number} ({status})")
+        self.similar_label.setVisible(True)
+    
+    def clear_similar_group(self):
+        """Remove the near-duplicate group marker"""
+        self.similar_label.setVisible(False)
+    
     def set_processing_state(self, state):
         """Set the processing state of the widget
         Args:
             state (str): 'idle', 'processing', 'success', 'error'
         """
         # Update frame property for CSS styling
+        if state in ("idle", "processing"):
+            self.item_frame.setToolTip("")  # Clear the reason of an earlier failure
         if state == "idle":
             self.item_frame.setProperty("processingState", "")
             self.progress_bar.setVisible(False)
@@ -247,6 +289,10 @@ class LoadedItemWidget(QWidget):
         self.item_frame.style().unpolish(self.item_frame)
         self.item_frame.style().polish(self.item_frame)
     
+    def set_error_message(self, message):
+        """Show why processing failed as the item's tooltip"""
+        self.item_frame.setToolTip(message)
+    
     def update_progress(self, value):
         """Update progress bar value
         Args:
@@ -22,8 +22,31 @@ class MainController(QMainWindow):
         
         # Set status helper reference in ui helper for error reporting
         self.ui_helper.set_status_helper(self.status_helper)
+
+        # Apply memory budget for the shared input cache (validation, thumbnails and upload)
+        from App.helpers.input_cache import get_input_cache
+        get_input_cache().configure(self.config_manager.get("input_cache", {}))
+        
+        # Pipeline spans for a Chrome trace timeline (no-op unless PIKSELCAT_TRACE or config enables it)
+        from App.helpers import tracing
+        tracing.configure(self.config_manager)
+        # Per-subsystem thread profiles (no-op unless PIKSELCAT_PROFILE or config selects subsystems)
+        from App.helpers import profiling
+        profiling.configure(self.config_manager)
+        # Event-loop lag monitor with stall stack dumps (None unless PIKSELCAT_LAG_MONITOR or config enables it)
+        from App.helpers.lag_monitor import LagMonitor
+        self.lag_monitor = LagMonitor.from_config(self.config_manager, self)
           # Controllers for managing status updates
         self.dnd_handler = None
+        self.speculative_worker = None
+        self.retired_speculative_workers = []  # Cancelled workers kept alive until their thread ends
+        self.retired_processing_workers = []  # Finished processors kept alive until run() has returned
+        self.streaming_load = False  # the current load feeds an auto-run processor
+        
+        # Speculative preparation starts once the user has been idle for a moment
+        self.speculative_timer = QTimer(self)
+        self.speculative_timer.setSingleShot(True)
+        self.speculative_timer.timeout.connect(self.start_speculative_prep)
         self.work_handler = None
         self.actions_controller = None
         
@@ -137,6 +160,8 @@ class MainController(QMainWindow):
                     from App.controller.statistics import StatisticsController
                     self.statistics_controller = StatisticsController(self.config_manager)
                     self.statistics_controller.setup_ui_connections(stats_widget)
+                    if self.lag_monitor:
+                        self.statistics_controller.watch_lag(self.lag_monitor)
             
             # Load workspace widget using UI helper
             if workspace_container:
@@ -193,6 +218,15 @@ class MainController(QMainWindow):
                 # Connect work handler signals if needed
                 self.work_handler.files_cleared.connect(lambda: self.dnd_handler.files_loaded.emit([]))
                 
+                # Auto-run on load: feed validated files straight into the processor
+                self.dnd_handler.loading_started.connect(self.on_file_loading_started)
+                self.dnd_handler.file_validated.connect(self.on_file_validated)
+                self.dnd_handler.loading_finished.connect(self.on_file_loading_finished)
+                
+                # Prepare loaded files in the background while output and action are being chosen
+                self.dnd_handler.files_loaded.connect(self.schedule_speculative_prep)
+                self.work_handler.action_changed.connect(self.schedule_speculative_prep)
+                
                 self.status_helper.show_ready("Drag & drop ready")
             else:
                 print("Error: Could not find DnD buttons")
@@ -241,22 +275,22 @@ class MainController(QMainWindow):
                 self.status_helper.show_error("No output destination selected")
                 return
             
+            # Take over whatever was prepared while idle
+            prepared = self.take_speculative_batch()
+            
             # Create and start the processor worker
             from App.helpers.pixelcut_processor import PixelcutProcessorWorker
             self.processing_worker = PixelcutProcessorWorker(
                 self.config_manager, 
                 files, 
                 selected_action, 
-                output_path
+                output_path,
+                prepared=prepared,
+                duplicate_groups=self.work_handler.get_duplicate_groups()
             )
             
             # Connect signals
-            self.processing_worker.file_processing_started.connect(self.on_file_processing_started)
-            self.processing_worker.file_processed.connect(self.on_file_processed)
-            self.processing_worker.progress_updated.connect(self.on_progress_updated)
-            self.processing_worker.processing_completed.connect(self.on_processing_completed)
-            self.processing_worker.processing_cancelled.connect(self.on_processing_cancelled)
-            self.processing_worker.error_occurred.connect(self.on_processing_error)
+            self.connect_processing_worker(self.processing_worker)
             
             # Set all file widgets to processing state - file_widgets is a list
             for widget in file_widgets:
@@ -280,6 +314,164 @@ class MainController(QMainWindow):
             import traceback
             print(f"Full traceback: {traceback.format_exc()}")
             
+    def on_cutouts_found(self, cutout_count, total_count):
+        """Ask whether to skip files that already have a transparent background (the processor waits for the answer)"""
+        worker = getattr(self, 'processing_worker', None)
+        if not worker:
+            return
+        from PySide6.QtWidgets import QMessageBox
+        answer = QMessageBox.question(
+            self,
+            "Already transparent",
+            f"{cutout_count} of {total_count} files already have a transparent background.\n\n"
+            f"Skip them? (Yes = skip, No = process them anyway)",
+            QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel,
+            QMessageBox.Yes
+        )
+        if answer == QMessageBox.Cancel:
+            worker.resolve_cutouts(None)
+        else:
+            worker.resolve_cutouts(answer == QMessageBox.Yes)
+    
+    def connect_processing_worker(self, worker):
+        """Connect processor worker signals to the main controller"""
+        worker.file_processing_started.connect(self.on_file_processing_started)
+        worker.file_processed.connect(self.on_file_processed)
+        worker.progress_updated.connect(self.on_progress_updated)
+        worker.processing_completed.connect(self.on_processing_completed)
+        worker.processing_cancelled.connect(self.on_processing_cancelled)
+        worker.error_occurred.connect(self.on_processing_error)
+        worker.preflight_completed.connect(self.on_preflight_completed)
+        worker.file_progress.connect(self.on_file_progress)
+        worker.result_rejected.connect(self.on_result_rejected)
+        worker.cutouts_found.connect(self.on_cutouts_found)
+        
+        # Live performance panel polls the worker's metrics until the thread ends
+        if getattr(self, 'statistics_controller', None):
+            self.statistics_controller.watch_run(worker.metrics)
+            worker.finished.connect(self.statistics_controller.stop_watching_run)
+    
+    def schedule_speculative_prep(self, *args):
+        """Restart speculative preparation after the loaded set or action changes"""
+        self.cancel_speculative_prep()
+        settings = self.config_manager.get("speculative_prep", {})
+        if settings.get("enabled", True):
+            self.speculative_timer.start(settings.get("idle_delay_ms", 1500))
+    
+    def start_speculative_prep(self):
+        """Start idle-time hashing, preflight, pre-transcoding and connection warm-up"""
+        try:
+            if getattr(self, 'processing_worker', None) or not self.work_handler:
+                return
+            files = self.work_handler.get_loaded_files()
+            action = self.work_handler.get_selected_action()
+            if not files or not action:
+                return
+            
+            from App.helpers.speculative_worker import SpeculativePrepWorker
+            from PySide6.QtCore import QThread
+            self.speculative_worker = SpeculativePrepWorker(self.config_manager, files, action)
+            self.speculative_worker.preparation_completed.connect(self.on_speculative_prep_completed)
+            self.speculative_worker.start(QThread.LowestPriority)
+        except Exception as e:
+            print(f"Failed to start speculative preparation: {e}")
+    
+    def on_speculative_prep_completed(self, summary):
+        """Show what idle-time preparation has done ahead of Run"""
+        try:
+            self.status_helper.show_status(summary, self.status_helper.PRIORITY_LOW)
+        except Exception as e:
+            print(f"Error showing speculative preparation summary: {e}")
+    
+    def cancel_speculative_prep(self):
+        """Cancel speculative preparation and discard its results"""
+        self.speculative_timer.stop()
+        worker = self.take_speculative_worker()
+        if worker:
+            worker.batch.cleanup()
+    
+    def take_speculative_batch(self):
+        """Stop speculative preparation and return its results for the processor"""
+        worker = self.take_speculative_worker()
+        return worker.batch if worker else None
+    
+    def take_speculative_worker(self):
+        """Detach the current speculative worker, cancelling it if still running"""
+        self.speculative_timer.stop()
+        worker = self.speculative_worker
+        self.speculative_worker = None
+        if worker and worker.isRunning():
+            worker.cancel()
+            self.retired_speculative_workers.append(worker)
+            worker.finished.connect(lambda: self.retired_speculative_workers.remove(worker))
+        return worker
+    
+    def release_processing_worker(self):
+        """Drop the processing worker, keeping it referenced until its thread has ended"""
+        worker = getattr(self, 'processing_worker', None)
+        self.processing_worker = None
+        if worker and worker.isRunning():
+            self.retired_processing_workers.append(worker)
+            worker.finished.connect(lambda: self.retired_processing_workers.remove(worker))
+    
+    def on_file_loading_started(self, candidate_files):
+        """Start a streaming processor when auto-run on load is enabled"""
+        try:
+            self.streaming_load = False
+            self.cancel_speculative_prep()
+            if self.work_handler:
+                self.work_handler.set_duplicates_applied(True)
+            if not self.actions_controller or not self.actions_controller.is_auto_run_enabled():
+                return
+            if getattr(self, 'processing_worker', None) and self.processing_worker.isRunning():
+                # A running processor's input may already be closed - these files wait for the next Run
+                self.status_helper.show_status("Auto-run busy: new files will be processed on the next Run", self.status_helper.PRIORITY_HIGH)
+                return
+            
+            output_path = self.actions_controller.get_output_destination()
+            if not output_path:
+                self.status_helper.show_status("Auto-run skipped: select an output destination first", self.status_helper.PRIORITY_HIGH)
+                return
+            
+            selected_action = self.work_handler.get_selected_action() if self.work_handler else None
+            api_key = self.config_manager.get("api_headers", {}).get("X-API-KEY", "").strip()
+            if not selected_action or not api_key:
+                return
+            
+            from App.helpers.pixelcut_processor import PixelcutProcessorWorker
+            self.processing_worker = PixelcutProcessorWorker(
+                self.config_manager,
+                [],
+                selected_action,
+                output_path,
+                streaming=True,
+                planned_files=candidate_files
+            )
+            self.connect_processing_worker(self.processing_worker)
+            self.processing_worker.start()
+            self.streaming_load = True
+            if self.work_handler:
+                # Duplicates found while loading are not deduplicated by the streaming run
+                self.work_handler.set_duplicates_applied(False)
+            
+            self.actions_controller.set_running_state(True)
+            self.status_helper.show_status(f"Auto-run: {selected_action} starts as files are validated...", self.status_helper.PRIORITY_NORMAL)
+        except Exception as e:
+            print(f"Failed to start auto-run processing: {e}")
+    
+    def on_file_validated(self, file_path):
+        """Queue a freshly validated file into the streaming processor"""
+        worker = getattr(self, 'processing_worker', None)
+        if self.streaming_load and worker and worker.streaming and not worker.add_file(file_path):
+            print(f"Auto-run input already closed, not queued: {file_path}")
+    
+    def on_file_loading_finished(self):
+        """Tell the streaming processor that loading has ended"""
+        worker = getattr(self, 'processing_worker', None)
+        if self.streaming_load and worker and worker.streaming:
+            worker.finish_input()
+        self.streaming_load = False
+    
     def stop_processing(self):
         """Stop the current processing workflow"""
         try:
@@ -305,33 +497,48 @@ class MainController(QMainWindow):
     def on_file_processing_started(self, file_path):
         """Handle when a file starts processing"""
         try:
-            if self.work_handler and hasattr(self.work_handler, 'file_widgets'):
-                # Find widget by file path since file_widgets is a list
-                for widget in self.work_handler.file_widgets:
-                    if widget.get_file_path() == file_path:
-                        widget.set_processing_state("processing")
-                        print(f"Started processing: {file_path}")
-                        break
+            if self.work_handler:
+                # Widget may not exist yet during auto-run - work handler keeps the state until it does
+                self.work_handler.set_file_state(file_path, "processing")
+                print(f"Started processing: {file_path}")
         except Exception as e:
             print(f"Error updating file processing state: {e}")
     
     def on_file_processed(self, input_file, output_file, success):
         """Handle when a file is processed"""
         try:
-            if self.work_handler and hasattr(self.work_handler, 'file_widgets'):
-                # Find widget by file path since file_widgets is a list
-                for widget in self.work_handler.file_widgets:
-                    if widget.get_file_path() == input_file:
-                        if success:
-                            widget.set_processing_state("success")
-                            print(f"Successfully processed: {input_file} -> {output_file}")
-                        else:
-                            widget.set_processing_state("error")
-                            print(f"Failed to process: {input_file}")
-                        break
+            if self.work_handler:
+                if success:
+                    self.work_handler.set_file_state(input_file, "success")
+                    print(f"Successfully processed: {input_file} -> {output_file}")
+                else:
+                    self.work_handler.set_file_state(input_file, "error")
+                    print(f"Failed to process: {input_file}")
         except Exception as e:
             print(f"Error updating file processed state: {e}")
     
+    def on_file_progress(self, file_path, percent):
+        """Show upload/download progress of one file on its item widget"""
+        if self.work_handler:
+            self.work_handler.set_file_progress(file_path, percent)
+    
+    def on_result_rejected(self, file_path, reason, quarantine_path):
+        """Show why a file's result failed output QA, and where it was kept, on its item widget"""
+        if self.work_handler:
+            message = f"Result rejected: {reason}"
+            if quarantine_path:
+                message += f"\nRejected result kept as {quarantine_path}"
+            self.work_handler.set_file_error(file_path, message)
+    
+    def on_preflight_completed(self, ok_count, fixed_count, rejected_count, summary):
+        """Handle preflight summary before uploads start"""
+        try:
+            print(summary)
+            priority = self.status_helper.PRIORITY_HIGH if rejected_count else self.status_helper.PRIORITY_NORMAL
+            self.status_helper.show_status(summary, priority)
+        except Exception as e:
+            print(f"Error showing preflight summary: {e}")
+    
     def on_progress_updated(self, progress, message):
         """Handle progress updates"""
         try:
@@ -351,13 +558,16 @@ class MainController(QMainWindow):
             else:
                 self.status_helper.show_warning(message)
             
+            # The finished run is in the history now - pick it up in the batch warning's burn rate
+            if self.work_handler:
+                self.work_handler.refresh_burn_rate()
+            
             # Set completed state - both buttons disabled until new files loaded
             if hasattr(self.actions_controller, 'set_processing_completed_state'):
                 self.actions_controller.set_processing_completed_state()
             
             # Clean up worker
-            if hasattr(self, 'processing_worker'):
-                self.processing_worker = None
+            self.release_processing_worker()
         except Exception as e:
             print(f"Error handling processing completion: {e}")
     
@@ -371,8 +581,7 @@ class MainController(QMainWindow):
                 self.actions_controller.set_processing_completed_state()
             
             # Clean up worker
-            if hasattr(self, 'processing_worker'):
-                self.processing_worker = None
+            self.release_processing_worker()
         except Exception as e:
             print(f"Error handling processing cancellation: {e}")
     
@@ -384,9 +593,10 @@ class MainController(QMainWindow):
             # Update actions controller
             if hasattr(self.actions_controller, 'set_processing_state'):
                 self.actions_controller.set_processing_state(False)
+            elif hasattr(self.actions_controller, 'set_processing_completed_state'):
+                self.actions_controller.set_processing_completed_state()
             
             # Clean up worker
-            if hasattr(self, 'processing_worker'):
-                self.processing_worker = None
+            self.release_processing_worker()
         except Exception as e:
             print(f"Error handling processing error: {e}")
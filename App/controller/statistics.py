@@ -4,6 +4,8 @@ import json
 import hashlib
 import json
 import hashlib
+from App.helpers.action_registry import ActionRegistry
+from App.helpers.credit_forecast import CreditForecast
 
 class StatisticsController(QObject):
     credits_updated = Signal(dict)
@@ -18,6 +20,19 @@ class StatisticsController(QObject):
         self.refresh_timer = QTimer()
         self.refresh_timer.timeout.connect(self.check_for_updates)
         self.refresh_timer.start(2000)  # Reduced from 5000 to 2000ms
+        
+        # Performance panel polls the running processor's metrics instead of taking a signal per event
+        self.run_metrics = None
+        self.performance_timer = QTimer()
+        self.performance_timer.timeout.connect(self.update_performance_display)
+        
+        # Depletion forecast from the balance/run time series in the run history database
+        self.credit_forecast = None
+        
+        # Debug panel for the GUI event-loop lag monitor (hidden unless the monitor is enabled)
+        self.lag_monitor = None
+        self.lag_timer = QTimer()
+        self.lag_timer.timeout.connect(self.update_lag_display)
     
     def get_credits_info(self):
         """Get formatted credits information"""
@@ -169,7 +184,26 @@ class StatisticsController(QObject):
     def update_credits_from_config(self):
         """Update credits info and emit signal"""
         credits_info = self.get_credits_info()
-        self.credits_updated.emit(credits_info)    
+        credits_info["forecast_text"] = self._get_forecast_text(credits_info)
+        self.credits_updated.emit(credits_info)
+    
+    def _get_forecast_text(self, credits_info):
+        """Record the current balance and format the depletion forecast"""
+        try:
+            if not self.credit_forecast:
+                self.credit_forecast = CreditForecast.from_config(self.config_manager)
+                if not self.credit_forecast:
+                    return ""
+            if credits_info["total_credits"] > 0:
+                self.credit_forecast.record_balance(credits_info["credits_remaining"], credits_info["total_credits"])
+            
+            registry = ActionRegistry(self.config_manager)
+            costs = {name: registry.get_cost(name) for name in registry.names()}
+            forecast = self.credit_forecast.forecast(credits_info["credits_remaining"], credits_info["days_until_expiry"], costs)
+            return CreditForecast.format_forecast(forecast)
+        except Exception as e:
+            print(f"Error forecasting credits: {e}")
+            return ""    
     def setup_ui_connections(self, ui_widget):
         """Setup connections between controller and UI elements"""
         self.ui_widget = ui_widget
@@ -219,6 +253,10 @@ class StatisticsController(QObject):
             f"{credits_remaining} remaining, {credits_used} used of {total_credits} total\n"
             f"Period started: {period_start_text}"
         )
+        if hasattr(self.ui_widget, 'forecastDetailLabel'):
+            forecast_text = credits_info.get("forecast_text", "")
+            self.ui_widget.forecastDetailLabel.setText(forecast_text)
+            self.ui_widget.forecastDetailLabel.setVisible(bool(forecast_text))
           # Update expiry label and progress bar
         days_until_expiry = credits_info["days_until_expiry"]
         grace_days_until_expiry = credits_info.get("grace_days_until_expiry", 0)
@@ -313,6 +351,45 @@ class StatisticsController(QObject):
         self.last_data_hash = None
         self.update_credits_from_config()
     
+    def watch_run(self, run_metrics, interval_ms=1000):
+        """Start showing live metrics of a processing run"""
+        self.run_metrics = run_metrics
+        self.update_performance_display()
+        self.performance_timer.start(interval_ms)
+    
+    def stop_watching_run(self):
+        """Show the final metrics of the run and stop polling"""
+        self.performance_timer.stop()
+        self.update_performance_display()
+    
+    def update_performance_display(self):
+        """Update the performance panel from the run metrics"""
+        if not self.run_metrics or not getattr(self, 'ui_widget', None) or not hasattr(self.ui_widget, 'performanceDetailLabel'):
+            return
+        try:
+            from App.helpers.run_metrics import RunMetrics
+            self.ui_widget.performanceDetailLabel.setText(RunMetrics.format_snapshot(self.run_metrics.snapshot()))
+        except Exception as e:
+            print(f"Error updating performance panel: {e}")
+    
+    def watch_lag(self, lag_monitor, interval_ms=1000):
+        """Show the lag monitor's percentiles and stalls in the debug panel"""
+        self.lag_monitor = lag_monitor
+        if getattr(self, 'ui_widget', None) and hasattr(self.ui_widget, 'lagFrame'):
+            self.ui_widget.lagFrame.setVisible(True)
+        self.update_lag_display()
+        self.lag_timer.start(interval_ms)
+    
+    def update_lag_display(self):
+        """Update the lag panel from the lag monitor"""
+        if not self.lag_monitor or not getattr(self, 'ui_widget', None) or not hasattr(self.ui_widget, 'lagDetailLabel'):
+            return
+        try:
+            from App.helpers.lag_monitor import LagMonitor
+            self.ui_widget.lagDetailLabel.setText(LagMonitor.format_snapshot(self.lag_monitor.snapshot()))
+        except Exception as e:
+            print(f"Error updating lag panel: {e}")
+    
     def _on_help_clicked(self, link):
         """Handle help label click - open WhatsApp for support"""
         try:
@@ -9,6 +9,7 @@ class WorkHandler(QObject):
     """Handler for work area operations and file processing"""
     # Signals for communication with other components
     files_cleared = Signal()
+    action_changed = Signal(str)
     
     def __init__(self, workspace_widget: QWidget, work_area_widget: QWidget, status_helper, config_manager=None):
         super().__init__()
@@ -18,6 +19,16 @@ class WorkHandler(QObject):
         self.config_manager = config_manager
         self.loaded_files = []
         self.file_widgets = []  # Store references to LoadedItemWidget instances
+        self.widgets_by_path = {}  # file path -> LoadedItemWidget for quick state updates
+        self.pending_states = {}  # file path -> processing state reported before its widget existed
+        self.duplicate_groups = {}  # representative file -> identical files that reuse its result
+        self.duplicate_files = set()  # non-representative duplicates (not billed)
+        self.duplicate_widget_count = 0  # widgets of files in duplicate_files, kept up to date as widgets come and go
+        self.duplicates_applied = True  # False when the load fed an auto-run, which bills every file
+        self.similar_clusters = []  # near-duplicate groups, first file of each is kept
+        self.near_duplicate_worker = None
+        self.retired_workers = []  # Cancelled workers kept alive until their thread ends
+        self.credit_forecast = None  # created on first use, False when run history is disabled
         
         # Initialize Pixelcut API helper (tapi JANGAN fetch dan JANGAN connect signals di sini)
         if self.config_manager:
@@ -27,6 +38,10 @@ class WorkHandler(QObject):
         else:
             self.pixelcut_api = None
         
+        # Declarative action profiles (endpoint, cost, naming, concurrency)
+        from App.helpers.action_registry import ActionRegistry
+        self.action_registry = ActionRegistry(self.config_manager)
+        
         # Get the stacked widget for switching between DnD and Work Area
         self.stacked_widget = workspace_widget.findChild(QStackedWidget, "stackedWidget")
         
@@ -43,6 +58,12 @@ class WorkHandler(QObject):
                 clear_icon = qta.icon('fa6s.xmark', color='white')
                 clear_btn.setIcon(clear_icon)
             
+            # Find and set icon for exclude similar button
+            exclude_similar_btn = self.work_area_widget.findChild(QPushButton, "excludeSimilarButton")
+            if exclude_similar_btn:
+                exclude_similar_btn.setIcon(qta.icon('fa6s.clone', color='white'))
+                exclude_similar_btn.setVisible(False)
+            
             # Find and set icon for WhatsApp button
             whatsapp_btn = self.work_area_widget.findChild(QPushButton, "whatsappButton")
             if whatsapp_btn:
@@ -60,6 +81,15 @@ class WorkHandler(QObject):
                 credit_icon = qta.icon('fa6s.wallet', color='#ff7f36')
                 remaining_credit_icon.setPixmap(credit_icon.pixmap(16, 16))
             
+            # Fill action combo from registered profiles so new endpoints need no code changes
+            action_combo = self.work_area_widget.findChild(QComboBox, "actionComboBox")
+            if action_combo:
+                action_names = self.action_registry.names()
+                current_items = [action_combo.itemText(i) for i in range(action_combo.count())]
+                if action_names and action_names != current_items:
+                    action_combo.clear()
+                    action_combo.addItems(action_names)
+            
             # Initialize cost calculation display
             self.update_cost_calculation()
     
@@ -70,6 +100,10 @@ class WorkHandler(QObject):
             if clear_btn:
                 clear_btn.clicked.connect(self.clear_files)
             
+            exclude_similar_btn = self.work_area_widget.findChild(QPushButton, "excludeSimilarButton")
+            if exclude_similar_btn:
+                exclude_similar_btn.clicked.connect(self.exclude_similar_files)
+            
             # Connect WhatsApp button
             whatsapp_btn = self.work_area_widget.findChild(QPushButton, "whatsappButton")
             if whatsapp_btn:
@@ -78,6 +112,8 @@ class WorkHandler(QObject):
             action_combo = self.work_area_widget.findChild(QComboBox, "actionComboBox")
             if action_combo:
                 action_combo.currentTextChanged.connect(self.update_cost_calculation)
+                action_combo.currentTextChanged.connect(self.action_changed)
+                action_combo.currentTextChanged.connect(self.update_work_area_header)
 
     def load_files(self, files):
         """Load files into work area and fetch credits HANYA DI SINI"""
@@ -97,6 +133,7 @@ class WorkHandler(QObject):
 
     def on_credits_updated(self, credits_remaining):
         """Handle updated credits from API"""
+        self.refresh_burn_rate()
         self.update_cost_calculation()  # Recalculate with fresh credit data
 
     def on_credits_error(self, error_message):
@@ -171,40 +208,60 @@ class WorkHandler(QObject):
                         file_list_layout.removeItem(last_item)
                 
                 self.file_widgets.append(widget)
+                self.widgets_by_path[widget.get_file_path()] = widget
+                if widget.get_file_path() in self.duplicate_files:
+                    self.duplicate_widget_count += 1
                 file_list_layout.addWidget(widget)
                 
+                # Catch up with processing that started before the widget existed (auto-run)
+                pending_state = self.pending_states.pop(widget.get_file_path(), None)
+                if pending_state:
+                    widget.set_processing_state(pending_state)
+                
                 # Update cost calculation in real-time as widgets are created
                 self.update_cost_calculation()
     
     def remove_file(self, file_path):
         """Remove a specific file from the loaded files"""
-        if file_path in self.loaded_files:
-            # Remove from loaded files list
-            self.loaded_files.remove(file_path)
-            
-            # Find and remove the corresponding widget
-            widget_to_remove = None
-            for widget in self.file_widgets:
-                if widget.get_file_path() == file_path:
-                    widget_to_remove = widget
-                    break
+        self.remove_files([file_path])
+    
+    def remove_files(self, file_paths):
+        """Remove several files with a single header and cost update"""
+        to_remove = set(file_paths) & set(self.loaded_files)
+        if not to_remove:
+            return
+        
+        # Remove from loaded files list
+        self.loaded_files = [path for path in self.loaded_files if path not in to_remove]
+        for file_path in to_remove:
+            self._forget_duplicate(file_path)
+        self.similar_clusters = [[p for p in cluster if p not in to_remove] for cluster in self.similar_clusters]
+        self.similar_clusters = [cluster for cluster in self.similar_clusters if len(cluster) > 1]
+        
+        # Remove the corresponding widgets from layout and delete them
+        widgets_to_remove = [widget for widget in self.file_widgets if widget.get_file_path() in to_remove]
+        for widget in widgets_to_remove:
+            self.file_widgets.remove(widget)
+            self.widgets_by_path.pop(widget.get_file_path(), None)
+            widget.setParent(None)
+            widget.deleteLater()
+        self._count_duplicate_widgets()
+        
+        if widgets_to_remove:
+            # Update header
+            self.update_work_area_header()
+            self.update_cost_calculation()  # This will handle button state
+            self.update_similar_markers()
             
-            if widget_to_remove:
-                # Remove from layout and delete widget
-                self.file_widgets.remove(widget_to_remove)
-                widget_to_remove.setParent(None)
-                widget_to_remove.deleteLater()
-                  # Update header
-                self.update_work_area_header()
-                self.update_cost_calculation()  # This will handle button state
-                
-                # If no files left, switch back to DnD area
-                if not self.loaded_files:
-                    self.switch_to_dnd_area()
-                    self.files_cleared.emit()
-                    self.status_helper.show_ready("Ready for new files")
-                else:
-                    self.status_helper.show_status(f"Removed file. {len(self.loaded_files)} files remaining.", self.status_helper.PRIORITY_NORMAL)
+            # If no files left, switch back to DnD area
+            if not self.loaded_files:
+                self.switch_to_dnd_area()
+                self.files_cleared.emit()
+                self.status_helper.show_ready("Ready for new files")
+            elif len(widgets_to_remove) == 1:
+                self.status_helper.show_status(f"Removed file. {len(self.loaded_files)} files remaining.", self.status_helper.PRIORITY_NORMAL)
+            else:
+                self.status_helper.show_status(f"Removed {len(widgets_to_remove)} files. {len(self.loaded_files)} files remaining.", self.status_helper.PRIORITY_NORMAL)
     
     def on_widget_creation_completed(self, widgets):
         """Handle completion of widget creation"""
@@ -224,6 +281,9 @@ class WorkHandler(QObject):
         
         self.status_helper.show_success(f"Created {len(widgets)} file widgets")
         
+        # Optional perceptual-hash pass for near-duplicates (runs after the list is usable)
+        self.start_near_duplicate_analysis()
+        
         # Clean up widget manager
         if hasattr(self, 'widget_manager'):
             self.widget_manager.deleteLater()
@@ -267,7 +327,16 @@ class WorkHandler(QObject):
         
         # Clear file data and widgets
         self.loaded_files = []
-        
+        self.pending_states.clear()
+        self.set_duplicate_groups({})
+        self.cancel_near_duplicate_analysis()
+        self.similar_clusters = []
+        self.update_similar_markers()
+
+        # Release cached input bytes of the cleared batch
+        from App.helpers.input_cache import get_input_cache
+        get_input_cache().clear()
+
         # Clear the UI
         scroll_area = self.work_area_widget.findChild(QWidget, "scrollAreaWidgetContents")
         if scroll_area:
@@ -310,6 +379,12 @@ class WorkHandler(QObject):
             # Update title with counts
             if title_label:
                 title_text = f"{file_count} files loaded ({folder_count} folder{'s' if folder_count != 1 else ''})"
+                duplicate_count = len(self.duplicate_files)
+                if duplicate_count and self.duplicates_applied:
+                    credits_saved = duplicate_count * self.get_cost_per_action(self.get_selected_action())
+                    title_text += f" - {duplicate_count} duplicate{'s' if duplicate_count != 1 else ''}, {credits_saved} credits saved"
+                elif duplicate_count:
+                    title_text += f" - {duplicate_count} duplicate{'s' if duplicate_count != 1 else ''} (billed, auto-run does not deduplicate)"
                 title_label.setText(title_text)
         else:
             # No files loaded
@@ -331,6 +406,125 @@ class WorkHandler(QObject):
         
         # Clear our widget references
         self.file_widgets.clear()
+        self.widgets_by_path.clear()
+        self.duplicate_widget_count = 0
+    
+    def set_file_state(self, file_path, state):
+        """Set processing state of a file's widget, remembering it if the widget isn't created yet"""
+        widget = self.widgets_by_path.get(file_path)
+        if widget:
+            widget.set_processing_state(state)
+        else:
+            self.pending_states[file_path] = state
+    
+    def set_file_progress(self, file_path, value):
+        """Update the progress bar of a file's widget (ignored until the widget exists)"""
+        widget = self.widgets_by_path.get(file_path)
+        if widget:
+            widget.update_progress(value)
+    
+    def set_file_error(self, file_path, message):
+        """Show a failure reason on a file's widget"""
+        widget = self.widgets_by_path.get(file_path)
+        if widget:
+            widget.set_error_message(message)
+    
+    def set_duplicate_groups(self, groups):
+        """Set exact duplicate groups found by the loader"""
+        self.duplicate_groups = {rep: list(dups) for rep, dups in groups.items()}
+        self.duplicate_files = {path for dups in self.duplicate_groups.values() for path in dups}
+        self._count_duplicate_widgets()
+    
+    def set_duplicates_applied(self, applied):
+        """Set whether the run for the current load skips duplicates (an auto-run processes every file)"""
+        self.duplicates_applied = applied
+    
+    def _count_duplicate_widgets(self):
+        """Recount duplicate widgets after duplicate groups or widgets change in bulk"""
+        self.duplicate_widget_count = sum(1 for path in self.duplicate_files if path in self.widgets_by_path)
+    
+    def get_duplicate_groups(self):
+        """Get exact duplicate groups of the loaded files"""
+        return self.duplicate_groups
+    
+    def _forget_duplicate(self, file_path):
+        """Keep duplicate groups valid after a file is removed"""
+        if file_path in self.duplicate_files:
+            self.duplicate_files.discard(file_path)
+            for dups in self.duplicate_groups.values():
+                if file_path in dups:
+                    dups.remove(file_path)
+        elif file_path in self.duplicate_groups:
+            # Promote the next identical file to representative
+            dups = self.duplicate_groups.pop(file_path)
+            if dups:
+                self.duplicate_files.discard(dups[0])
+                if dups[1:]:
+                    self.duplicate_groups[dups[0]] = dups[1:]
+        self.duplicate_groups = {rep: dups for rep, dups in self.duplicate_groups.items() if dups}
+    
+    def start_near_duplicate_analysis(self):
+        """Cluster near-duplicate images in the background if enabled in config"""
+        settings = self.config_manager.get("near_duplicates", {}) if self.config_manager else {}
+        if not settings.get("enabled", False):
+            return
+        
+        from App.helpers.url_source import is_url
+        files = [path for path in self.loaded_files if path not in self.duplicate_files and not is_url(path)]
+        if len(files) < 2:
+            return
+        
+        self.cancel_near_duplicate_analysis()
+        from App.helpers.near_duplicate_worker import NearDuplicateWorker
+        self.near_duplicate_worker = NearDuplicateWorker(files, settings.get("max_distance", 6))
+        self.near_duplicate_worker.clusters_found.connect(self.on_similar_clusters_found)
+        self.near_duplicate_worker.start()
+        self.status_helper.show_status(f"Looking for similar images in {len(files)} files...", self.status_helper.PRIORITY_NORMAL)
+    
+    def cancel_near_duplicate_analysis(self):
+        """Stop a running near-duplicate analysis"""
+        worker = self.near_duplicate_worker
+        self.near_duplicate_worker = None
+        if worker and worker.isRunning():
+            worker.clusters_found.disconnect(self.on_similar_clusters_found)
+            worker.cancel()
+            self.retired_workers.append(worker)
+            worker.finished.connect(lambda: self.retired_workers.remove(worker))
+    
+    def on_similar_clusters_found(self, clusters):
+        """Show near-duplicate groups in the work area"""
+        self.similar_clusters = [[p for p in cluster if p in self.widgets_by_path] for cluster in clusters]
+        self.similar_clusters = [cluster for cluster in self.similar_clusters if len(cluster) > 1]
+        self.update_similar_markers()
+        
+        excludable = sum(len(cluster) - 1 for cluster in self.similar_clusters)
+        if excludable:
+            self.status_helper.show_status(f"Found {len(self.similar_clusters)} groups of similar images ({excludable} can be excluded)", self.status_helper.PRIORITY_NORMAL)
+        else:
+            self.status_helper.show_status("No similar images found", self.status_helper.PRIORITY_NORMAL)
+    
+    def update_similar_markers(self):
+        """Refresh item group labels and the exclude button from the current clusters"""
+        marked = set()
+        for group_number, cluster in enumerate(self.similar_clusters, start=1):
+            for index, file_path in enumerate(cluster):
+                widget = self.widgets_by_path.get(file_path)
+                if widget:
+                    widget.set_similar_group(group_number, index == 0)
+                    marked.add(file_path)
+        for file_path, widget in self.widgets_by_path.items():
+            if file_path not in marked:
+                widget.clear_similar_group()
+        
+        exclude_similar_btn = self.work_area_widget.findChild(QPushButton, "excludeSimilarButton") if self.work_area_widget else None
+        if exclude_similar_btn:
+            excludable = sum(len(cluster) - 1 for cluster in self.similar_clusters)
+            exclude_similar_btn.setText(f"Exclude {excludable} Similar")
+            exclude_similar_btn.setVisible(excludable > 0)
+    
+    def exclude_similar_files(self):
+        """Remove every near-duplicate except the first file of each group"""
+        self.remove_files([path for cluster in self.similar_clusters for path in cluster[1:]])
     
     def get_loaded_files(self):
         """Get the currently loaded files"""
@@ -351,13 +545,9 @@ class WorkHandler(QObject):
         return None
 
     def get_cost_per_action(self, action_text):
-        """Get cost per file for the selected action"""
-        if "Upscale" in action_text:
-            return 10  # 10 credit per file for upscale
-        elif "Remove Bg" in action_text:
-            return 5   # 5 credit per file for remove background        
-        else:
-            return 0   # Default cost
+        """Get cost per file for the selected action from the action registry"""
+        return self.action_registry.get_cost(action_text)
+
     def update_cost_calculation(self):
         """Update estimated cost and remaining credits calculation"""
         if not self.work_area_widget:
@@ -371,7 +561,9 @@ class WorkHandler(QObject):
             current_action = action_combo.currentText()
             widget_count = len(self.file_widgets)
             cost_per_file = self.get_cost_per_action(current_action)
-            estimated_cost = widget_count * cost_per_file
+            # Exact duplicates reuse their representative's result and are not billed
+            billed_count = widget_count - (self.duplicate_widget_count if self.duplicates_applied else 0)
+            estimated_cost = billed_count * cost_per_file
             
             # Update estimated cost label
             if widget_count > 0:
@@ -387,6 +579,7 @@ class WorkHandler(QObject):
                 
                 # Calculate remaining credits after operation
                 remaining_after = current_credits - estimated_cost
+                batch_warning = self.get_batch_warning(remaining_after) if remaining_after >= 0 else None
                 
                 # Update remaining credits label with insufficient credit check
                 if remaining_after < 0:
@@ -394,6 +587,11 @@ class WorkHandler(QObject):
                     remaining_label.setStyleSheet("color: #dc3545; font-size: 12px; font-weight: bold; margin: 2px;")
                     # Disable run button when insufficient credits
                     self._update_run_button_state(False)
+                elif batch_warning:
+                    # Affordable, but leaves too little for the usual consumption
+                    remaining_label.setText(f"Remaining credit after process: {remaining_after} Credit ({batch_warning})")
+                    remaining_label.setStyleSheet("color: #fd7e14; font-size: 12px; font-weight: bold; margin: 2px;")
+                    self._update_run_button_state(True)
                 else:
                     remaining_label.setText(f"Remaining credit after process: {remaining_after} Credit")
                     remaining_label.setStyleSheet("color: #28a745; font-size: 12px; font-weight: normal; margin: 2px;")
@@ -406,6 +604,27 @@ class WorkHandler(QObject):
                 remaining_label.setStyleSheet("color: #17a2b8; font-size: 12px; font-style: italic; margin: 2px;")
                 # Disable run button when no files
                 self._update_run_button_state(False)    
+    def get_batch_warning(self, remaining_after):
+        """Get the burn-rate warning for the credits a batch would leave, None if there is enough"""
+        try:
+            if self.credit_forecast is None:
+                self.refresh_burn_rate()
+            return self.credit_forecast.get_batch_warning(remaining_after) if self.credit_forecast else None
+        except Exception as e:
+            print(f"Error checking credit forecast: {e}")
+            return None
+    
+    def refresh_burn_rate(self):
+        """Re-read the burn rate from run history - cost updates only compare against the cached rate"""
+        try:
+            if self.credit_forecast is None and self.config_manager:
+                from App.helpers.credit_forecast import CreditForecast
+                self.credit_forecast = CreditForecast.from_config(self.config_manager) or False
+            if self.credit_forecast:
+                self.credit_forecast.refresh_burn_rate()
+        except Exception as e:
+            print(f"Error refreshing credit burn rate: {e}")
+    
     def _update_run_button_state(self, enabled):
         """Update run button enabled/disabled state"""
         try:
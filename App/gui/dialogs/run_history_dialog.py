@@ -0,0 +1,131 @@
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget,
+                               QTableWidgetItem, QSplitter, QFileDialog, QAbstractItemView, QHeaderView,
+                               QMessageBox)
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QFont
+
+
+class RunHistoryDialog(QDialog):
+    """Dialog listing past runs with their per-file results and CSV/JSON export"""
+
+    RUN_COLUMNS = [("started_at", "Started"), ("action", "Action"), ("status", "Status"), ("total", "Files"),
+                   ("processed", "OK"), ("failed", "Failed"), ("credits", "Credits"), ("duration_seconds", "Duration (s)"),
+                   ("bytes_up", "MB up"), ("bytes_down", "MB down")]
+    FILE_COLUMNS = [("input", "Input"), ("success", "OK"), ("method", "Method"), ("attempts", "Attempts"),
+                    ("credits", "Credits"), ("input_bytes", "MB in"), ("megapixels", "MP"), ("upload_seconds", "Upload (s)"),
+                    ("server_seconds", "Server (s)"), ("download_seconds", "Download (s)"), ("write_seconds", "Write (s)"),
+                    ("output", "Output")]
+
+    def __init__(self, history, parent=None):
+        super().__init__(parent)
+        self.history = history
+        self.runs = []
+        self.setup_ui()
+        self.load_runs()
+
+    def setup_ui(self):
+        """Setup the dialog UI"""
+        self.setWindowTitle("Run History")
+        self.setObjectName("RunHistoryDialog")
+        self.resize(900, 560)
+
+        layout = QVBoxLayout(self)
+        layout.setSpacing(10)
+        layout.setContentsMargins(15, 15, 15, 15)
+
+        title_label = QLabel("Past runs (select one or more to export)")
+        title_font = QFont()
+        title_font.setBold(True)
+        title_label.setFont(title_font)
+        layout.addWidget(title_label)
+
+        splitter = QSplitter(Qt.Orientation.Vertical)
+        self.runs_table = self._create_table([title for _, title in self.RUN_COLUMNS])
+        self.runs_table.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.runs_table.itemSelectionChanged.connect(self.on_run_selected)
+        self.files_table = self._create_table([title for _, title in self.FILE_COLUMNS])
+        splitter.addWidget(self.runs_table)
+        splitter.addWidget(self.files_table)
+        layout.addWidget(splitter)
+
+        button_layout = QHBoxLayout()
+        self.status_label = QLabel("")  # result of the last export
+        button_layout.addWidget(self.status_label)
+        button_layout.addStretch()
+        self.export_button = QPushButton("Export...")
+        self.export_button.setEnabled(False)
+        self.export_button.clicked.connect(self.on_export_clicked)
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.accept)
+        button_layout.addWidget(self.export_button)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+
+    def _create_table(self, headers):
+        """Create a read-only table with the given headers"""
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        table.verticalHeader().setVisible(False)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        table.horizontalHeader().setStretchLastSection(True)
+        return table
+
+    def _fill_table(self, table, columns, rows):
+        """Fill a table with dict rows"""
+        table.setRowCount(len(rows))
+        for row_index, row in enumerate(rows):
+            for column_index, (key, _) in enumerate(columns):
+                table.setItem(row_index, column_index, QTableWidgetItem(self._format_value(key, row.get(key))))
+
+    @staticmethod
+    def _format_value(key, value):
+        """Format a database value for display"""
+        if value is None:
+            return ""
+        if key == "success":
+            return "Yes" if value else "No"
+        if key in ("bytes_up", "bytes_down", "input_bytes"):
+            return f"{value / (1024 * 1024):.1f}"
+        if isinstance(value, float):
+            return f"{value:.2f}"
+        return str(value)
+
+    def load_runs(self):
+        """Load the most recent runs"""
+        try:
+            self.runs = self.history.get_runs()
+        except Exception as e:
+            print(f"Error loading run history: {e}")
+            self.runs = []
+        self._fill_table(self.runs_table, self.RUN_COLUMNS, self.runs)
+
+    def get_selected_run_ids(self):
+        """Get ids of the selected runs in table order"""
+        rows = sorted({index.row() for index in self.runs_table.selectionModel().selectedRows()})
+        return [self.runs[row]["id"] for row in rows]
+
+    def on_run_selected(self):
+        """Show the files of the first selected run"""
+        run_ids = self.get_selected_run_ids()
+        self.export_button.setEnabled(bool(run_ids))
+        files = self.history.get_run_files(run_ids[0]) if run_ids else []
+        self._fill_table(self.files_table, self.FILE_COLUMNS, files)
+
+    def on_export_clicked(self):
+        """Export the selected runs to CSV or JSON"""
+        file_path, _ = QFileDialog.getSaveFileName(self, "Export Run History", "run_history.csv",
+                                                   "CSV Files (*.csv);;JSON Files (*.json)")
+        if not file_path:
+            return
+        run_ids = self.get_selected_run_ids()
+        try:
+            self.history.export(file_path, run_ids)
+        except Exception as e:
+            print(f"Error exporting run history: {e}")
+            self.status_label.setText("Export failed")
+            QMessageBox.warning(self, "Export Failed", f"Could not export the run history:\n{e}")
+            return
+        print(f"Run history exported to {file_path}")
+        self.status_label.setText(f"Exported {len(run_ids)} run(s) to {file_path}")
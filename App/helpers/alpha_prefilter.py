@@ -0,0 +1,87 @@
+import numpy as np
+from PIL import Image
+from App.helpers.input_cache import get_input_cache
+from App.helpers.url_source import is_url
+
+
+class AlphaPrefilter:
+    """Detect images that already have a cut-out background so Remove Bg can skip them"""
+
+    ALPHA_MODES = {"RGBA", "LA", "PA", "RGBa", "La"}
+
+    def __init__(self, border_fraction=0.05, transparent_ratio=0.9, alpha_threshold=8, sample_size=256):
+        self.border_fraction = border_fraction
+        self.transparent_ratio = transparent_ratio
+        self.alpha_threshold = alpha_threshold
+        self.sample_size = sample_size
+
+    @classmethod
+    def from_config(cls, settings, action):
+        """Create prefilter from the "alpha_prefilter" config section, None if it doesn't apply to the action"""
+        settings = settings or {}
+        if not settings.get("enabled", True) or action not in settings.get("actions", ["Remove Bg"]):
+            return None
+        return cls(
+            border_fraction=settings.get("border_fraction", 0.05),
+            transparent_ratio=settings.get("transparent_ratio", 0.9),
+            alpha_threshold=settings.get("alpha_threshold", 8),
+            sample_size=settings.get("sample_size", 256)
+        )
+
+    def is_cutout(self, file_path):
+        """Check whether an image has a (mostly) fully transparent border and a visible subject"""
+        if is_url(file_path):
+            return False
+
+        try:
+            # Header-only rejection of the common case: no alpha channel at all
+            # (an unreadable or missing file is left to preflight and the upload to report)
+            header = get_input_cache().get_header(file_path)
+            if not header or (header["mode"] not in self.ALPHA_MODES and header["mode"] != "P"):
+                return False
+
+            img = get_input_cache().open_image(file_path)
+            if img is None:
+                return False
+            with img:
+                if img.mode == "P" and "transparency" not in img.info:
+                    return False
+                # Shrink in the source mode first (draft for JPEG, reduce for the rest) so only
+                # the small copy is converted
+                img.thumbnail((self.sample_size, self.sample_size), Image.Resampling.NEAREST)
+                alpha = np.asarray(img.convert("RGBA").getchannel("A"))
+        except Exception as e:
+            print(f"Alpha prefilter failed for {file_path}: {e}")
+            return False
+
+        return self.classify_alpha(alpha)
+
+    def classify_alpha(self, alpha):
+        """Classify a 2D alpha array as already cut out"""
+        height, width = alpha.shape
+        border = max(1, int(round(min(height, width) * self.border_fraction)))
+        if border * 2 >= min(height, width):
+            return False
+
+        transparent = alpha <= self.alpha_threshold
+        # Border ring = whole image minus the inner rectangle
+        inner = transparent[border:-border, border:-border]
+        border_pixels = transparent.size - inner.size
+        border_transparent = int(transparent.sum()) - int(inner.sum())
+
+        has_subject = not bool(inner.all())
+        return has_subject and border_transparent >= border_pixels * self.transparent_ratio
+
+    def find_cutouts(self, files, lookup=None, is_cancelled=None):
+        """Return the files that are already cut out
+
+        `lookup(file_path)` may return an earlier True/False result to skip re-checking a file.
+        """
+        cutouts = []
+        for file_path in files:
+            if is_cancelled and is_cancelled():
+                break
+            known = lookup(file_path) if lookup else None
+            if known if known is not None else self.is_cutout(file_path):
+                cutouts.append(file_path)
+        return cutouts
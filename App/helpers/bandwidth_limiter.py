@@ -0,0 +1,145 @@
+import time
+import threading
+from datetime import datetime
+
+
+class TokenBucket:
+    """Thread-safe token bucket on bytes - a rate of 0 means unlimited"""
+
+    def __init__(self, rate_bytes_per_sec=0, burst_bytes=None):
+        self.rate = 0
+        self.burst = 0
+        self.tokens = 0.0
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+        self.set_rate(rate_bytes_per_sec, burst_bytes)
+
+    def set_rate(self, rate_bytes_per_sec, burst_bytes=None):
+        """Change the rate, keeping burst at a quarter second of traffic by default"""
+        with self.lock:
+            self.rate = max(0, rate_bytes_per_sec)
+            self.burst = burst_bytes or max(16 * 1024, int(self.rate / 4))
+            self.tokens = min(self.tokens, self.burst)
+
+    def consume(self, amount):
+        """Block until `amount` bytes may pass"""
+        # Large requests are taken in burst-sized slices so concurrent transfers interleave fairly
+        while amount > 0:
+            with self.lock:
+                if self.rate <= 0:
+                    return
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+
+                take = min(amount, self.burst)
+                if self.tokens >= take:
+                    self.tokens -= take
+                    amount -= take
+                    continue
+                wait_time = (take - self.tokens) / self.rate
+
+            # Sleep outside the lock so other threads can refill and take their share
+            time.sleep(min(wait_time, 0.25))
+
+
+class BandwidthLimiter:
+    """Upload/download bandwidth caps with a time-of-day schedule and achieved throughput stats"""
+
+    SCHEDULE_CHECK_INTERVAL = 5.0  # Seconds between schedule re-evaluations
+
+    def __init__(self, settings=None):
+        settings = settings or {}
+        self.enabled = settings.get("enabled", False)
+        self.default_upload_kbps = settings.get("upload_kbps", 0)
+        self.default_download_kbps = settings.get("download_kbps", 0)
+        self.schedule = settings.get("schedule", [])
+
+        self.upload_bucket = TokenBucket()
+        self.download_bucket = TokenBucket()
+        self.last_schedule_check = 0
+
+        # Achieved throughput tracking
+        self.stats_lock = threading.Lock()
+        self.bytes_uploaded = 0
+        self.bytes_downloaded = 0
+        self.started_at = time.monotonic()
+
+        self._apply_schedule(force=True)
+
+    @classmethod
+    def from_config(cls, config_manager):
+        """Create limiter from the "bandwidth_limit" config section"""
+        return cls(config_manager.get("bandwidth_limit", {}))
+
+    def throttle_upload(self, amount):
+        """Account for and wait on `amount` uploaded bytes"""
+        self._apply_schedule()
+        self.upload_bucket.consume(amount)
+        with self.stats_lock:
+            self.bytes_uploaded += amount
+
+    def throttle_download(self, amount):
+        """Account for and wait on `amount` downloaded bytes"""
+        self._apply_schedule()
+        self.download_bucket.consume(amount)
+        with self.stats_lock:
+            self.bytes_downloaded += amount
+
+    def get_current_limits(self):
+        """Get (upload_kbps, download_kbps) for the current time, 0 meaning unlimited"""
+        if not self.enabled:
+            return 0, 0
+
+        now = datetime.now()
+        current_minutes = now.hour * 60 + now.minute
+        for window in self.schedule:
+            days = window.get("days")
+            if days is not None and now.weekday() not in days:
+                continue
+            start = self._parse_minutes(window.get("start", "00:00"))
+            end = self._parse_minutes(window.get("end", "24:00"))
+            # Windows like 22:00-06:00 wrap around midnight
+            in_window = start <= current_minutes < end if start <= end else (current_minutes >= start or current_minutes < end)
+            if in_window:
+                return window.get("upload_kbps", 0), window.get("download_kbps", 0)
+
+        return self.default_upload_kbps, self.default_download_kbps
+
+    def get_stats(self):
+        """Get transferred bytes and achieved rates in bytes per second"""
+        with self.stats_lock:
+            elapsed = max(0.001, time.monotonic() - self.started_at)
+            return {
+                "bytes_uploaded": self.bytes_uploaded,
+                "bytes_downloaded": self.bytes_downloaded,
+                "elapsed": elapsed,
+                "upload_rate": self.bytes_uploaded / elapsed,
+                "download_rate": self.bytes_downloaded / elapsed,
+            }
+
+    def get_stats_text(self):
+        """Format achieved throughput for status messages"""
+        stats = self.get_stats()
+        return (f"up {stats['upload_rate'] / (1024 * 1024):.2f} MB/s, "
+                f"down {stats['download_rate'] / (1024 * 1024):.2f} MB/s")
+
+    def _apply_schedule(self, force=False):
+        """Update bucket rates when the active schedule window changes"""
+        now = time.monotonic()
+        if not force and now - self.last_schedule_check < self.SCHEDULE_CHECK_INTERVAL:
+            return
+        self.last_schedule_check = now
+
+        upload_kbps, download_kbps = self.get_current_limits()
+        if upload_kbps * 1024 != self.upload_bucket.rate:
+            self.upload_bucket.set_rate(upload_kbps * 1024)
+        if download_kbps * 1024 != self.download_bucket.rate:
+            self.download_bucket.set_rate(download_kbps * 1024)
+
+    @staticmethod
+    def _parse_minutes(time_text):
+        """Parse "HH:MM" into minutes since midnight"""
+        hours, minutes = str(time_text).split(":")
+        return int(hours) * 60 + int(minutes)
+
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+
+
+class CreditForecast:
+    """Project credit depletion from recorded balances and run consumption"""
+
+    def __init__(self, history, window_days=14, min_span_days=1.0, warn_days=3):
+        self.history = history
+        self.window_days = window_days
+        self.min_span_days = min_span_days  # a single busy hour must not look like a daily rate
+        self.warn_days = warn_days
+        self.burn_rate = None  # cached by refresh_burn_rate(), None until first computed
+
+    @classmethod
+    def from_config(cls, config_manager):
+        """Create forecaster on the run history database, None when history is disabled"""
+        from App.helpers.run_history import RunHistory
+        history = RunHistory.from_config(config_manager)
+        if not history:
+            return None
+        settings = config_manager.get("credit_forecast", {})
+        return cls(
+            history,
+            window_days=settings.get("window_days", 14),
+            min_span_days=settings.get("min_span_days", 1.0),
+            warn_days=settings.get("warn_days", 3)
+        )
+
+    def record_balance(self, remaining, total):
+        """Add a balance sample from a credits response"""
+        return self.history.record_balance(datetime.now(), remaining, total)
+
+    def get_burn_rate(self, now=None):
+        """Credits used per day over the window (0 when there is no usage data)"""
+        now = now or datetime.now()
+        since = now - timedelta(days=self.window_days)
+
+        # Balance drops also include usage outside this app; top-ups (increases) are ignored
+        balances = self.history.get_balances(since)
+        used = sum(max(0, previous[1] - current[1]) for previous, current in zip(balances, balances[1:]))
+        first_at = balances[0][0] if len(balances) > 1 else None
+
+        if not used:
+            # No usable balance series yet - fall back to credits spent by recorded runs
+            runs = self.history.get_run_credits(since)
+            used = sum(credits for _, credits in runs)
+            first_at = runs[0][0] if runs else None
+
+        if not used:
+            return 0.0
+        span_days = (now - datetime.fromisoformat(first_at)).total_seconds() / 86400
+        return used / max(self.min_span_days, span_days)
+
+    def refresh_burn_rate(self, now=None):
+        """Recompute and cache the burn rate (on credit updates and finished runs, not per redraw)"""
+        self.burn_rate = self.get_burn_rate(now)
+        return self.burn_rate
+
+    def forecast(self, remaining, days_until_expiry, costs, now=None):
+        """Project depletion for a balance
+
+        Args:
+            remaining (int): Credits remaining
+            days_until_expiry (int): Days until the credit period ends (0 if unknown)
+            costs (dict): Action name -> credits per image
+
+        Returns:
+            dict: burn_rate, days_left (None without usage), depletion_date, runs_out_first, coverage
+        """
+        now = now or datetime.now()
+        burn_rate = self.refresh_burn_rate(now)
+        days_left = remaining / burn_rate if burn_rate else None
+        return {
+            "burn_rate": burn_rate,
+            "days_left": days_left,
+            "depletion_date": now + timedelta(days=days_left) if days_left is not None else None,
+            "runs_out_first": days_left is not None and days_until_expiry > 0 and days_left < days_until_expiry,
+            "coverage": {action: remaining // cost for action, cost in costs.items() if cost > 0},
+        }
+
+    def get_batch_warning(self, remaining_after):
+        """Warning text when a planned batch leaves less than warn_days of credits at the cached burn rate"""
+        burn_rate = self.burn_rate
+        if not burn_rate or remaining_after >= burn_rate * self.warn_days:
+            return None
+        return f"leaves ~{remaining_after / burn_rate:.1f} days of credits at {burn_rate:.0f}/day"
+
+    @staticmethod
+    def format_forecast(forecast):
+        """Format a forecast for the statistics panel"""
+        coverage = ", ".join(f"{action} {count}" for action, count in forecast["coverage"].items())
+        if forecast["days_left"] is None:
+            lines = ["Burn rate: no usage recorded yet"]
+        else:
+            depletion = forecast["depletion_date"].strftime("%Y-%m-%d")
+            lines = [f"Burn rate: {forecast['burn_rate']:.0f} credits/day, runs out ~{depletion} "
+                     f"({forecast['days_left']:.0f} days)"]
+            if forecast["runs_out_first"]:
+                lines.append("Credits will run out before the period expires")
+        if coverage:
+            lines.append(f"Balance covers: {coverage}")
+        return "\n".join(lines)
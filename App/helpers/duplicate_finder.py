@@ -0,0 +1,112 @@
+import os
+import shutil
+import hashlib
+from App.helpers.url_source import is_url
+
+
+class DuplicateFinder:
+    """Group byte-identical input files so only one copy per group is sent to the API"""
+
+    CHUNK_SIZE = 1024 * 1024
+    EDGE_SIZE = 64 * 1024  # Bytes hashed from each end before a full hash is worth it
+
+    def find_groups(self, files, is_cancelled=None):
+        """Return {representative: [duplicates]} for every group of identical files
+
+        Files are compared by size first, then by a hash of both ends, and only
+        still-matching files get a full chunked hash. Files with a unique size are
+        never read. The first file of each group (in batch order) is the representative.
+        """
+        by_size = {}
+        for file_path in files:
+            if is_url(file_path):
+                continue
+            try:
+                by_size.setdefault(os.path.getsize(file_path), []).append(file_path)
+            except OSError:
+                continue
+
+        groups = {}
+        for size, same_size in by_size.items():
+            if len(same_size) < 2:
+                continue
+            for candidates in self._split_by(same_size, self._edge_hash, is_cancelled):
+                for identical in self._split_by(candidates, self._full_hash, is_cancelled):
+                    groups[identical[0]] = identical[1:]
+            if is_cancelled and is_cancelled():
+                return {}
+        return groups
+
+    def _split_by(self, files, hash_func, is_cancelled):
+        """Split files into lists of two or more sharing the same hash"""
+        by_hash = {}
+        for file_path in files:
+            if is_cancelled and is_cancelled():
+                return []
+            try:
+                by_hash.setdefault(hash_func(file_path), []).append(file_path)
+            except OSError as e:
+                print(f"Error hashing {file_path}: {e}")
+        return [group for group in by_hash.values() if len(group) > 1]
+
+    def _edge_hash(self, file_path):
+        """Hash the first and last bytes of a file"""
+        digest = hashlib.blake2b(digest_size=16)
+        with open(file_path, 'rb') as f:
+            digest.update(f.read(self.EDGE_SIZE))
+            f.seek(max(0, os.fstat(f.fileno()).st_size - self.EDGE_SIZE))
+            digest.update(f.read(self.EDGE_SIZE))
+        return digest.digest()
+
+    def _full_hash(self, file_path):
+        """Hash a whole file in chunks"""
+        digest = hashlib.blake2b(digest_size=32)
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.digest()
+
+
+def fan_out(source_path, target_path, link_mode="auto"):
+    """Give a duplicate its own copy of a result file
+
+    Args:
+        link_mode: "auto" (reflink, then hardlink, then copy), "reflink", "hardlink" or "copy"
+
+    Returns:
+        str: Method actually used
+    """
+    if os.path.normcase(os.path.abspath(source_path)) == os.path.normcase(os.path.abspath(target_path)):
+        return "same"
+    if os.path.exists(target_path):
+        os.remove(target_path)
+
+    # Reflinks are copy-on-write, so editing one output never changes the other
+    if link_mode in ("auto", "reflink") and _reflink(source_path, target_path):
+        return "reflink"
+    if link_mode in ("auto", "hardlink"):
+        try:
+            os.link(source_path, target_path)
+            return "hardlink"
+        except OSError:
+            pass
+    shutil.copyfile(source_path, target_path)
+    return "copy"
+
+
+def _reflink(source_path, target_path):
+    """Clone a file with the Linux FICLONE ioctl (Btrfs, XFS), False where unsupported"""
+    try:
+        import fcntl
+    except ImportError:
+        return False
+
+    FICLONE = 0x40049409
+    try:
+        with open(source_path, 'rb') as src, open(target_path, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    except OSError:
+        if os.path.exists(target_path):
+            os.remove(target_path)
+        return False
@@ -0,0 +1,91 @@
+import threading
+import numpy as np
+
+
+class EtaModel:
+    """Per-action file latency model (seconds ~ a + b * MB + c * megapixels) fitted by recursive least squares"""
+
+    DEFAULT_LATENCY = 10.0  # seconds per file before anything has been observed
+
+    def __init__(self, forgetting=0.98, ridge=1e-3):
+        # Older observations fade so the model follows the API's current speed
+        self.forgetting = forgetting
+        self.ridge = ridge
+        self.lock = threading.Lock()
+        self.xtx = np.zeros((3, 3))
+        self.xty = np.zeros(3)
+        self.count = 0
+        self.mean_latency = None
+        self.coefficients = None
+
+    @classmethod
+    def from_history(cls, history, action, limit=2000):
+        """Create a model pre-fitted with the action's recent successful API files"""
+        model = cls()
+        if history:
+            try:
+                for input_bytes, megapixels, latency in history.get_latency_samples(action, limit):
+                    model.update(input_bytes, megapixels, latency)
+            except Exception as e:
+                print(f"Error loading latency history: {e}")
+        return model
+
+    @staticmethod
+    def _features(input_bytes, megapixels):
+        return np.array([1.0, input_bytes / (1024 * 1024), megapixels])
+
+    def update(self, input_bytes, megapixels, latency):
+        """Add an observed file latency"""
+        if latency <= 0:
+            return
+        with self.lock:
+            if input_bytes is not None and megapixels is not None:
+                x = self._features(input_bytes, megapixels)
+                self.xtx = self.forgetting * self.xtx + np.outer(x, x)
+                self.xty = self.forgetting * self.xty + x * latency
+                self.count += 1
+                self.coefficients = None
+            self.mean_latency = latency if self.mean_latency is None else 0.9 * self.mean_latency + 0.1 * latency
+
+    def predict(self, input_bytes, megapixels):
+        """Predict one file's latency in seconds (mean latency when the size is unknown or data is scarce)"""
+        if input_bytes is None or megapixels is None:
+            return self.predict_total(0, 0, 0.0, unknown_count=1)
+        return self.predict_total(1, input_bytes, megapixels)
+
+    def predict_total(self, count, total_bytes, total_megapixels, unknown_count=0):
+        """Predict the summed latency of `count` files from their size totals plus `unknown_count` unsized files
+
+        The model is linear, so the sums of a set's features are enough to predict the whole set.
+        """
+        with self.lock:
+            fallback = self.mean_latency if self.mean_latency is not None else self.DEFAULT_LATENCY
+            if self.count >= 5 and self.coefficients is None:
+                regularised = self.xtx + self.ridge * np.diag([0.0, 1.0, 1.0])
+                try:
+                    self.coefficients = np.linalg.solve(regularised, self.xty)
+                except np.linalg.LinAlgError:
+                    pass
+            coefficients = self.coefficients if self.count >= 5 else None
+        if coefficients is None or not count:
+            return (count + unknown_count) * fallback
+        prediction = float(np.array([count, total_bytes / (1024 * 1024), total_megapixels]) @ coefficients)
+        # Extrapolation can go negative for tiny files
+        return max(0.1 * fallback * count, prediction) + unknown_count * fallback
+
+    def estimate_remaining(self, pending, in_flight, concurrency, request_interval=0.0):
+        """Estimate seconds until the run finishes
+
+        Args:
+            pending (tuple): (count, total input bytes, total megapixels, unsized count) of files not started yet
+            in_flight (list): (input_bytes, megapixels, elapsed_seconds) of files being processed
+            concurrency (int): Files processed at once
+            request_interval (float): Minimum seconds between request starts
+        """
+        count, total_bytes, total_megapixels, unknown_count = pending
+        work = self.predict_total(count, total_bytes, total_megapixels, unknown_count)
+        work += sum(max(0.0, self.predict(b, m) - elapsed) for b, m, elapsed in in_flight)
+        pending_count = count + unknown_count
+        parallel = max(1, min(concurrency, pending_count + len(in_flight)))
+        # Request spacing bounds how fast pending files can even start
+        return max(work / parallel, pending_count * request_interval)
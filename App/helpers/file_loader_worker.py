@@ -1,6 +1,9 @@
 from PySide6.QtCore import QThread, Signal
-from PIL import Image
 import os
+from App.helpers.input_cache import get_input_cache
+from App.helpers.url_source import is_url
+from App.helpers.duplicate_finder import DuplicateFinder
+from App.helpers import tracing, profiling
 
 class FileLoaderWorker(QThread):
     """Worker thread for loading and validating image files"""
@@ -8,22 +11,30 @@ class FileLoaderWorker(QThread):
     file_processed = Signal(str, bool)   # file_path, is_valid
     loading_completed = Signal(list)     # valid_files
     loading_cancelled = Signal()
+    duplicates_found = Signal(dict)      # representative -> [identical files]
     
-    def __init__(self, files):
+    def __init__(self, files, detect_duplicates=False):
         super().__init__()
         self.files = files
         self.cancelled = False
         self.valid_files = []
+        self.detect_duplicates = detect_duplicates
         
         # Supported image extensions - common formats only
         self.supported_extensions = {
             '.jpg', '.jpeg', '.png', '.tiff', '.tif', '.webp'
         }
         
+    @profiling.profiled_thread("loader")
     def run(self):
         """Main worker thread execution"""
         try:
             self.process_files()
+            if self.detect_duplicates and not self.cancelled:
+                self.progress_updated.emit(100, "Checking for duplicate files...")
+                with tracing.span("duplicate_scan", files=len(self.valid_files)):
+                    groups = DuplicateFinder().find_groups(self.valid_files, lambda: self.cancelled)
+                self.duplicates_found.emit(groups)
         except Exception as e:
             print(f"Error in file loading worker: {e}")
         finally:
@@ -50,23 +61,36 @@ class FileLoaderWorker(QThread):
             for file_path in batch:
                 if self.cancelled:
                     break
+                
+                # Image URLs are validated by the API when processed - nothing to read locally
+                if is_url(file_path):
+                    self.valid_files.append(file_path)
+                    self.file_processed.emit(file_path, True)
+                    processed_count += 1
+                    continue
                     
                 # Quick existence check first
                 if not os.path.exists(file_path):
                     processed_count += 1
+                    self.file_processed.emit(file_path, False)
                     continue
                 
                 # Quick extension check
                 ext = os.path.splitext(file_path)[1].lower()
                 if ext not in self.supported_extensions:
                     processed_count += 1
+                    self.file_processed.emit(file_path, False)
                     continue
                 
                 # Fast validation
-                is_valid = self.quick_validate_image_file(file_path)
+                with tracing.span("validate", file=file_path):
+                    is_valid = self.quick_validate_image_file(file_path)
                 
                 if is_valid:
                     self.valid_files.append(file_path)
+                
+                # Per-file result lets auto-run start processing before loading finishes
+                self.file_processed.emit(file_path, is_valid)
                     
                 processed_count += 1
                 
@@ -92,10 +116,9 @@ class FileLoaderWorker(QThread):
             if file_size < 100:  # Less than 100 bytes is likely not a valid image
                 return False
             
-            # Quick PIL check without full verification
-            with Image.open(file_path) as img:
-                # Just check format, don't verify entire file
-                return img.format is not None
+            # Quick PIL header check through the shared cache so thumbnails and upload reuse this read
+            header = get_input_cache().get_header(file_path)
+            return header is not None and header.get("format") is not None
         except Exception:
             return False
     
@@ -0,0 +1,51 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# Shared session so API connections (TCP + TLS) are reused across files and runs
+_session = None
+_session_lock = threading.Lock()
+_pool_size = 16  # connections kept per host
+
+
+def get_http_session():
+    """Get the shared requests session used for Pixelcut API traffic"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _mount_adapter(_session)
+        return _session
+
+
+def ensure_pool_size(size):
+    """Grow the per-host connection pool to at least `size` so concurrent requests don't discard connections
+
+    Growing replaces the adapter (dropping its idle connections), so call this before warming or using the session.
+    """
+    global _pool_size
+    with _session_lock:
+        if size <= _pool_size:
+            return
+        _pool_size = size
+        if _session is not None:
+            _mount_adapter(_session)
+
+
+def _mount_adapter(session):
+    """Mount an adapter with the current pool size (caller holds the lock)"""
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=_pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+
+def warm_connection(url, timeout=5):
+    """Open a pooled connection to the host of `url` ahead of the first real request"""
+    try:
+        # Any response (even 4xx) means the TLS handshake is done and the connection is pooled
+        get_http_session().head(url, timeout=timeout)
+        return True
+    except requests.exceptions.RequestException as e:
+        print(f"Connection warm-up failed for {url}: {e}")
+        return False
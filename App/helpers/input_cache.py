@@ -0,0 +1,163 @@
+import os
+import io
+import threading
+from collections import OrderedDict
+from PIL import Image
+
+
+class InputCache:
+    """Size-bounded LRU cache of input file bytes and image headers shared by all pipeline stages"""
+
+    def __init__(self, max_memory_mb=256, max_file_mb=32, enabled=True):
+        self.enabled = enabled
+        self.max_memory_bytes = int(max_memory_mb * 1024 * 1024)
+        self.max_file_bytes = int(max_file_mb * 1024 * 1024)
+        self.max_header_entries = 100000  # Headers are tiny, bound them by count only
+
+        # Entries are keyed by (absolute path, mtime_ns, size) so edited files are never served stale
+        self._bytes_cache = OrderedDict()
+        self._header_cache = OrderedDict()
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+
+        # Simple counters for diagnostics
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, settings):
+        """Apply settings from the "input_cache" config section"""
+        if not settings:
+            return
+        with self._lock:
+            self.enabled = settings.get("enabled", self.enabled)
+            self.max_memory_bytes = int(settings.get("max_memory_mb", self.max_memory_bytes / (1024 * 1024)) * 1024 * 1024)
+            self.max_file_bytes = int(settings.get("max_file_mb", self.max_file_bytes / (1024 * 1024)) * 1024 * 1024)
+            self._evict_locked()
+
+    def make_key(self, file_path):
+        """Build cache key from path, modification time and size"""
+        stat = os.stat(file_path)
+        return (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+
+    def get_bytes(self, file_path):
+        """Return the raw bytes of a file, reading it from disk at most once while it stays cached"""
+        key = self.make_key(file_path)
+
+        with self._lock:
+            data = self._bytes_cache.get(key)
+            if data is not None:
+                self._bytes_cache.move_to_end(key)
+                self.hits += 1
+                return data
+            self.misses += 1
+
+        # Read outside the lock so slow network reads don't block other threads
+        with open(file_path, 'rb') as f:
+            data = f.read()
+
+        if self.enabled and len(data) <= self.max_file_bytes:
+            with self._lock:
+                if key not in self._bytes_cache:
+                    self._bytes_cache[key] = data
+                    self._current_bytes += len(data)
+                    self._evict_locked()
+        return data
+
+    def get_cached_bytes(self, file_path):
+        """Return the bytes of a file only if they are already cached, without reading from disk"""
+        try:
+            key = self.make_key(file_path)
+        except OSError:
+            return None
+        with self._lock:
+            data = self._bytes_cache.get(key)
+            if data is not None:
+                self._bytes_cache.move_to_end(key)
+                self.hits += 1
+            return data
+
+    def get_header(self, file_path):
+        """Return decoded header info (format, width, height, mode) or None if not a readable image"""
+        try:
+            key = self.make_key(file_path)
+        except OSError:
+            # Missing or inaccessible (e.g. moved after loading) - callers report it per file
+            return None
+
+        with self._lock:
+            if key in self._header_cache:
+                self._header_cache.move_to_end(key)
+                return self._header_cache[key]
+
+        # Only the header is parsed - bytes are loaded into the cache by the thumbnail and upload stages
+        cached = self.get_cached_bytes(file_path)
+        header = None
+        try:
+            with Image.open(io.BytesIO(cached) if cached is not None else file_path) as img:
+                header = {
+                    "format": img.format,
+                    "width": img.width,
+                    "height": img.height,
+                    "mode": img.mode,
+                    "has_icc": "icc_profile" in img.info,
+                }
+        except Exception:
+            header = None
+
+        with self._lock:
+            self._header_cache[key] = header
+            while len(self._header_cache) > self.max_header_entries:
+                self._header_cache.popitem(last=False)
+        return header
+
+    def open_image(self, file_path):
+        """Open a PIL image from cached bytes, falling back to the file on disk for oversized files
+
+        Returns None if the file is missing or not a readable image.
+        """
+        try:
+            key = self.make_key(file_path)
+            if self.enabled and key[2] <= self.max_file_bytes:
+                return Image.open(io.BytesIO(self.get_bytes(file_path)))
+            return Image.open(file_path)
+        except OSError:
+            return None
+
+    def release(self, file_path):
+        """Drop cached bytes for a file once its last consumer is done (header stays cached)"""
+        with self._lock:
+            for key in [k for k in self._bytes_cache if k[0] == os.path.abspath(file_path)]:
+                self._current_bytes -= len(self._bytes_cache.pop(key))
+
+    def clear(self):
+        """Clear all cached bytes and headers"""
+        with self._lock:
+            self._bytes_cache.clear()
+            self._header_cache.clear()
+            self._current_bytes = 0
+
+    def get_stats(self):
+        """Get cache usage statistics"""
+        with self._lock:
+            return {
+                "entries": len(self._bytes_cache),
+                "headers": len(self._header_cache),
+                "bytes": self._current_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _evict_locked(self):
+        """Evict least recently used entries until under memory budget (lock must be held)"""
+        while self._bytes_cache and self._current_bytes > self.max_memory_bytes:
+            _, data = self._bytes_cache.popitem(last=False)
+            self._current_bytes -= len(data)
+
+
+# Shared instance used by the loader, item widgets and processor
+_input_cache = InputCache()
+
+
+def get_input_cache():
+    """Get the shared input cache instance"""
+    return _input_cache
@@ -0,0 +1,146 @@
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from PySide6.QtCore import QObject, QTimer, Qt
+from App.helpers import tracing
+
+# PIKSELCAT_LAG_MONITOR=1 turns the monitor on without editing the "lag_monitor" config section
+LAG_MONITOR_ENV = "PIKSELCAT_LAG_MONITOR"
+
+
+class LagMonitor(QObject):
+    """Measure Qt event-loop latency with a GUI-thread heartbeat and dump the GUI stack when it stalls
+
+    A precise timer ticks every interval on the GUI thread; how late each tick arrives is the
+    event-loop lag. A watchdog thread watches the last heartbeat and, while the loop is blocked
+    longer than the stall threshold, logs the GUI thread's Python stack (again at 2x, 4x, ...
+    the threshold so long stalls show where they spent their time).
+    """
+
+    def __init__(self, interval_ms=50, stall_threshold_ms=200, window=2000, log_path=None, parent=None):
+        super().__init__(parent)
+        self.interval = interval_ms / 1000
+        self.stall_threshold = stall_threshold_ms / 1000
+        self.log_path = log_path
+        self.gui_thread_id = threading.get_ident()
+        self.lock = threading.Lock()
+        self.lags = deque(maxlen=window)  # seconds each tick arrived late
+        self.stall_count = 0
+        self.longest_stall = 0.0
+        self.last_stall_at = None
+        self.last_tick = None
+        self.next_dump_after = self.stall_threshold
+        self.stop_event = threading.Event()
+        self.watchdog = None
+
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self.on_tick)
+
+    @classmethod
+    def from_config(cls, config_manager, parent=None):
+        """Create and start a monitor from the "lag_monitor" config section (None when disabled)"""
+        settings = config_manager.get("lag_monitor", {})
+        if not (os.environ.get(LAG_MONITOR_ENV) or settings.get("enabled", False)):
+            return None
+        log_path = settings.get("log_file", "lag_stalls.log")
+        if log_path and not os.path.isabs(log_path):
+            log_path = os.path.join(str(config_manager.base_dir), log_path)
+        monitor = cls(settings.get("interval_ms", 50), settings.get("stall_threshold_ms", 200),
+                      settings.get("window", 2000), log_path, parent)
+        monitor.start()
+        return monitor
+
+    def start(self):
+        """Start the heartbeat (the watchdog starts with the first tick, once the event loop runs)"""
+        self.timer.start(max(1, int(self.interval * 1000)))
+        print(f"Lag monitor started (stall threshold {self.stall_threshold * 1000:.0f} ms)")
+
+    def stop(self):
+        """Stop the heartbeat and the watchdog"""
+        self.timer.stop()
+        self.stop_event.set()
+
+    def on_tick(self):
+        """Heartbeat on the GUI thread - record how late it arrived"""
+        now = time.perf_counter()
+        if self.last_tick is None:
+            self.last_tick = now
+            self.watchdog = threading.Thread(target=self._watch, name="LagWatchdog", daemon=True)
+            self.watchdog.start()
+            return
+        lag = max(0.0, now - self.last_tick - self.interval)
+        with self.lock:
+            self.lags.append(lag)
+            self.last_tick = now
+            self.next_dump_after = self.stall_threshold
+            if lag >= self.stall_threshold:
+                self.stall_count += 1
+                self.longest_stall = max(self.longest_stall, lag)
+                self.last_stall_at = datetime.now()
+        if lag >= self.stall_threshold:
+            tracing.record("ui_stall", lag, category="gui")
+            self._log(f"UI thread stalled for {lag * 1000:.0f} ms")
+
+    def _watch(self):
+        """Watchdog thread - dump the GUI stack while the heartbeat is overdue"""
+        poll = max(0.01, self.stall_threshold / 4)
+        while not self.stop_event.wait(poll):
+            with self.lock:
+                blocked = time.perf_counter() - self.last_tick - self.interval
+                if blocked < self.next_dump_after:
+                    continue
+                self.next_dump_after *= 2
+            frame = sys._current_frames().get(self.gui_thread_id)
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame))
+            self._log(f"UI thread blocked for {blocked * 1000:.0f} ms so far, GUI stack:\n{stack}")
+
+    def _log(self, message):
+        """Print a timestamped message and append it to the stall log"""
+        line = f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]}] {message}"
+        print(line)
+        if not self.log_path:
+            return
+        try:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            print(f"Error writing lag log {self.log_path}: {e}")
+
+    def snapshot(self):
+        """Get lag percentiles (ms) and stall counts as a dict"""
+        with self.lock:
+            lags = sorted(self.lags)
+            stall_count, longest_stall, last_stall_at = self.stall_count, self.longest_stall, self.last_stall_at
+        last = len(lags) - 1
+        percentiles = {p: lags[min(last, int(round(p / 100 * last)))] * 1000 for p in (50, 95, 99)} if lags else {}
+        return {
+            "samples": len(lags),
+            "percentiles": percentiles,
+            "max": lags[-1] * 1000 if lags else 0.0,
+            "stall_count": stall_count,
+            "longest_stall": longest_stall * 1000,
+            "last_stall_at": last_stall_at,
+        }
+
+    @staticmethod
+    def format_snapshot(snapshot):
+        """Format a snapshot for the statistics panel"""
+        percentiles = snapshot["percentiles"]
+        if not percentiles:
+            return "Measuring event loop latency..."
+        lines = [
+            f"Event loop lag: p50 {percentiles[50]:.0f} ms, p95 {percentiles[95]:.0f} ms, "
+            f"p99 {percentiles[99]:.0f} ms, max {snapshot['max']:.0f} ms",
+            f"Stalls: {snapshot['stall_count']}",
+        ]
+        if snapshot["stall_count"]:
+            lines[-1] += (f", longest {snapshot['longest_stall']:.0f} ms, "
+                          f"last at {snapshot['last_stall_at'].strftime('%H:%M:%S')}")
+        return "\n".join(lines)
@@ -0,0 +1,163 @@
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from PIL import Image, ImageOps
+
+# Runs inside worker processes - keep this module free of Qt imports
+
+
+def matte_flat_background(file_path, low_threshold=12, high_threshold=40, working_size=512, band_rows=256):
+    """Remove a flat studio background locally
+
+    NumPy work runs in bands of rows so a worker never holds more than the decoded image,
+    its alpha plane and one band of distances, whatever the resolution.
+
+    Returns:
+        tuple: (confidence 0-1, PNG bytes or None)
+    """
+    with Image.open(file_path) as img:
+        img.load()
+        icc_profile = img.info.get("icc_profile")
+        # Cut out in display orientation, the way the API returns rotated photos
+        rgb = ImageOps.exif_transpose(img).convert("RGB")
+
+    width, height = rgb.size
+    if height < 16 or width < 16:
+        return 0.0, None
+
+    # Backdrop colour and how uniform the outermost pixels are
+    border = np.concatenate([np.asarray(rgb.crop(box), dtype=np.int16).reshape(-1, 3) for box in
+                             ((0, 0, width, 1), (0, height - 1, width, height), (0, 0, 1, height), (width - 1, 0, width, height))])
+    backdrop = np.round(np.median(border, axis=0)).astype(np.int16)
+    border_distance = np.abs(border - backdrop).max(axis=1)
+    border_flatness = float(np.mean(border_distance <= low_threshold))
+    if border_flatness < 0.9:
+        return 0.0, None
+
+    def distance_bands():
+        for top in range(0, height, band_rows):
+            band = np.asarray(rgb.crop((0, top, width, min(height, top + band_rows))), dtype=np.int16)
+            yield top, np.abs(band - backdrop).max(axis=2)
+
+    # Only backdrop connected to the image border is removed, so white parts of the product stay opaque
+    step = max(1, int(np.ceil(max(height, width) / working_size)))
+    band_rows = max(step, band_rows - band_rows % step)  # bands hold whole reduced cells
+    region = _connected_background(
+        np.concatenate([_reduce_candidate(distance <= high_threshold, step) for _, distance in distance_bands()]))
+
+    # Soft alpha ramp on the connected backdrop, opaque everywhere else
+    alpha = np.empty((height, width), dtype=np.uint8)
+    flat_background = fringe = 0
+    ramp = 255.0 / max(1, high_threshold - low_threshold)
+    for top, distance in distance_bands():
+        background = distance <= high_threshold
+        # Edge cells not covered by the reduced grid count as background candidates
+        cells = region[top // step:(top + distance.shape[0]) // step]
+        full = np.repeat(np.repeat(cells, step, axis=0), step, axis=1)
+        background[:full.shape[0], :full.shape[1]] &= full
+        flat_background += int(np.count_nonzero(background & (distance <= low_threshold)))
+        fringe += int(np.count_nonzero(background & (distance > low_threshold)))
+        soft_alpha = np.clip((distance - low_threshold) * ramp, 0, 255).astype(np.uint8)
+        alpha[top:top + distance.shape[0]] = np.where(background, soft_alpha, 255)
+
+    confidence = _get_confidence(border_flatness, width * height, flat_background, fringe)
+    if confidence <= 0:
+        return confidence, None
+
+    rgb.putalpha(Image.fromarray(alpha, "L"))
+    output = io.BytesIO()
+    rgb.save(output, "PNG", icc_profile=icc_profile) if icc_profile else rgb.save(output, "PNG")
+    return confidence, output.getvalue()
+
+
+def _reduce_candidate(candidate, step):
+    """Reduce a band of the candidate mask to grid cells (a cell is a candidate only if all of its pixels are)"""
+    height, width = candidate.shape
+    if step == 1:
+        return candidate
+    small = candidate[:height - height % step, :width - width % step]
+    return small.reshape(small.shape[0] // step, step, small.shape[1] // step, step).all(axis=(1, 3))
+
+
+def _connected_background(small):
+    """Grow the background region from the border through candidate cells of the reduced grid"""
+    region = np.zeros_like(small)
+    if not small.size:
+        return region
+    region[0, :], region[-1, :], region[:, 0], region[:, -1] = small[0, :], small[-1, :], small[:, 0], small[:, -1]
+
+    # Morphological reconstruction: dilate the seed inside the candidate mask until it stops growing
+    while True:
+        grown = region.copy()
+        grown[1:, :] |= region[:-1, :]
+        grown[:-1, :] |= region[1:, :]
+        grown[:, 1:] |= region[:, :-1]
+        grown[:, :-1] |= region[:, 1:]
+        grown &= small
+        if np.array_equal(grown, region):
+            return region
+        region = grown
+
+
+def _get_confidence(border_flatness, total, flat_background, fringe):
+    """Score how safely the image can be cut out locally from backdrop pixel counts"""
+    foreground_ratio = 1.0 - flat_background / max(1, total)
+    # Semi-transparent fringe pixels relative to the subject - large fringes mean soft or busy edges
+    fringe_ratio = fringe / max(1, total * foreground_ratio)
+
+    if foreground_ratio < 0.01 or foreground_ratio > 0.95:
+        return 0.0
+    flatness_score = max(0.0, (border_flatness - 0.9) / 0.1)
+    fringe_score = max(0.0, 1.0 - fringe_ratio / 0.25)
+    return min(flatness_score, fringe_score)
+
+
+class LocalMatting:
+    """Cut out flat-background images on local CPU processes, leaving the rest for the API"""
+
+    def __init__(self, min_confidence=0.85, workers=0, low_threshold=12, high_threshold=40, working_size=512):
+        self.min_confidence = min_confidence
+        self.low_threshold = low_threshold
+        self.high_threshold = high_threshold
+        self.working_size = working_size
+        # Processes instead of threads - the NumPy passes would otherwise hold up the GUI and upload threads
+        self.pool = ProcessPoolExecutor(max_workers=workers or max(1, (os.cpu_count() or 2) - 1))
+
+    @classmethod
+    def from_config(cls, settings, action):
+        """Create local matting from the "local_matting" config section, None if it doesn't apply to the action"""
+        settings = settings or {}
+        if not settings.get("enabled", False) or action not in settings.get("actions", ["Remove Bg"]):
+            return None
+        return cls(
+            min_confidence=settings.get("min_confidence", 0.85),
+            workers=settings.get("workers", 0),
+            low_threshold=settings.get("low_threshold", 12),
+            high_threshold=settings.get("high_threshold", 40),
+            working_size=settings.get("max_working_size", 512)
+        )
+
+    def try_file(self, file_path):
+        """Cut out a file locally if confident enough
+
+        Returns:
+            bytes: PNG result, None to send the file to the API
+        """
+        try:
+            future = self.pool.submit(matte_flat_background, file_path, self.low_threshold,
+                                      self.high_threshold, self.working_size)
+            confidence, png_bytes = future.result()
+        except Exception as e:
+            print(f"Local matting failed for {file_path}: {e}")
+            return None
+
+        if png_bytes is None or confidence < self.min_confidence:
+            print(f"Local matting confidence {confidence:.2f} too low, using API: {file_path}")
+            return None
+        print(f"Background removed locally (confidence {confidence:.2f}): {file_path}")
+        return png_bytes
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,260 @@
+import struct
+import zlib
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+EXIF_HEADER = b"Exif\x00\x00"
+ICC_HEADER = b"ICC_PROFILE\x00"
+MAX_JPEG_SEGMENT = 65533  # segment payload limit (length field includes its own 2 bytes)
+ORIENTATION_TAG = 0x0112
+
+
+def read_metadata(file_path):
+    """Read the raw ICC profile and EXIF (TIFF) block of a PNG, JPEG or WebP file without decoding pixels
+
+    Returns:
+        tuple: (icc_profile bytes or None, exif bytes or None)
+    """
+    with open(file_path, "rb") as f:
+        head = f.read(12)
+        f.seek(0)
+        if head.startswith(PNG_SIGNATURE):
+            return _read_png_metadata(f)
+        if head.startswith(b"\xff\xd8"):
+            return _read_jpeg_metadata(f)
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            return _read_webp_metadata(f)
+    return None, None
+
+
+def _read_png_metadata(f):
+    """Walk PNG chunk headers, reading only iCCP and eXIf payloads"""
+    icc, exif = None, None
+    f.seek(len(PNG_SIGNATURE))
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            break
+        length, chunk_type = struct.unpack(">I4s", header)
+        if chunk_type == b"iCCP":
+            data = f.read(length)
+            # Profile name, null separator, compression method byte, zlib data
+            name_end = data.index(b"\x00")
+            icc = zlib.decompress(data[name_end + 2:])
+            f.seek(4, 1)
+        elif chunk_type == b"eXIf":
+            exif = f.read(length)
+            f.seek(4, 1)
+        elif chunk_type == b"IEND":
+            break
+        else:
+            f.seek(length + 4, 1)
+    return icc, exif
+
+
+def _read_jpeg_metadata(f):
+    """Walk JPEG marker segments up to the image data, collecting APP1 Exif and APP2 ICC segments"""
+    icc_parts, exif = {}, None
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF or marker[1] in (0xD9, 0xDA):
+            break
+        length = struct.unpack(">H", f.read(2))[0]
+        if marker[1] in (0xE1, 0xE2):
+            data = f.read(length - 2)
+            if marker[1] == 0xE1 and data.startswith(EXIF_HEADER):
+                exif = data[len(EXIF_HEADER):]
+            elif marker[1] == 0xE2 and data.startswith(ICC_HEADER):
+                # Large profiles are split over several segments, numbered from 1
+                icc_parts[data[len(ICC_HEADER)]] = data[len(ICC_HEADER) + 2:]
+        else:
+            f.seek(length - 2, 1)
+    icc = b"".join(icc_parts[i] for i in sorted(icc_parts)) if icc_parts else None
+    return icc, exif
+
+
+def _read_webp_metadata(f):
+    """Walk RIFF chunks, reading only ICCP and EXIF payloads"""
+    icc, exif = None, None
+    f.seek(12)
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            break
+        chunk_type, length = struct.unpack("<4sI", header)
+        padded = length + (length & 1)
+        if chunk_type == b"ICCP":
+            icc = f.read(length)
+            f.seek(padded - length, 1)
+        elif chunk_type == b"EXIF":
+            exif = f.read(length)
+            if exif.startswith(EXIF_HEADER):
+                exif = exif[len(EXIF_HEADER):]
+            f.seek(padded - length, 1)
+        else:
+            f.seek(padded, 1)
+    return icc, exif
+
+
+def reset_orientation(exif):
+    """Set the EXIF Orientation tag to 1 (upright) by patching the TIFF bytes"""
+    if len(exif) < 8 or exif[:2] not in (b"II", b"MM"):
+        return exif
+    order = "<" if exif[:2] == b"II" else ">"
+    data = bytearray(exif)
+    try:
+        ifd_offset = struct.unpack_from(order + "I", data, 4)[0]
+        count = struct.unpack_from(order + "H", data, ifd_offset)[0]
+        for index in range(count):
+            entry = ifd_offset + 2 + index * 12
+            tag, tag_type = struct.unpack_from(order + "HH", data, entry)
+            if tag == ORIENTATION_TAG and tag_type == 3:  # SHORT
+                struct.pack_into(order + "H", data, entry + 8, 1)
+                break
+    except struct.error:
+        return exif
+    return bytes(data)
+
+
+def _png_chunk(chunk_type, data):
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(chunk_type + data) & 0xFFFFFFFF)
+
+
+def _splice_png(data, icc, exif):
+    """Insert iCCP/eXIf chunks after IHDR, replacing the output's own colour and EXIF chunks"""
+    replaced = {b"eXIf"} if exif else set()
+    if icc:
+        replaced |= {b"iCCP", b"sRGB"}  # iCCP and sRGB must not both be present
+    chunks = []
+    pos = len(PNG_SIGNATURE)
+    while pos < len(data):
+        length, chunk_type = struct.unpack_from(">I4s", data, pos)
+        end = pos + 12 + length
+        if chunk_type not in replaced:
+            chunks.append(data[pos:end])
+        if chunk_type == b"IHDR":
+            if icc:
+                chunks.append(_png_chunk(b"iCCP", b"ICC Profile\x00\x00" + zlib.compress(icc)))
+            if exif:
+                chunks.append(_png_chunk(b"eXIf", exif))
+        pos = end
+    return PNG_SIGNATURE + b"".join(chunks)
+
+
+def _splice_jpeg(data, icc, exif):
+    """Insert APP1 Exif/APP2 ICC segments after SOI (and JFIF APP0), replacing the output's own"""
+    segments = []
+    if exif and len(EXIF_HEADER) + len(exif) <= MAX_JPEG_SEGMENT:
+        segments.append(b"\xff\xe1" + struct.pack(">H", len(EXIF_HEADER) + len(exif) + 2) + EXIF_HEADER + exif)
+    if icc:
+        part_size = MAX_JPEG_SEGMENT - len(ICC_HEADER) - 2
+        parts = [icc[i:i + part_size] for i in range(0, len(icc), part_size)]
+        for number, part in enumerate(parts, 1):
+            payload = ICC_HEADER + bytes([number, len(parts)]) + part
+            segments.append(b"\xff\xe2" + struct.pack(">H", len(payload) + 2) + payload)
+
+    kept, pos, insert_at = [], 2, 0
+    while pos + 4 <= len(data) and data[pos] == 0xFF and data[pos + 1] not in (0xD9, 0xDA):
+        length = struct.unpack_from(">H", data, pos + 2)[0]
+        segment = data[pos:pos + 2 + length]
+        payload = segment[4:]
+        if not ((exif and data[pos + 1] == 0xE1 and payload.startswith(EXIF_HEADER)) or
+                (icc and data[pos + 1] == 0xE2 and payload.startswith(ICC_HEADER))):
+            kept.append(segment)
+            if data[pos + 1] == 0xE0 and len(kept) == 1:
+                insert_at = 1
+        pos += 2 + length
+    kept[insert_at:insert_at] = segments
+    return b"\xff\xd8" + b"".join(kept) + data[pos:]
+
+
+def _webp_canvas(chunks):
+    """Get (width, height, has_alpha) from a simple-format WebP bitstream chunk"""
+    for chunk_type, payload in chunks:
+        if chunk_type == b"VP8 ":
+            width, height = struct.unpack_from("<HH", payload, 6)
+            return width & 0x3FFF, height & 0x3FFF, False
+        if chunk_type == b"VP8L":
+            bits = struct.unpack_from("<I", payload, 1)[0]
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1, bool(bits >> 28 & 1)
+    return None
+
+
+def _splice_webp(data, icc, exif):
+    """Insert ICCP/EXIF chunks, converting a simple WebP to the extended (VP8X) format when needed"""
+    chunks, pos = [], 12
+    while pos + 8 <= len(data):
+        chunk_type, length = struct.unpack_from("<4sI", data, pos)
+        chunks.append((chunk_type, data[pos + 8:pos + 8 + length]))
+        pos += 8 + length + (length & 1)
+
+    vp8x = next((payload for chunk_type, payload in chunks if chunk_type == b"VP8X"), None)
+    if vp8x is None:
+        canvas = _webp_canvas(chunks)
+        if not canvas:
+            return data
+        width, height, has_alpha = canvas
+        vp8x = bytes([0x10 if has_alpha else 0, 0, 0, 0]) + (width - 1).to_bytes(3, "little") + (height - 1).to_bytes(3, "little")
+    flags = vp8x[0] | (0x20 if icc else 0) | (0x08 if exif else 0)
+
+    # Chunk order: VP8X, ICCP, image data, EXIF
+    body = [(b"VP8X", bytes([flags]) + vp8x[1:])]
+    if icc:
+        body.append((b"ICCP", icc))
+    body += [(t, p) for t, p in chunks if t != b"VP8X" and not (icc and t == b"ICCP") and not (exif and t == b"EXIF")]
+    if exif:
+        body.append((b"EXIF", exif))
+
+    payload = b"".join(t + struct.pack("<I", len(p)) + p + (b"\x00" if len(p) & 1 else b"") for t, p in body)
+    return b"RIFF" + struct.pack("<I", len(payload) + 4) + b"WEBP" + payload
+
+
+class MetadataSplicer:
+    """Copy ICC and EXIF metadata from inputs into result containers at byte level"""
+
+    def __init__(self, copy_icc=True, copy_exif=True, normalize_orientation=True):
+        self.copy_icc = copy_icc
+        self.copy_exif = copy_exif
+        self.normalize_orientation = normalize_orientation
+
+    @classmethod
+    def from_config(cls, settings):
+        """Create splicer from the "metadata_splice" config section, None when disabled"""
+        settings = settings or {}
+        if not settings.get("enabled", False):
+            return None
+        return cls(
+            copy_icc=settings.get("icc", True),
+            copy_exif=settings.get("exif", True),
+            normalize_orientation=settings.get("normalize_orientation", True)
+        )
+
+    def splice(self, source_path, data):
+        """Return result bytes carrying the source's metadata (unchanged if there is none or the format is unknown)"""
+        try:
+            icc, exif = read_metadata(source_path)
+            icc = icc if self.copy_icc else None
+            exif = exif if self.copy_exif else None
+            if exif and self.normalize_orientation:
+                # Results come back with the rotation already applied to the pixels
+                exif = reset_orientation(exif)
+            if not icc and not exif:
+                return data
+            if data.startswith(PNG_SIGNATURE):
+                return _splice_png(data, icc, exif)
+            if data.startswith(b"\xff\xd8"):
+                return _splice_jpeg(data, icc, exif)
+            if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+                return _splice_webp(data, icc, exif)
+        except Exception as e:
+            print(f"Metadata splice failed for {source_path}: {e}")
+        return data
+
+    def splice_file(self, source_path, output_path):
+        """Splice the source's metadata into an already written result file"""
+        with open(output_path, "rb") as f:
+            data = f.read()
+        spliced = self.splice(source_path, data)
+        if spliced is not data:
+            with open(output_path, "wb") as f:
+                f.write(spliced)
@@ -0,0 +1,102 @@
+import os
+import mmap
+import uuid
+
+
+class MultipartStream:
+    """Streaming multipart/form-data body that reads the file part in chunks
+
+    The file part comes from a memory map (or from bytes already in memory), so a
+    large input is never copied whole into Python memory. Each chunk is paced by an
+    optional bandwidth limiter and reported to an optional progress callback.
+    """
+
+    def __init__(self, fields, file_field, file_source, filename="file",
+                 content_type="application/octet-stream", limiter=None, progress_callback=None,
+                 chunk_size=64 * 1024):
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self.limiter = limiter
+        self.progress_callback = progress_callback
+        self.chunk_size = chunk_size
+
+        self._file = None
+        self._mmap = None
+        if isinstance(file_source, (bytes, bytearray, memoryview)):
+            self.payload = memoryview(file_source)
+        else:
+            self._file = open(file_source, 'rb')
+            if os.fstat(self._file.fileno()).st_size:
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                self.payload = self._mmap
+            else:
+                self.payload = b""  # mmap can't map empty files
+
+        preamble = []
+        for name, value in fields:
+            preamble.append(
+                f"--{self.boundary}\r\n"
+                f"Content-Disposition: form-data; name=\"{name}\"\r\n\r\n"
+                f"{value}\r\n"
+            )
+        preamble.append(
+            f"--{self.boundary}\r\n"
+            f"Content-Disposition: form-data; name=\"{file_field}\"; filename=\"{filename}\"\r\n"
+            f"Content-Type: {content_type}\r\n\r\n"
+        )
+        self.parts = [
+            "".join(preamble).encode('utf-8'),
+            self.payload,
+            f"\r\n--{self.boundary}--\r\n".encode('utf-8'),
+        ]
+        self.total = sum(len(part) for part in self.parts)
+        self.sent = 0
+        self._part_index = 0
+        self._part_offset = 0
+
+    def __len__(self):
+        # Lets requests send a Content-Length header instead of chunked encoding
+        return self.total
+
+    def read(self, size=-1):
+        """Read the next chunk of the body"""
+        if size is None or size < 0:
+            size = self.chunk_size
+
+        while self._part_index < len(self.parts):
+            part = self.parts[self._part_index]
+            if self._part_offset < len(part):
+                chunk = bytes(part[self._part_offset:self._part_offset + size])
+                self._part_offset += len(chunk)
+                if self.limiter:
+                    self.limiter.throttle_upload(len(chunk))
+                self.sent += len(chunk)
+                if self.progress_callback:
+                    self.progress_callback(self.sent, self.total)
+                return chunk
+            self._part_index += 1
+            self._part_offset = 0
+
+        return b""
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(self.chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+    def close(self):
+        """Release the memory map and file handle"""
+        if self._mmap:
+            self._mmap.close()
+            self._mmap = None
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,32 @@
+from PySide6.QtCore import QThread, Signal
+from App.helpers.perceptual_hash import find_near_duplicates
+
+
+class NearDuplicateWorker(QThread):
+    """Worker thread that clusters visually near-identical images by perceptual hash"""
+    progress_updated = Signal(int, int)  # hashed files, total files
+    clusters_found = Signal(list)        # lists of similar file paths, first one is kept
+
+    def __init__(self, files, max_distance=6):
+        super().__init__()
+        self.files = list(files)
+        self.max_distance = max_distance
+        self.cancelled = False
+
+    def run(self):
+        """Hash all files and emit the near-duplicate clusters"""
+        try:
+            clusters = find_near_duplicates(
+                self.files,
+                self.max_distance,
+                lambda: self.cancelled,
+                lambda done, total: self.progress_updated.emit(done, total)
+            )
+            if not self.cancelled:
+                self.clusters_found.emit(clusters)
+        except Exception as e:
+            print(f"Near-duplicate analysis error: {e}")
+
+    def cancel(self):
+        """Cancel the analysis"""
+        self.cancelled = True
@@ -0,0 +1,106 @@
+import os
+import hashlib
+from urllib.parse import urlparse
+from App.helpers.url_source import is_url
+
+
+class OutputLayoutPlanner:
+    """Precompute output paths for a batch using a selectable directory layout"""
+
+    # Supported layouts:
+    #   flat   - everything directly in the output folder (original behaviour)
+    #   mirror - recreate the input folder tree below the output folder
+    #   hash   - shard into hash-named subdirectories (e.g. ab/cd/)
+    #   bucket - fixed-size numbered buckets (e.g. 0000/, 0001/)
+    LAYOUTS = ("flat", "mirror", "hash", "bucket")
+
+    def __init__(self, output_folder, layout="flat", hash_levels=2, bucket_size=1000, keep_existing=False):
+        self.output_folder = output_folder
+        self.layout = layout if layout in self.LAYOUTS else "flat"
+        self.hash_levels = max(1, int(hash_levels))
+        self.bucket_size = max(1, int(bucket_size))
+        # Reruns replace earlier outputs unless files already on disk are kept (new ones get a counter suffix)
+        self.keep_existing = keep_existing
+
+    @classmethod
+    def from_config(cls, output_folder, settings):
+        """Create planner from the "output_layout" config section"""
+        settings = settings or {}
+        return cls(
+            output_folder,
+            layout=settings.get("mode", "flat"),
+            hash_levels=settings.get("hash_levels", 2),
+            bucket_size=settings.get("bucket_size", 1000),
+            keep_existing=settings.get("keep_existing", False)
+        )
+
+    def plan(self, files, name_func):
+        """Return {input_file: output_path} for all files with collisions already resolved
+
+        Args:
+            files: Input file paths in batch order
+            name_func: Callable returning the output file name for an input path
+        """
+        common_root = self._get_common_root(files) if self.layout == "mirror" else None
+        used_paths = set()
+        output_paths = {}
+
+        for index, file_path in enumerate(files):
+            subdir = self._get_subdir(file_path, index, common_root)
+            output_path = os.path.join(self.output_folder, subdir, name_func(file_path))
+            output_path = self._resolve_collision(os.path.normpath(output_path), used_paths)
+            used_paths.add(os.path.normcase(output_path))
+            output_paths[file_path] = output_path
+
+        return output_paths
+
+    def create_directories(self, output_paths):
+        """Create every output directory once up front instead of per file"""
+        for directory in {os.path.dirname(path) for path in output_paths.values()}:
+            os.makedirs(directory, exist_ok=True)
+
+    def _get_subdir(self, file_path, index, common_root):
+        """Get the relative output subdirectory for one input file"""
+        if self.layout == "mirror" and is_url(file_path):
+            # Hosted images mirror as <host>/<url folders>
+            parsed = urlparse(file_path)
+            parts = [parsed.netloc.replace(":", "_")] + [p for p in os.path.dirname(parsed.path).split("/") if p not in ("", ".", "..")]
+            return os.path.join(*parts)
+        elif self.layout == "mirror" and common_root:
+            relative_dir = os.path.relpath(os.path.dirname(os.path.abspath(file_path)), common_root)
+            return "" if relative_dir == "." else relative_dir
+        elif self.layout == "hash":
+            # Hash the full input path so files spread evenly regardless of their names
+            digest = hashlib.sha1(os.path.abspath(file_path).encode('utf-8', 'surrogatepass')).hexdigest()
+            return os.path.join(*[digest[i * 2:i * 2 + 2] for i in range(self.hash_levels)])
+        elif self.layout == "bucket":
+            return f"{index // self.bucket_size:04d}"
+        return ""
+
+    def _get_common_root(self, files):
+        """Get the deepest folder shared by all inputs"""
+        folders = [os.path.dirname(os.path.abspath(f)) for f in files if not is_url(f)]
+        if not folders:
+            return None
+        try:
+            return os.path.commonpath(folders)
+        except ValueError:
+            # Inputs on different drives - no shared root, fall back to flat
+            return None
+
+    def _resolve_collision(self, output_path, used_paths):
+        """Append a counter to the file name until the path is unique within the batch (and not on disk with keep_existing)"""
+        if not self._is_taken(output_path, used_paths):
+            return output_path
+
+        base, ext = os.path.splitext(output_path)
+        counter = 1
+        while self._is_taken(f"{base}_{counter}{ext}", used_paths):
+            counter += 1
+        return f"{base}_{counter}{ext}"
+
+    def _is_taken(self, output_path, used_paths):
+        """Check whether a path is planned for another file, or kept from an earlier run"""
+        if os.path.normcase(output_path) in used_paths:
+            return True
+        return self.keep_existing and os.path.exists(output_path)
@@ -0,0 +1,102 @@
+import io
+import numpy as np
+from PIL import Image
+
+
+class OutputQA:
+    """Check downloaded results for degenerate output before they are written"""
+
+    # Content rejections (coverage, unchanged, size) come back the same on a retry - only bad transfers are retried
+    DECODE_FAILED = "result does not decode"
+
+    def __init__(self, check_alpha=False, min_coverage=0.002, max_coverage=0.998, alpha_threshold=8,
+                 size_tolerance=0.02, identical_threshold=0.5, sample_size=128, max_retries=1):
+        self.check_alpha = check_alpha
+        self.min_coverage = min_coverage
+        self.max_coverage = max_coverage
+        self.alpha_threshold = alpha_threshold
+        self.size_tolerance = size_tolerance
+        self.identical_threshold = identical_threshold
+        self.sample_size = sample_size
+        self.max_retries = max_retries
+
+    @classmethod
+    def from_config(cls, settings, action):
+        """Create QA from the "output_qa" config section, None when disabled"""
+        settings = settings or {}
+        if not settings.get("enabled", True):
+            return None
+        return cls(
+            check_alpha=action in settings.get("alpha_actions", ["Remove Bg"]),
+            min_coverage=settings.get("min_coverage", 0.002),
+            max_coverage=settings.get("max_coverage", 0.998),
+            alpha_threshold=settings.get("alpha_threshold", 8),
+            size_tolerance=settings.get("size_tolerance", 0.02),
+            identical_threshold=settings.get("identical_threshold", 0.5),
+            sample_size=settings.get("sample_size", 128),
+            max_retries=settings.get("max_retries", 1)
+        )
+
+    def check(self, data, source=None, expected_size=None):
+        """Check result bytes
+
+        Args:
+            data (bytes): Downloaded result
+            source (str): Uploaded file to compare against, None to skip the unchanged check
+            expected_size (tuple): Expected (width, height), None to skip the size check
+
+        Returns:
+            str: Reason the result was rejected, None if it looks fine
+        """
+        try:
+            # load() fails on truncated data that open() alone accepts
+            with Image.open(io.BytesIO(data)) as img:
+                img.load()
+                size = img.size
+                has_alpha = img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info
+                sample = self._get_sample(img)
+        except Exception as e:
+            return f"{self.DECODE_FAILED} ({e})"
+
+        if expected_size and not self._size_matches(size, expected_size):
+            return f"result is {size[0]}x{size[1]}, expected {expected_size[0]}x{expected_size[1]}"
+
+        if self.check_alpha:
+            if not has_alpha:
+                return "result has no transparency"
+            coverage = float(np.mean(sample[..., 3] > self.alpha_threshold))
+            if coverage < self.min_coverage:
+                return "result is fully transparent"
+            if coverage > self.max_coverage:
+                return "no background was removed"
+
+        if source and self._is_unchanged(sample, size, source):
+            return "result is identical to the input"
+        return None
+
+    def is_retryable(self, reason):
+        """Check whether a rejection is worth a paid retry"""
+        return reason.startswith(self.DECODE_FAILED)
+
+    def _get_sample(self, img):
+        """Small RGBA array of an image for the coverage and unchanged checks"""
+        # Shrink in the source mode first - converting the full-resolution result to RGBA is the expensive part
+        sample = img.resize((self.sample_size, self.sample_size), Image.Resampling.BILINEAR, reducing_gap=2.0)
+        return np.asarray(sample.convert("RGBA"), dtype=np.int16)
+
+    def _size_matches(self, size, expected_size):
+        """Compare sizes with a relative tolerance, allowing a 90-degree rotation (EXIF orientation applied)"""
+        def close(a, b):
+            return all(abs(x - y) <= max(2, y * self.size_tolerance) for x, y in zip(a, b))
+        return close(size, expected_size) or close(size, expected_size[::-1])
+
+    def _is_unchanged(self, sample, size, source):
+        """Check whether the result looks the same as the uploaded image (same size only - upscales are caught by the size check)"""
+        try:
+            with Image.open(source) as img:
+                if img.size != size:
+                    return False
+                source_sample = self._get_sample(img)
+        except Exception:
+            return False
+        return float(np.abs(sample - source_sample).mean()) < self.identical_threshold
@@ -0,0 +1,146 @@
+import numpy as np
+from PIL import Image
+
+
+HASH_SIZE = 8  # 8x8 difference bits -> 64-bit hash
+
+
+def load_hash_pixels(file_path):
+    """Decode an image straight to the (8, 9) grayscale thumbnail dHash needs"""
+    with Image.open(file_path) as img:
+        # JPEG decoders can skip most of the work when only a tiny grayscale image is needed
+        img.draft('L', (HASH_SIZE * 8, HASH_SIZE * 8))
+        small = img.convert('L').resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.BILINEAR)
+        return np.asarray(small, dtype=np.int16)
+
+
+def dhash_batch(pixels):
+    """Compute dHashes for a stack of (N, 8, 9) thumbnails at once, returning (N,) uint64"""
+    bits = pixels[:, :, 1:] > pixels[:, :, :-1]
+    packed = np.packbits(bits.reshape(len(pixels), HASH_SIZE * HASH_SIZE), axis=1)
+    return np.ascontiguousarray(packed).view('>u8').ravel().astype(np.uint64)
+
+
+def popcount(values):
+    """Count set bits of every uint64 in an array"""
+    values = np.ascontiguousarray(values, dtype=np.uint64)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    shape = values.shape
+    bits = np.unpackbits(values.reshape(-1, 1).view(np.uint8), axis=1)
+    return bits.sum(axis=1).reshape(shape)
+
+
+class _UnionFind:
+    """Disjoint sets over 0..n-1 with path halving"""
+
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, item):
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+
+def cluster_hashes(hashes, max_distance, block_size=1024):
+    """Cluster hashes that are within `max_distance` differing bits of each other
+
+    Uses multi-index hashing instead of comparing all pairs: the 64 bits are split
+    into max_distance + 1 bands, and by the pigeonhole principle two hashes within
+    the distance agree exactly on at least one band. Only hashes sharing a band
+    value are compared, with vectorized XOR + popcount per bucket.
+
+    Returns:
+        list: Cluster id for every input hash (equal ids = near-duplicates)
+    """
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    unique, inverse = np.unique(hashes, return_inverse=True)
+    sets = _UnionFind(len(unique))
+
+    band_count = max(1, min(int(max_distance) + 1, 64))
+    band_edges = np.linspace(0, 64, band_count + 1).astype(int)
+
+    for band_start, band_end in zip(band_edges[:-1], band_edges[1:]):
+        mask = np.uint64((1 << int(band_end - band_start)) - 1)
+        keys = (unique >> np.uint64(band_start)) & mask
+
+        order = np.argsort(keys, kind='stable')
+        _, starts, counts = np.unique(keys[order], return_index=True, return_counts=True)
+
+        for start, count in zip(starts[counts > 1], counts[counts > 1]):
+            bucket = order[start:start + count]
+            bucket_hashes = unique[bucket]
+            # Compare in blocks so one huge bucket can't allocate a giant distance matrix
+            for offset in range(0, len(bucket), block_size):
+                block = bucket[offset:offset + block_size]
+                distances = popcount(unique[block][:, None] ^ bucket_hashes[None, :])
+                rows, cols = np.nonzero(distances <= max_distance)
+                for a, b in zip(block[rows], bucket[cols]):
+                    if a < b:
+                        sets.union(int(a), int(b))
+
+    return [sets.find(int(index)) for index in inverse]
+
+
+def split_by_representative(members, hashes, max_distance):
+    """Split a cluster into groups whose members are all within `max_distance` of the group's first member
+
+    Single linkage chains A~B~C into one cluster even when A and C are far apart; here each
+    member (in batch order) joins the nearest earlier representative in range or starts a group.
+
+    Returns:
+        list: Groups (lists of two or more indices into `hashes`), representative first
+    """
+    groups = []
+    for index in members:
+        if groups:
+            distances = popcount(hashes[[group[0] for group in groups]] ^ hashes[index])
+            nearest = int(np.argmin(distances))
+            if distances[nearest] <= max_distance:
+                groups[nearest].append(index)
+                continue
+        groups.append([index])
+    return [group for group in groups if len(group) > 1]
+
+
+def find_near_duplicates(files, max_distance=6, is_cancelled=None, progress_callback=None):
+    """Find clusters of visually near-identical images
+
+    Returns:
+        list: Clusters (lists of two or more file paths) in batch order; the first file of each is the one to keep
+    """
+    thumbnails = []
+    hashed_files = []
+    total = len(files)
+    for index, file_path in enumerate(files):
+        if is_cancelled and is_cancelled():
+            return []
+        try:
+            thumbnails.append(load_hash_pixels(file_path))
+            hashed_files.append(file_path)
+        except Exception as e:
+            print(f"Perceptual hash failed for {file_path}: {e}")
+        if progress_callback and (index + 1) % 100 == 0:
+            progress_callback(index + 1, total)
+
+    if len(hashed_files) < 2:
+        return []
+
+    hashes = dhash_batch(np.stack(thumbnails))
+    components = {}
+    for index, cluster_id in enumerate(cluster_hashes(hashes, max_distance)):
+        components.setdefault(cluster_id, []).append(index)
+
+    # Every excludable file must be near the file that is kept, not just chained to it
+    groups = [group for members in components.values() if len(members) > 1
+              for group in split_by_representative(members, hashes, max_distance)]
+    groups.sort(key=lambda group: group[0])
+    return [[hashed_files[index] for index in group] for group in groups]
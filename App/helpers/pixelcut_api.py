@@ -2,6 +2,7 @@ import requests
 import json
 import time
 from PySide6.QtCore import QObject, Signal, QThread, QMutex, QTimer
+from App.helpers import profiling
 
 class PixelcutApiWorker(QThread):
     """Worker thread for Pixelcut API calls with rate limiting"""
@@ -12,6 +13,7 @@ class PixelcutApiWorker(QThread):
         super().__init__()
         self.config_manager = config_manager
         
+    @profiling.profiled_thread("api")
     def run(self):
         """Fetch credits from Pixelcut API with rate limiting"""
         try:
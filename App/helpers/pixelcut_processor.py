@@ -2,12 +2,35 @@ import requests
 import json
 import os
 import time
+import threading
+import queue
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from PySide6.QtCore import QThread, Signal
-from pathlib import Path
+from App.helpers.input_cache import get_input_cache
+from App.helpers.output_layout import OutputLayoutPlanner
+from App.helpers.preflight import PreflightValidator
+from App.helpers.bandwidth_limiter import BandwidthLimiter
+from App.helpers.multipart_stream import MultipartStream
+from App.helpers.ranged_downloader import RangedDownloader
+from App.helpers.action_registry import ActionRegistry
+from App.helpers.http_session import get_http_session, ensure_pool_size
+from App.helpers.url_source import is_url, get_image_extension
+from App.helpers.duplicate_finder import fan_out
+from App.helpers.upscale_policy import UpscalePolicy
+from App.helpers.subject_crop import SubjectCropper
+from App.helpers.local_matting import LocalMatting
+from App.helpers.alpha_prefilter import AlphaPrefilter
+from App.helpers.output_qa import OutputQA
+from App.helpers.metadata_splice import MetadataSplicer
+from App.helpers.run_metrics import RunMetrics
+from App.helpers.run_history import RunHistory
+from App.helpers.eta_model import EtaModel
+from App.helpers import tracing, profiling
 
 
 class PixelcutProcessorWorker(QThread):
-    """Worker thread for Pixelcut remove background processing"""
+    """Worker thread for Pixelcut processing driven by per-action profiles"""
     
     # Signals for communication with main thread
     progress_updated = Signal(int, str)  # progress percentage, status message
@@ -16,126 +39,653 @@ class PixelcutProcessorWorker(QThread):
     processing_completed = Signal(int, int)  # total_processed, total_failed
     processing_cancelled = Signal()
     error_occurred = Signal(str)  # error message
+    preflight_completed = Signal(int, int, int, str)  # ok, fixed, rejected, summary text
+    file_progress = Signal(str, int)  # file, percent (upload bytes 0-90, result download 90-100)
+    result_rejected = Signal(str, str, str)  # file, reason the result failed output QA, path the rejected result was kept at
+    cutouts_found = Signal(int, int)  # already cut-out files, files checked - answered with resolve_cutouts()
     
-    def __init__(self, config_manager, files, action, output_folder):
+    # Responses meaning the endpoint could not use an image URL (retried as a local fetch plus upload)
+    URL_FALLBACK_STATUS = (400, 415, 422)
+    
+    def __init__(self, config_manager, files, action, output_folder, streaming=False, planned_files=None, prepared=None,
+                 duplicate_groups=None):
         super().__init__()
         self.config_manager = config_manager
-        self.files = files
+        self.files = list(files)
         self.action = action
         self.output_folder = output_folder
         self.is_cancelled = False
         self.processed_count = 0
         self.failed_count = 0
+        self.skipped_count = 0  # files already at the policy target (no credits spent)
+        self.local_count = 0  # backgrounds removed on this machine (no credits spent)
+        self.output_paths = {}  # input file -> precomputed output path
+        self.upload_paths = {}  # input file -> auto-fixed file to upload instead
+        self.rejected_files = set()  # files failed by preflight (skipped by the dispatcher)
+        self.cutout_files = set()  # already transparent files left out of the run
+        self.alpha_prefilter = None
+        self.cutout_mode = "confirm"
+        self.cutout_lock = threading.Lock()
+        self.cutout_checked = 0  # streamed files checked by the alpha prefilter
+        self.cutout_decision = threading.Event()
+        self.skip_cutouts = True  # answer to cutouts_found, None to cancel the run
+        self.preflight = None
+        self.bandwidth_limiter = BandwidthLimiter.from_config(config_manager)
+        self.metrics = RunMetrics(self.bandwidth_limiter)  # polled by the statistics panel
+        self.started_at = None
+        self.run_status = "error"  # stored in the run history
+        # Latency model for the ETA, pre-fitted from past runs and updated as files finish
+        self.eta_model = None
+        self.eta_lock = threading.Lock()
+        self.eta_estimate = None  # (time, seconds) computed on processor threads, read by the GUI
+        self.file_features = {}  # file -> (input bytes, megapixels)
+        self.started_at_by_file = {}  # in-flight file -> start time
+        # Running totals of queued files not started yet: [sized count, bytes, megapixels, unsized count]
+        self.pending_totals = [0, 0, 0.0, 0]
+        self.received_count = 0  # files taken from the input queue
+        self.url_passthrough = config_manager.get("url_inputs", {}).get("passthrough", True)
+        self.downloader = RangedDownloader.from_config(config_manager.get("ranged_download", {}), self.bandwidth_limiter)
+        self.profile = None
+        self.upscale_policy = None
+        self.subject_cropper = None
+        self.local_matting = None
+        self.output_qa = OutputQA.from_config(config_manager.get("output_qa", {}), action)
+        self.qa_failures = {}  # file -> (reason its last result failed QA, result bytes)
+        self.quarantined = {}  # file -> path its last rejected result was kept at
+        self.qa_failed_count = 0
+        self.metadata_splicer = MetadataSplicer.from_config(config_manager.get("metadata_splice", {}))
+        # Speculative work done before Run was pressed (only valid for the same action)
+        self.prepared = prepared if prepared and prepared.action == action else None
+        
+        # Exact duplicates are not uploaded - they receive a link or copy of their representative's result
+        batch_files = set(self.files)
+        self.duplicate_groups = {rep: [d for d in dups if d in batch_files]
+                                 for rep, dups in (duplicate_groups or {}).items() if rep in batch_files}
+        self.duplicate_files = {d for dups in self.duplicate_groups.values() for d in dups}
+        self.link_mode = config_manager.get("duplicates", {}).get("link_mode", "auto")
+        
+        # Shared state for concurrent file tasks
+        self.counter_lock = threading.Lock()
+        self.completed_count = 0
+        self.total_count = len(self.files)  # files that will be reported as finished
+        self.progress_by_file = {}  # file -> last reported item progress
+        self.request_slot_lock = threading.Lock()
+        self.next_request_time = 0
+        
+        # Streaming mode takes files while they are still being validated (auto-run on load)
+        self.streaming = streaming
+        self.input_closed = False  # set once the end of input has been queued
+        self.planned_files = list(planned_files) if planned_files else None
+        self.input_queue = queue.Queue()
+        if not streaming:
+            for file_path in self.files:
+                self.input_queue.put(file_path)
+            self.input_queue.put(None)
         
     def cancel(self):
         """Cancel the processing operation"""
         self.is_cancelled = True
+        self.input_closed = True
+        self.input_queue.put(None)  # Wake the dispatcher if it waits for more files
+        self.cutout_decision.set()  # and the prefilter if it waits for an answer
+    
+    def resolve_cutouts(self, skip):
+        """Answer cutouts_found: True skips the cut-out files, False processes them, None cancels the run"""
+        self.skip_cutouts = skip
+        self.cutout_decision.set()
+    
+    def add_file(self, file_path):
+        """Queue a validated file for processing (streaming mode), False if the input has already ended"""
+        if not self.streaming or self.input_closed:
+            return False
+        self.files.append(file_path)
+        self.input_queue.put(file_path)
+        return True
+    
+    def finish_input(self):
+        """Signal that no more files will be added (streaming mode)"""
+        if self.streaming and not self.input_closed:
+            self.input_closed = True
+            self.input_queue.put(None)
         
+    @profiling.profiled_thread("processor")
     def run(self):
         """Process files using Pixelcut API"""
+        self.started_at = datetime.now()
+        # Handlers of the final signal release the worker, so history and cleanup have to finish first
+        outcome = None
         try:
-            if not self.files:
-                self.error_occurred.emit("No files to process")
-                return
-                
-            # Get API configuration
-            api_config = self.config_manager.get("api_endpoints", {})
-            headers_config = self.config_manager.get("api_headers", {})
+            outcome = self.process_all()
+        except Exception as e:
+            outcome = (self.error_occurred, f"Processing error: {str(e)}")
+        finally:
+            self.metrics.finish()
+            self.save_history()
+            tracing.save()
+            # Pool threads profile per file and never return from run() - write them with the batch
+            profiling.save("processor", finished_only=True)
+            if self.preflight:
+                self.preflight.cleanup()
+            if self.subject_cropper:
+                self.subject_cropper.cleanup()
+            if self.local_matting:
+                self.local_matting.shutdown()
+            if self.prepared:
+                self.prepared.cleanup()
+        if outcome:
+            signal, *args = outcome
+            signal.emit(*args)
+    
+    def process_all(self):
+        """Run the whole batch and return the final (signal, *args) to emit"""
+        if not self.files and not self.streaming:
+            return (self.error_occurred, "No files to process")
+        
+        # Get API configuration
+        headers_config = self.config_manager.get("api_headers", {})
+        
+        # Endpoint, parameters, naming and limits come from the action's declarative profile
+        self.profile = ActionRegistry(self.config_manager).get(self.action)
+        endpoint_url = self.profile.endpoint_url if self.profile else None
+        # Resolution-aware actions pick 2x/4x/skip per file
+        self.upscale_policy = UpscalePolicy.from_profile(self.profile)
+        # Optionally send only the subject's bounding box for cut-out actions
+        self.subject_cropper = SubjectCropper.from_config(self.config_manager.get("subject_crop", {}), self.action)
+        self.eta_model = EtaModel.from_history(self._open_history(), self.action)
+        self.metrics.eta_provider = self.estimate_remaining
+        # Flat studio backgrounds can be removed locally without spending credits
+        self.local_matting = LocalMatting.from_config(self.config_manager.get("local_matting", {}), self.action)
+        
+        if not endpoint_url:
+            return (self.error_occurred, f"API endpoint not configured for action: {self.action}")
+        # Every concurrent file may hold several ranged download connections to the result host
+        ensure_pool_size(self.downloader.get_pool_size(self.profile.concurrency))
             
-            # Determine API endpoint based on action
-            endpoint_url = None
-            if self.action == "Remove Bg":
-                endpoint_url = api_config.get("remove_background")
-            elif self.action == "Upscale 2x":
-                endpoint_url = api_config.get("upscale")
-            elif self.action == "Upscale 4x":
-                endpoint_url = api_config.get("upscale")
+        api_key = headers_config.get("X-API-KEY", "").strip()
+        if not api_key:
+            return (self.error_occurred, "API key not configured")
             
-            if not endpoint_url:
-                self.error_occurred.emit(f"API endpoint not configured for action: {self.action}")
-                return
-                
-            api_key = headers_config.get("X-API-KEY", "").strip()
-            if not api_key:
-                self.error_occurred.emit("API key not configured")
+        # Ensure output folder exists
+        os.makedirs(self.output_folder, exist_ok=True)
+        
+        # Precompute every output path so name collisions are resolved before any upload
+        planner = OutputLayoutPlanner.from_config(self.output_folder, self.config_manager.get("output_layout", {}))
+        # In streaming mode the candidate list from the drop is planned, since validated files arrive later
+        self.output_paths = planner.plan(self.planned_files or self.files, self.profile.get_output_filename)
+        planner.create_directories(self.output_paths)
+        
+        # Don't pay Remove Bg for images that are already cut out (streamed files are checked as they arrive)
+        settings = self.config_manager.get("alpha_prefilter", {})
+        self.alpha_prefilter = AlphaPrefilter.from_config(settings, self.action)
+        self.cutout_mode = settings.get("mode", "confirm")
+        if not self.streaming:
+            self.files = self.run_alpha_prefilter()
+            if self.is_cancelled:
+                self.run_status = "cancelled"
+                return (self.processing_cancelled,)
+            if not self.files:
+                self.progress_updated.emit(100, "All files already have a transparent background - nothing to process")
+                self.run_status = "completed"
+                return (self.processing_completed, self.processed_count, self.failed_count)
+        
+        # Reject or fix files the API would refuse before spending any upload
+        if self.streaming:
+            # Files are checked one by one as they arrive
+            self.preflight = PreflightValidator.from_config(self.config_manager.get("preflight", {}), self.profile)
+        else:
+            self.files = self.run_preflight()
+        if self.is_cancelled:
+            self.run_status = "cancelled"
+            return (self.processing_cancelled,)
+        # Every loaded file is reported as finished, including preflight rejects and skipped cut-outs;
+        # streamed files are counted as they arrive from validation
+        self._set_total(self.total_count)
+        
+        self.progress_updated.emit(0, f"Starting {self.action} for {len(self.files)} files ({self.profile.concurrency} concurrent)...")
+        
+        # Process up to the profile's concurrency limit at once, taking files from the input queue
+        with ThreadPoolExecutor(max_workers=self.profile.concurrency) as executor:
+            while not self.is_cancelled:
+                file_path = self.input_queue.get()
+                if file_path is None:
+                    break
+                self.received_count += 1
+                if self.streaming:
+                    self._set_total(self.received_count)
+                if file_path not in self.rejected_files and file_path not in self.duplicate_files and file_path not in self.cutout_files:
+                    self._update_pending(file_path, 1)
+                    executor.submit(self.process_file_task, file_path, endpoint_url, api_key)
+            # Leaving the block waits for in-flight files; queued ones return early when cancelled
+        
+        if self.is_cancelled:
+            self.run_status = "cancelled"
+            return (self.processing_cancelled,)
+        
+        # Final progress update
+        throughput = self.bandwidth_limiter.get_stats_text()
+        skipped_text = f", {self.skipped_count} already at target size" if self.skipped_count else ""
+        skipped_text += f", {self.local_count} removed locally" if self.local_count else ""
+        skipped_text += f", {len(self.cutout_files)} already transparent" if self.cutout_files else ""
+        skipped_text += f", {self.qa_failed_count} failed QA" if self.qa_failed_count else ""
+        self.progress_updated.emit(100, f"Completed: {self.processed_count} processed, {self.failed_count} failed{skipped_text} ({throughput})")
+        self.run_status = "completed"
+        return (self.processing_completed, self.processed_count, self.failed_count)
+    
+    def get_file_features(self, file_path):
+        """Get (input bytes, megapixels) of a file for the latency model, (None, None) if unknown"""
+        features = self.file_features.get(file_path)
+        if features is None:
+            features = (None, None)
+            upload_path = self.upload_paths.get(file_path, file_path)
+            if not is_url(file_path):
+                # A file moved since loading has no features - it fails when it is sent, not here
+                try:
+                    header = get_input_cache().get_header(upload_path)
+                    if header:
+                        features = (os.path.getsize(upload_path), header["width"] * header["height"] / 1_000_000)
+                except OSError:
+                    features = (None, None)
+            self.file_features[file_path] = features
+            self.metrics.set_file_detail(file_path, "input_bytes", features[0])
+            self.metrics.set_file_detail(file_path, "megapixels", features[1])
+        return features
+    
+    def _update_pending(self, file_path, sign):
+        """Add (1) or remove (-1) a queued file's features from the pending totals"""
+        input_bytes, megapixels = self.get_file_features(file_path)
+        with self.eta_lock:
+            if input_bytes is None:
+                self.pending_totals[3] += sign
+            else:
+                self.pending_totals[0] += sign
+                self.pending_totals[1] += sign * input_bytes
+                self.pending_totals[2] += sign * megapixels
+    
+    def update_eta(self):
+        """Recompute the remaining time from the latency model (processor threads, as files start and finish)"""
+        if not self.eta_model or not self.profile:
+            return
+        now = time.monotonic()
+        in_flight = [self.get_file_features(f) + (now - started,) for f, started in list(self.started_at_by_file.items())]
+        with self.eta_lock:
+            count, total_bytes, total_megapixels, unknown_count = self.pending_totals
+        if self.streaming and self.planned_files:
+            # Files of the drop that have not been validated yet
+            unknown_count += max(0, len(self.planned_files) - self.received_count)
+        eta = self.eta_model.estimate_remaining((count, total_bytes, total_megapixels, unknown_count), in_flight,
+                                                self.profile.concurrency, self.profile.request_interval)
+        with self.eta_lock:
+            self.eta_estimate = (now, eta)
+    
+    def estimate_remaining(self):
+        """Get the last estimate minus the time since it was made, None before the first file starts"""
+        with self.eta_lock:
+            estimate = self.eta_estimate
+        if estimate is None:
+            return None
+        computed_at, eta = estimate
+        return max(0.0, eta - (time.monotonic() - computed_at))
+    
+    def _open_history(self):
+        """Open the run history database, None if disabled or unavailable"""
+        try:
+            return RunHistory.from_config(self.config_manager)
+        except Exception as e:
+            print(f"Error opening run history: {e}")
+            return None
+    
+    def save_history(self):
+        """Store the run and its per-file results in the run history database"""
+        file_details = self.metrics.get_file_details()
+        if not self.profile or not file_details:
+            return
+        try:
+            history = self._open_history()
+            if not history:
                 return
-                
-            # Ensure output folder exists
-            os.makedirs(self.output_folder, exist_ok=True)
+            snapshot = self.metrics.snapshot()
+            history.record_run({
+                "started_at": self.started_at,
+                "finished_at": datetime.now(),
+                "action": self.action,
+                "output_folder": self.output_folder,
+                "status": self.run_status,
+                "total": snapshot["total"],
+                "processed": self.processed_count,
+                "failed": self.failed_count,
+                "duration_seconds": snapshot["elapsed"],
+                "parameters": {
+                    "params": self.profile.params,
+                    "concurrency": self.profile.concurrency,
+                    "request_interval": self.profile.request_interval,
+                    "streaming": self.streaming,
+                },
+            }, file_details)
+        except Exception as e:
+            print(f"Error saving run history: {e}")
+    
+    def run_alpha_prefilter(self):
+        """Leave out files that already have a transparent background, asking the GUI first in "confirm" mode"""
+        if not self.alpha_prefilter:
+            return self.files
+        
+        self.progress_updated.emit(0, "Checking for images that are already cut out...")
+        lookup = self.prepared.is_cutout if self.prepared else None
+        # Duplicates share their representative's answer
+        checked = [f for f in self.files if f not in self.duplicate_files]
+        with tracing.span("alpha_prefilter", files=len(checked)):
+            cutouts = self.alpha_prefilter.find_cutouts(checked, lookup, lambda: self.is_cancelled)
+        if not cutouts or self.is_cancelled:
+            return self.files
+        
+        if self.cutout_mode == "confirm":
+            self.cutouts_found.emit(len(cutouts), len(checked))
+            self.cutout_decision.wait()
+            if self.skip_cutouts is None:
+                self.is_cancelled = True
+            if not self.skip_cutouts:
+                return self.files
+        
+        self.cutout_files = {f for rep in cutouts for f in [rep] + self.duplicate_groups.get(rep, [])}
+        print(f"Skipping {len(cutouts)} already cut-out files: {cutouts}")
+        for cutout in self.cutout_files:
+            self._record_cutout(cutout)
+        self.progress_updated.emit(0, f"Skipped {len(self.cutout_files)} files that already have a transparent background")
+        return [f for f in self.files if f not in self.cutout_files]
+    
+    def run_preflight(self):
+        """Run local constraint checks and return the files that can be uploaded"""
+        self.preflight = PreflightValidator.from_config(self.config_manager.get("preflight", {}), self.profile)
+        if not self.preflight:
+            return list(self.files)
+        
+        def on_progress(done, total):
+            if done % 10 == 0 or done == total:
+                self.progress_updated.emit(0, f"Preflight check {done}/{total}...")
+        
+        # Files already checked (and pre-transcoded) while idle are not checked again
+        lookup = self.prepared.get_preflight if self.prepared else None
+        # Image URLs have no local header to check - the API validates them; duplicates share their representative's check
+        local_files = [f for f in self.files if not is_url(f) and f not in self.duplicate_files]
+        with tracing.span("preflight", files=len(local_files)):
+            results = self.preflight.run(local_files, on_progress, lambda: self.is_cancelled, lookup)
+        self.upload_paths = results["fixed"]
+        self.rejected_files = set(results["rejected"])
+        
+        # Rejected files fail immediately without any network traffic
+        for file_path, reason in results["rejected"].items():
+            print(f"Preflight rejected {file_path}: {reason}")
+            for rejected in [file_path] + self.duplicate_groups.get(file_path, []):
+                self.metrics.set_file_method(rejected, "rejected")
+                self._record_single_result(rejected, "", False)
+        
+        summary = PreflightValidator.get_summary_text(results)
+        self.preflight_completed.emit(len(results["ok"]), len(results["fixed"]), len(results["rejected"]), summary)
+        self.progress_updated.emit(0, summary)
+        
+        return [f for f in self.files if f not in self.rejected_files]
             
-            total_files = len(self.files)
-            self.progress_updated.emit(0, f"Starting {self.action} for {total_files} files...")
+    def process_file_task(self, file_path, endpoint_url, api_key):
+        """Process one file on a pool thread and report the result"""
+        if self.is_cancelled:
+            return
+        self.metrics.file_started()
+        self._update_pending(file_path, -1)
+        self.started_at_by_file[file_path] = time.monotonic()
+        self.update_eta()
+        try:
+            with profiling.profiled("processor"), tracing.span("file", file=file_path):
+                self._process_file_task(file_path, endpoint_url, api_key)
+        finally:
+            self.started_at_by_file.pop(file_path, None)
+            self.metrics.file_ended()
+            self.update_eta()
+    
+    def _process_file_task(self, file_path, endpoint_url, api_key):
+        """Check, send and record one file"""
+        # Streaming files skipped the batch preflight, check them here
+        if self.streaming and self.preflight and not is_url(file_path):
+            status, value = self.preflight.check_file(file_path)
+            if status == "rejected":
+                print(f"Preflight rejected {file_path}: {value}")
+                self.metrics.set_file_method(file_path, "rejected")
+                self._record_result(file_path, "", False)
+                return
+            if status == "fixed":
+                self.upload_paths[file_path] = value
+        if self.streaming and self.is_streamed_cutout(file_path):
+            print(f"Already cut out, skipped: {file_path}")
+            self.cutout_files.add(file_path)
+            self._record_cutout(file_path)
+            return
+        
+        # Confident local cut-outs never take a request slot
+        if self.local_matting and not is_url(file_path) and self.process_locally(file_path):
+            return
+        
+        with tracing.span("request_slot_wait"):
+            self._wait_for_request_slot()
+        if self.is_cancelled:
+            return
+        
+        success, output_file = False, ""
+        try:
+            # Emit signal that this file is starting to be processed
+            self.file_processing_started.emit(file_path)
             
-            for i, file_path in enumerate(self.files):
-                if self.is_cancelled:
-                    self.processing_cancelled.emit()
-                    return
-                try:
-                    # Emit signal that this file is starting to be processed
-                    self.file_processing_started.emit(file_path)
-                    
-                    # Update progress
-                    progress = int((i / total_files) * 100)
-                    filename = os.path.basename(file_path)
-                    self.progress_updated.emit(progress, f"Processing {filename}...")
-                    
-                    # Process the file
-                    success, output_file = self.process_single_file(file_path, endpoint_url, api_key)
-                    
-                    if success:
-                        self.processed_count += 1
-                        self.file_processed.emit(file_path, output_file, True)
-                    else:
-                        self.failed_count += 1
-                        self.file_processed.emit(file_path, "", False)
-                        
-                    # Small delay to prevent overwhelming the API
-                    time.sleep(0.5)
-                    
-                except Exception as e:
-                    self.failed_count += 1
-                    self.file_processed.emit(file_path, "", False)
-                    print(f"Error processing {file_path}: {e}")
-                          # Final progress update
-            self.progress_updated.emit(100, f"Completed: {self.processed_count} processed, {self.failed_count} failed")
-            self.processing_completed.emit(self.processed_count, self.failed_count)
+            with self.counter_lock:
+                progress = int((self.completed_count / max(1, self.total_count)) * 100)
+            filename = os.path.basename(file_path)
+            eta = self.estimate_remaining()
+            eta_text = f" (ETA {RunMetrics.format_duration(eta)})" if eta is not None else ""
+            self.progress_updated.emit(progress, f"Processing {filename}...{eta_text}")
             
+            success, output_file = self.process_single_file(file_path, endpoint_url, api_key)
+            success, output_file = self._retry_rejected_result(file_path, endpoint_url, api_key, success, output_file)
+            if success and self.eta_model:
+                # Sum of stage timings - request spacing and queueing are not part of a file's latency
+                input_bytes, megapixels = self.get_file_features(file_path)
+                self.eta_model.update(input_bytes, megapixels, self.metrics.get_file_latency(file_path))
         except Exception as e:
-            self.error_occurred.emit(f"Processing error: {str(e)}")
-            
+            print(f"Error processing {file_path}: {e}")
+        
+        self._record_result(file_path, output_file, success)
+    
+    def is_streamed_cutout(self, file_path):
+        """Check a streamed file with the alpha prefilter - in "confirm" mode the first hit asks once for the run"""
+        if not self.alpha_prefilter or is_url(file_path):
+            return False
+        with self.counter_lock:
+            self.cutout_checked += 1
+        if not self.alpha_prefilter.is_cutout(file_path):
+            return False
+        if self.cutout_mode == "confirm":
+            # Other cut-outs wait here for the same answer
+            with self.cutout_lock:
+                if not self.cutout_decision.is_set():
+                    self.cutouts_found.emit(len(self.cutout_files) + 1, self.cutout_checked)
+                    self.cutout_decision.wait()
+            if self.skip_cutouts is None:
+                self.cancel()
+            if not self.skip_cutouts:
+                return False
+        return True
+    
+    def _retry_rejected_result(self, file_path, endpoint_url, api_key, success, output_file):
+        """Re-request a file whose result failed QA, up to the configured retries"""
+        retries = self.output_qa.max_retries if self.output_qa else 0
+        while not success and file_path in self.qa_failures:
+            reason, data = self.qa_failures.pop(file_path)
+            # Every retry is billed again - only retry results that look like a transfer glitch
+            if retries <= 0 or self.is_cancelled or not self.output_qa.is_retryable(reason):
+                quarantine_path = self._quarantine_result(file_path, data)
+                with self.counter_lock:
+                    self.qa_failed_count += 1
+                self.result_rejected.emit(file_path, reason, quarantine_path)
+                break
+            retries -= 1
+            print(f"Retrying {file_path} after failed QA: {reason}")
+            self._wait_for_request_slot()
+            success, output_file = self.process_single_file(file_path, endpoint_url, api_key)
+        return success, output_file
+    
+    def _quarantine_result(self, file_path, data):
+        """Keep a paid result that failed QA next to the planned output as <name>_qa_rejected<ext>, returning its path"""
+        output_path = self.output_paths.get(file_path) or os.path.join(self.output_folder, self.profile.get_output_filename(file_path))
+        stem, ext = os.path.splitext(output_path)
+        quarantine_path = f"{stem}_qa_rejected{ext or get_image_extension(data)}"
+        try:
+            with open(quarantine_path, 'wb') as f:
+                f.write(data)
+        except OSError as e:
+            print(f"Failed to keep rejected result {quarantine_path}: {e}")
+            return ""
+        self.quarantined[file_path] = quarantine_path
+        return quarantine_path
+    
+    def process_locally(self, file_path):
+        """Try the local background removal, True if the file was finished without the API"""
+        png_bytes = self.local_matting.try_file(file_path)
+        if png_bytes is None:
+            return False
+        
+        # Local results get the same QA and metadata as API results - a rejected one still goes to the API
+        if self.output_qa:
+            header = get_input_cache().get_header(file_path)
+            expected_size = (header["width"], header["height"]) if header else None
+            reason = self.output_qa.check(png_bytes, file_path, expected_size)
+            if reason:
+                print(f"Local result rejected for {file_path}, using API: {reason}")
+                return False
+        if self.metadata_splicer:
+            png_bytes = self.metadata_splicer.splice(file_path, png_bytes)
+        
+        # The API path reports the start itself, so a file only starts here once it is finished locally
+        self.file_processing_started.emit(file_path)
+        output_path = self.output_paths.get(file_path) or os.path.join(self.output_folder, self.profile.get_output_filename(file_path))
+        try:
+            with self.metrics.measure("write", file_path):
+                with open(output_path, 'wb') as f:
+                    f.write(png_bytes)
+        except OSError as e:
+            print(f"Failed to write local result {output_path}: {e}")
+            self._record_result(file_path, "", False)
+            return True
+        with self.counter_lock:
+            self.local_count += 1
+        self.metrics.set_file_method(file_path, "local")
+        self._record_result(file_path, output_path, True)
+        return True
+    
+    def _record_cutout(self, file_path):
+        """Report a file left out because it already has a transparent background (finished, nothing written)"""
+        self.metrics.set_file_method(file_path, "cutout")
+        self._record_single_result(file_path, "", True)
+    
+    def _record_result(self, file_path, output_file, success):
+        """Update counters and report a finished file and its duplicates"""
+        for duplicate in self.duplicate_groups.get(file_path, []):
+            self.metrics.set_file_method(duplicate, "duplicate")
+            self._record_single_result(duplicate, *self._fan_out_result(duplicate, output_file, success))
+        self._record_single_result(file_path, output_file, success)
+    
+    def _fan_out_result(self, duplicate, output_file, success):
+        """Give a duplicate its own output file from the representative's result"""
+        if not success:
+            return "", False
+        target = self.output_paths.get(duplicate) or os.path.join(self.output_folder, self.profile.get_output_filename(duplicate))
+        try:
+            method = fan_out(output_file, target, self.link_mode)
+            print(f"Duplicate {duplicate} -> {target} ({method})")
+            return target, True
+        except OSError as e:
+            print(f"Failed to create duplicate output {target}: {e}")
+            return "", False
+    
+    def _record_single_result(self, file_path, output_file, success):
+        """Update counters and report one finished file"""
+        with self.counter_lock:
+            self.completed_count += 1
+            if success:
+                self.processed_count += 1
+            else:
+                self.failed_count += 1
+            self.progress_by_file.pop(file_path, None)
+        # History points at the kept rejected result so a false QA rejection can still be used
+        self.metrics.file_finished(success, file_path, output_file if success else self.quarantined.get(file_path, ""))
+        self.file_processed.emit(file_path, output_file if success else "", success)
+    
+    def _set_total(self, total):
+        """Set the number of files the run reports, for the progress percentage and the statistics panel"""
+        with self.counter_lock:
+            self.total_count = total
+        self.metrics.set_total(total)
+    
+    def _wait_for_request_slot(self):
+        """Space out request starts by the profile's request interval to avoid overwhelming the API"""
+        with self.request_slot_lock:
+            now = time.monotonic()
+            start_time = max(now, self.next_request_time)
+            self.next_request_time = start_time + self.profile.request_interval
+        if start_time > now:
+            time.sleep(start_time - now)
+    
     def process_single_file(self, file_path, endpoint_url, api_key):
-        """Process a single file with Pixelcut API"""
+        """Process a single file (local path or image URL) with Pixelcut API"""
+        self.metrics.add_file_detail(file_path, "attempts", 1)
         try:
-            # Prepare the request headers (don't include Content-Type for multipart data)
+            # Prepare the request headers (Content-Type depends on the request body)
             headers = {
                 'Accept': 'application/json',
                 'X-API-KEY': api_key
             }
             
-            # Prepare file for upload using the official API format
-            with open(file_path, 'rb') as f:
-                files = [
-                    ('image', ('file', f, 'application/octet-stream'))
-                ]
-                  # Add action-specific parameters
-                data = {}
-                if self.action == "Remove Bg":
-                    data['format'] = 'png'  # Request PNG format for transparency
-                elif self.action == "Upscale 2x":
-                    data['scale'] = '2'
-                elif self.action == "Upscale 4x":
-                    data['scale'] = '4'
-                    
-                # Make API request
-                response = requests.post(
-                    endpoint_url,
-                    headers=headers,
-                    files=files,
-                    data=data,
-                    timeout=60  # 60 second timeout for processing
-                )
+            # Action parameters, with the upscale factor chosen per file when the profile has a policy
+            params = dict(self.profile.params)
+            if self.upscale_policy and not is_url(file_path):
+                # Skip is decided on the original - a preflight downscale must not make it look too small
+                if self.upscale_policy.choose_scale(file_path) is None:
+                    return self.write_without_upscale(file_path)
+                scale = self.upscale_policy.choose_scale(self.upload_paths.get(file_path, file_path))
+                params[self.upscale_policy.scale_param] = str(scale or UpscalePolicy.SCALES[0])
+            
+            crop = None
+            if is_url(file_path):
+                response = None
+                # A policy needs the image size to pick the scale, so those actions always fetch the image here
+                if self.url_passthrough and self.profile.url_param and not self.upscale_policy:
+                    # Hosted image - let the API fetch it so nothing is uploaded from here
+                    response = self.post_image_url(file_path, endpoint_url, headers)
+                if response is None or response.status_code in self.URL_FALLBACK_STATUS:
+                    # Endpoint can't use the URL - fetch it locally and upload the bytes instead
+                    image_data = self.download(file_path, self.profile.download_timeout)
+                    if image_data is None:
+                        print(f"Failed to fetch {file_path}")
+                        return False, ""
+                    if self.upscale_policy:
+                        scale = self.upscale_policy.choose_scale_for_data(image_data)
+                        if scale is None:
+                            return self.write_without_upscale(file_path, image_data)
+                        params[self.upscale_policy.scale_param] = str(scale)
+                    response = self.post_image_bytes(file_path, image_data, endpoint_url, headers, params)
+            else:
+                # Stream the upload from bytes already cached (e.g. by speculative preparation) or a memory map of the file
+                input_cache = get_input_cache()
+                upload_path = self.upload_paths.get(file_path, file_path)
+                crop = self.subject_cropper.prepare(upload_path) if self.subject_cropper else None
+                if crop:
+                    # Only the subject plus a margin is sent - the result is re-padded after download
+                    response = self.post_image_bytes(file_path, crop[0], endpoint_url, headers, params)
+                    self.subject_cropper.release(crop[0])
+                else:
+                    cached_data = input_cache.get_cached_bytes(upload_path)
+                    response = self.post_image_bytes(file_path, cached_data if cached_data is not None else upload_path, endpoint_url, headers, params)
+                
+                # Upload is the last reader of the input bytes - free the memory for other files
+                input_cache.release(upload_path)
             
             if response.status_code == 200:
+                self.metrics.add_file_detail(file_path, "credits", self.profile.cost)
                 # Parse the JSON response to get the result URL
                 try:
                     result_data = response.json()
@@ -144,40 +694,53 @@ class PixelcutProcessorWorker(QThread):
                     if not result_url:
                         print(f"No result URL in response for {file_path}")
                         return False, ""
-                        
-                    # Download the processed image
-                    download_response = requests.get(result_url, timeout=30)
-                    if download_response.status_code != 200:
+                    
+                    # Download the processed image in parallel ranged segments paced by the bandwidth limiter
+                    processed_image_data = self.download(result_url, self.profile.download_timeout, file_path)
+                    if processed_image_data is None:
                         print(f"Failed to download result for {file_path}")
                         return False, ""
-                        
-                    processed_image_data = download_response.content
+                    self.metrics.add_file_detail(file_path, "bytes_down", len(processed_image_data))
                     
                 except json.JSONDecodeError:
                     print(f"Invalid JSON response for {file_path}")
                     return False, ""
                 
-                # Generate output filename
-                input_filename = Path(file_path)
-                if self.action == "Remove Bg":
-                    suffix = "_removed_bg"
-                    extension = ".png"  # Remove background always outputs PNG
-                elif self.action == "Upscale 2x":
-                    suffix = "_upscaled_2x"
-                    extension = input_filename.suffix
-                elif self.action == "Upscale 4x":
-                    suffix = "_upscaled_4x"
-                    extension = input_filename.suffix
-                else:
-                    suffix = "_processed"
-                    extension = input_filename.suffix
-                    
-                output_filename = f"{input_filename.stem}{suffix}{extension}"
-                output_path = os.path.join(self.output_folder, output_filename)
+                # Degenerate results are not written - the file is retried or reported instead
+                reason = self.check_result(file_path, processed_image_data, crop, params)
+                if reason:
+                    print(f"Result rejected for {file_path}: {reason}")
+                    self.qa_failures[file_path] = (reason, processed_image_data)
+                    return False, ""
                 
-                # Save the result
-                with open(output_path, 'wb') as f:
-                    f.write(processed_image_data)
+                # Output path was planned when the batch started
+                output_path = self.output_paths.get(file_path) or os.path.join(self.output_folder, self.profile.get_output_filename(file_path))
+                if not os.path.splitext(output_path)[1]:
+                    # Extension-less image URL - name the output after the format the API returned
+                    output_path += get_image_extension(processed_image_data)
+                    self.output_paths[file_path] = output_path
+                
+                # Copy the input's ICC/EXIF into the result container (re-encoding steps below would drop it)
+                splice_metadata = self.metadata_splicer and not is_url(file_path)
+                post_processed = crop or self.upscale_policy
+                if splice_metadata and not post_processed:
+                    processed_image_data = self.metadata_splicer.splice(file_path, processed_image_data)
+                
+                with self.metrics.measure("write", file_path):
+                    # Save the result
+                    with open(output_path, 'wb') as f:
+                        f.write(processed_image_data)
+                    
+                    # Put a cropped cut-out back onto the original canvas geometry
+                    if crop:
+                        self.subject_cropper.repad(output_path, crop[1], crop[2])
+                    
+                    # Upscale steps are 2x/4x - bring the result down to the exact target size
+                    if self.upscale_policy:
+                        self.upscale_policy.fit_to_target(output_path)
+                    
+                    if splice_metadata and post_processed:
+                        self.metadata_splicer.splice_file(file_path, output_path)
                     
                 return True, output_path
                 
@@ -201,3 +764,92 @@ class PixelcutProcessorWorker(QThread):
         except Exception as e:
             print(f"Error processing {file_path}: {e}")
             return False, ""
+    
+    def check_result(self, file_path, data, crop, params):
+        """Run output QA on downloaded result bytes, returning the rejection reason or None"""
+        if not self.output_qa:
+            return None
+        source, expected_size = None, None
+        if crop:
+            box = crop[1]
+            expected_size = (box[2] - box[0], box[3] - box[1])
+        elif not is_url(file_path):
+            source = self.upload_paths.get(file_path, file_path)
+            header = get_input_cache().get_header(source)
+            if header:
+                expected_size = (header["width"], header["height"])
+        if expected_size:
+            scale_param = self.upscale_policy.scale_param if self.upscale_policy else "scale"
+            scale = float(params.get(scale_param, 1))
+            expected_size = (round(expected_size[0] * scale), round(expected_size[1] * scale))
+        return self.output_qa.check(data, source, expected_size)
+    
+    def write_without_upscale(self, file_path, image_data=None):
+        """Write the output of a file (or an image URL's fetched bytes) that already meets the upscale target without calling the API"""
+        output_path = self.output_paths.get(file_path) or os.path.join(self.output_folder, self.profile.get_output_filename(file_path))
+        if image_data is not None and not os.path.splitext(output_path)[1]:
+            # Extension-less image URL - name the output after the fetched format
+            output_path += get_image_extension(image_data)
+            self.output_paths[file_path] = output_path
+        self.upscale_policy.write_skipped(image_data if image_data is not None else file_path, output_path)
+        with self.counter_lock:
+            self.skipped_count += 1
+        self.metrics.set_file_method(file_path, "skipped")
+        print(f"Already at target size, skipped upscale: {file_path}")
+        return True, output_path
+    
+    def post_image_bytes(self, file_path, image_source, endpoint_url, headers, params=None):
+        """Upload an image (bytes or a local path) as a streamed multipart form"""
+        # Add action-specific parameters from the profile
+        data = dict(params if params is not None else self.profile.params)
+        
+        # Upload ends when the last body byte is sent, the rest of the request is server time
+        timing = {"start": time.monotonic(), "uploaded": None}
+        
+        def on_upload_progress(sent, total):
+            self._report_progress(file_path, int(sent * 90 / max(1, total)))
+            if sent >= total and timing["uploaded"] is None:
+                timing["uploaded"] = time.monotonic()
+                self.metrics.record("upload", timing["uploaded"] - timing["start"], file_path)
+        
+        # Body is streamed in chunks, paced by the bandwidth limiter and reported as item progress
+        with MultipartStream(list(data.items()), 'image', image_source,
+                             limiter=self.bandwidth_limiter, progress_callback=on_upload_progress) as body:
+            # Make API request over the shared session (connection may already be warm)
+            response = get_http_session().post(
+                endpoint_url,
+                headers=dict(headers, **{'Content-Type': body.content_type}),
+                data=body,
+                timeout=self.profile.timeout
+            )
+            self.metrics.add_file_detail(file_path, "bytes_up", len(body))
+        self.metrics.record("server", time.monotonic() - (timing["uploaded"] or timing["start"]), file_path)
+        return response
+    
+    def _report_progress(self, file_path, percent):
+        """Emit item progress only when the whole percentage changes"""
+        with self.counter_lock:
+            if self.progress_by_file.get(file_path) == percent:
+                return
+            self.progress_by_file[file_path] = percent
+        self.file_progress.emit(file_path, percent)
+    
+    def post_image_url(self, image_url, endpoint_url, headers):
+        """Send an image URL in the profile's JSON URL parameter instead of uploading bytes"""
+        payload = dict(self.profile.json_params)
+        payload[self.profile.url_param] = image_url
+        with self.metrics.measure("server", image_url):
+            return get_http_session().post(
+                endpoint_url,
+                headers=dict(headers, **{'Content-Type': 'application/json'}),
+                json=payload,
+                timeout=self.profile.timeout
+            )
+    
+    def download(self, url, timeout, progress_file=None):
+        """Download a URL in parallel resumable segments paced by the bandwidth limiter, None on HTTP errors"""
+        def on_download_progress(received, total):
+            self._report_progress(progress_file, 90 + int(received * 10 / max(1, total)))
+        
+        with self.metrics.measure("download", progress_file):
+            return self.downloader.download(url, timeout, on_download_progress if progress_file else None)
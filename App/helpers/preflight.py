@@ -0,0 +1,191 @@
+import os
+import shutil
+import tempfile
+from PIL import Image
+from App.helpers.input_cache import get_input_cache
+
+
+class PreflightValidator:
+    """Check files against per-action API constraints before any upload, fixing what can be fixed locally"""
+
+    # Modes that can be converted to an accepted mode without losing the image
+    CONVERTIBLE_MODES = {"CMYK", "YCbCr", "LAB", "HSV", "I", "I;16", "I;16B", "I;16L", "I;16N", "F", "1", "PA"}
+
+    def __init__(self, constraints, auto_fix=True):
+        self.constraints = constraints or {}
+        self.auto_fix = auto_fix
+        self.temp_dir = None
+
+        self.max_bytes = int(self.constraints.get("max_bytes_mb", 0) * 1024 * 1024)
+        self.max_megapixels = self.constraints.get("max_megapixels", 0)
+        self.max_dimension = self.constraints.get("max_dimension", 0)
+        self.supported_modes = set(self.constraints.get("supported_modes", []))
+
+    @classmethod
+    def from_config(cls, settings, profile):
+        """Create validator for an action profile using the "preflight" config section, None if disabled"""
+        settings = settings or {}
+        if not settings.get("enabled", True) or not profile:
+            return None
+        constraints = profile.constraints
+        if not constraints:
+            return None
+        return cls(constraints, settings.get("auto_fix", True))
+
+    def run(self, files, progress_callback=None, is_cancelled=None, lookup=None):
+        """Check all files and return {"ok": [...], "fixed": {file: upload_path}, "rejected": {file: reason}}
+
+        `lookup(file_path)` may return an earlier (status, value) result to skip re-checking a file.
+        """
+        results = {"ok": [], "fixed": {}, "rejected": {}}
+        total = len(files)
+
+        for index, file_path in enumerate(files):
+            if is_cancelled and is_cancelled():
+                break
+
+            known = lookup(file_path) if lookup else None
+            status, value = known if known else self.check_file(file_path)
+            if status == "ok":
+                results["ok"].append(file_path)
+            elif status == "fixed":
+                results["fixed"][file_path] = value
+            else:
+                results["rejected"][file_path] = value
+
+            if progress_callback and total:
+                progress_callback(index + 1, total)
+
+        return results
+
+    def check_file(self, file_path, allow_fix=True):
+        """Check one file using header-only reads
+
+        Returns:
+            tuple: ("ok", None), ("fixed", upload_path) or ("rejected", reason),
+            or ("deferred", reason) when a fix is needed but `allow_fix` is False
+        """
+        try:
+            file_size = os.path.getsize(file_path)
+        except OSError as e:
+            return "rejected", f"Cannot read file: {e}"
+
+        header = get_input_cache().get_header(file_path)
+        if not header:
+            return "rejected", "Unreadable image header"
+
+        problems = self.get_problems(file_size, header)
+        if not problems:
+            return "ok", None
+
+        if not self.auto_fix:
+            return "rejected", ", ".join(problems)
+
+        if not allow_fix:
+            return "deferred", ", ".join(problems)
+
+        return self.fix_file(file_path, header)
+
+    def get_problems(self, file_size, header):
+        """List every constraint the file violates"""
+        problems = []
+        width, height = header["width"], header["height"]
+
+        if self.max_bytes and file_size > self.max_bytes:
+            problems.append(f"file too large ({file_size / (1024 * 1024):.1f} MB)")
+        if self.max_megapixels and (width * height) / 1_000_000 > self.max_megapixels:
+            problems.append(f"too many megapixels ({width * height / 1_000_000:.1f} MP)")
+        if self.max_dimension and max(width, height) > self.max_dimension:
+            problems.append(f"dimensions too large ({width}x{height})")
+        if self.supported_modes and header["mode"] not in self.supported_modes:
+            problems.append(f"unsupported mode {header['mode']}")
+
+        return problems
+
+    def fix_file(self, file_path, header):
+        """Convert mode and downscale into a temporary upload file"""
+        mode = header["mode"]
+        if self.supported_modes and mode not in self.supported_modes and mode not in self.CONVERTIBLE_MODES:
+            return "rejected", f"unsupported mode {mode}"
+
+        try:
+            img = get_input_cache().open_image(file_path)
+            if img is None:
+                return "rejected", "Unreadable image"
+            with img:
+                img = self._convert_mode(img)
+                img = self._downscale(img)
+
+                fixed_path = self._get_temp_path(file_path, img)
+                if fixed_path.endswith(".png"):
+                    img.save(fixed_path, "PNG", optimize=True)
+                else:
+                    img.save(fixed_path, "JPEG", quality=95)
+
+            # Re-encoding may still not be enough for the byte limit
+            if self.max_bytes and os.path.getsize(fixed_path) > self.max_bytes:
+                os.remove(fixed_path)
+                return "rejected", "file too large even after downscaling"
+
+            return "fixed", fixed_path
+        except Exception as e:
+            print(f"Preflight fix failed for {file_path}: {e}")
+            return "rejected", f"auto-fix failed: {e}"
+
+    def _convert_mode(self, img):
+        """Convert to the closest supported mode"""
+        if not self.supported_modes or img.mode in self.supported_modes:
+            return img
+
+        if img.mode.startswith("I") or img.mode == "F":
+            # High bit-depth grayscale - scale down to 8 bit instead of clipping
+            img = img.convert("I").point(lambda v: v * (1 / 256)).convert("L")
+        elif img.mode in ("PA", "LA") or "transparency" in img.info:
+            img = img.convert("RGBA")
+        else:
+            img = img.convert("RGB")
+
+        if img.mode not in self.supported_modes:
+            img = img.convert("RGBA" if "A" in img.mode and "RGBA" in self.supported_modes else "RGB")
+        return img
+
+    def _downscale(self, img):
+        """Downscale to fit max dimension and megapixel limits, keeping aspect ratio"""
+        width, height = img.size
+        scale = 1.0
+
+        if self.max_dimension and max(width, height) > self.max_dimension:
+            scale = min(scale, self.max_dimension / max(width, height))
+        if self.max_megapixels and width * height > self.max_megapixels * 1_000_000:
+            scale = min(scale, (self.max_megapixels * 1_000_000 / (width * height)) ** 0.5)
+
+        if scale < 1.0:
+            new_size = (max(1, int(width * scale)), max(1, int(height * scale)))
+            img = img.resize(new_size, Image.Resampling.LANCZOS)
+        return img
+
+    def _get_temp_path(self, file_path, img):
+        """Get a unique temporary path for a fixed upload file"""
+        if not self.temp_dir:
+            self.temp_dir = tempfile.mkdtemp(prefix="pikselcat_preflight_")
+
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+        # Keep lossless PNG for transparency, JPEG otherwise
+        extension = ".png" if "A" in img.mode or img.mode == "P" else ".jpg"
+        fd, path = tempfile.mkstemp(prefix=f"{stem}_", suffix=extension, dir=self.temp_dir)
+        os.close(fd)
+        return path
+
+    def cleanup(self):
+        """Remove temporary fixed files"""
+        if self.temp_dir:
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+            self.temp_dir = None
+
+    @staticmethod
+    def get_summary_text(results):
+        """Format a one-line summary of preflight results"""
+        ok_count = len(results["ok"])
+        fixed_count = len(results["fixed"])
+        rejected_count = len(results["rejected"])
+        return f"Preflight: {ok_count} ok, {fixed_count} auto-fixed, {rejected_count} rejected"
@@ -0,0 +1,237 @@
+import atexit
+import cProfile
+import functools
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+# PIKSELCAT_PROFILE=processor,loader (or "all") profiles the chosen subsystems' threads,
+# PIKSELCAT_PROFILE_MODE=sampling switches from cProfile to a low-overhead stack sampler
+PROFILE_ENV = "PIKSELCAT_PROFILE"
+PROFILE_MODE_ENV = "PIKSELCAT_PROFILE_MODE"
+SUBSYSTEMS = ("gui", "loader", "prep", "processor", "api")
+
+_lock = threading.Lock()
+_local = threading.local()
+_subsystems = set()
+_mode = "deterministic"
+_output_dir = "profiles"
+_sample_interval = 0.005
+_top = 25
+_profiles = {}  # (subsystem, thread name) -> cProfile.Profile or Counter of sampled stacks
+_sampled_threads = {}  # thread id -> profile key, while the thread is inside a profiled block
+_active_keys = set()  # profile keys whose thread is inside a profiled block
+_sampler = None
+
+
+class _NullBlock:
+    """Block used for subsystems that are not profiled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_BLOCK = _NullBlock()
+
+
+class _ProfiledBlock:
+    """Profile the current thread while inside the block (nested blocks on one thread share the profile)"""
+
+    def __init__(self, subsystem, save_on_exit):
+        self.subsystem = subsystem
+        self.save_on_exit = save_on_exit
+
+    def __enter__(self):
+        depth = getattr(_local, "depth", 0)
+        _local.depth = depth + 1
+        if depth:
+            return self
+        key = (self.subsystem, threading.current_thread().name)
+        with _lock:
+            _active_keys.add(key)
+            if _mode == "sampling":
+                _profiles.setdefault(key, Counter())
+                _sampled_threads[threading.get_ident()] = key
+                _start_sampler()
+            else:
+                profile = _profiles.setdefault(key, cProfile.Profile())
+        _local.profile_key = key
+        if _mode != "sampling":
+            try:
+                profile.enable()
+            except ValueError as e:
+                # Python 3.12+ allows only one active cProfile per process
+                print(f"Profiler not started for {key[0]} on {key[1]}: {e} (sampling mode profiles several threads)")
+                with _lock:
+                    _profiles.pop(key, None)
+                    _active_keys.discard(key)
+                _local.profile_key = None
+        return self
+
+    def __exit__(self, *exc_info):
+        _local.depth -= 1
+        if _local.depth:
+            return False
+        key = _local.profile_key
+        with _lock:
+            _active_keys.discard(key)
+            if _mode == "sampling":
+                _sampled_threads.pop(threading.get_ident(), None)
+            elif key in _profiles:
+                _profiles[key].disable()
+        # Only this thread's profile - other threads of the subsystem may still be running
+        if self.save_on_exit and key:
+            _save_keys([key])
+        return False
+
+
+def configure(config_manager=None):
+    """Select profiled subsystems from the environment or the "profiling" config section"""
+    global _mode, _output_dir, _sample_interval, _top
+    settings = config_manager.get("profiling", {}) if config_manager else {}
+    selected = os.environ.get(PROFILE_ENV)
+    selected = [name.strip() for name in selected.split(",")] if selected else settings.get("subsystems", [])
+    if "all" in selected:
+        selected = SUBSYSTEMS
+    if not selected:
+        return
+
+    _mode = os.environ.get(PROFILE_MODE_ENV) or settings.get("mode", "deterministic")
+    if _mode != "sampling" and sys.version_info >= (3, 12):
+        # Python 3.12+ allows only one active cProfile per process - the first thread would win
+        print("Deterministic profiling is limited to one thread on Python 3.12+, using sampling mode")
+        _mode = "sampling"
+    output_dir = settings.get("output_dir", "profiles")
+    if config_manager and not os.path.isabs(output_dir):
+        output_dir = os.path.join(str(config_manager.base_dir), output_dir)
+    _output_dir = output_dir
+    _sample_interval = settings.get("sample_interval_ms", 5) / 1000
+    _top = settings.get("top", 25)
+    _subsystems.update(selected)
+    print(f"Profiling {', '.join(sorted(_subsystems))} ({_mode}), writing to {_output_dir}")
+
+    atexit.register(save)
+    if "gui" in _subsystems:
+        # The GUI thread has no run() to wrap - profile it from here until exit
+        _ProfiledBlock("gui", save_on_exit=False).__enter__()
+
+
+def is_enabled(subsystem):
+    """Check whether a subsystem is profiled"""
+    return subsystem in _subsystems
+
+
+def profiled(subsystem, save_on_exit=False):
+    """Context manager profiling the current thread for a subsystem (no-op object when it isn't selected)"""
+    if subsystem not in _subsystems:
+        return _NULL_BLOCK
+    return _ProfiledBlock(subsystem, save_on_exit)
+
+
+def profiled_thread(subsystem):
+    """Decorator for QThread.run methods - profiles the thread and writes its files when run() returns"""
+    def decorator(run):
+        @functools.wraps(run)
+        def wrapper(*args, **kwargs):
+            with profiled(subsystem, save_on_exit=True):
+                return run(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _start_sampler():
+    """Start the stack sampling thread (caller holds the lock)"""
+    global _sampler
+    if _sampler is None:
+        _sampler = threading.Thread(target=_sample_loop, name="ProfileSampler", daemon=True)
+        _sampler.start()
+
+
+def _sample_loop():
+    """Periodically record the stacks of threads inside profiled blocks"""
+    while True:
+        time.sleep(_sample_interval)
+        frames = sys._current_frames()
+        with _lock:
+            for thread_id, key in _sampled_threads.items():
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stacks = _profiles.get(key)
+                if stack and stacks is not None:
+                    stacks[tuple(reversed(stack))] += 1
+
+
+def save(subsystem=None, finished_only=False):
+    """Write profile files and top-function summaries for every thread of a subsystem (all subsystems if None)
+
+    finished_only skips threads still inside a profiled block - they are written when they finish or at exit.
+    """
+    with _lock:
+        keys = [key for key in _profiles if (subsystem is None or key[0] == subsystem)
+                and not (finished_only and key in _active_keys)]
+    _save_keys(keys)
+
+
+def _save_keys(keys):
+    """Write and drop the profiles of the given (subsystem, thread name) keys"""
+    with _lock:
+        collected = {key: _profiles.pop(key) for key in keys if key in _profiles}
+    if not collected:
+        return
+
+    os.makedirs(_output_dir, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    for (name, thread_name), data in collected.items():
+        base = os.path.join(_output_dir, f"{name}-{thread_name}-{stamp}".replace(" ", "_"))
+        try:
+            if isinstance(data, Counter):
+                summary = _write_sampled(base, data)
+            else:
+                summary = _write_deterministic(base, data)
+            with open(base + ".txt", "w", encoding="utf-8") as f:
+                f.write(summary)
+        except Exception as e:
+            print(f"Error writing profile {base}: {e}")
+    print(f"Profiles written to {_output_dir}")
+
+
+def _write_deterministic(base, profile):
+    """Dump cProfile stats (.prof, for snakeviz/pstats) and return the top functions by cumulative time"""
+    profile.disable()
+    profile.dump_stats(base + ".prof")
+    output = io.StringIO()
+    stats = pstats.Stats(profile, stream=output)
+    stats.sort_stats("cumulative").print_stats(_top)
+    return output.getvalue()
+
+
+def _write_sampled(base, stacks):
+    """Write collapsed stacks (.folded, for flame graph tools) and return the top functions by samples"""
+    with open(base + ".folded", "w", encoding="utf-8") as f:
+        for stack, count in stacks.items():
+            f.write(f"{';'.join(stack)} {count}\n")
+
+    total = sum(stacks.values()) or 1
+    own, inclusive = Counter(), Counter()
+    for stack, count in stacks.items():
+        own[stack[-1]] += count
+        for function in set(stack):
+            inclusive[function] += count
+
+    lines = [f"{total} samples every {_sample_interval * 1000:.0f} ms", "", "Top functions by own samples:"]
+    lines += [f"{count * 100 / total:6.1f}%  {function}" for function, count in own.most_common(_top)]
+    lines += ["", "Top functions by inclusive samples:"]
+    lines += [f"{count * 100 / total:6.1f}%  {function}" for function, count in inclusive.most_common(_top)]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,240 @@
+import re
+import time
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from App.helpers.http_session import get_http_session
+
+
+class _Segment:
+    """One byte range of a download, possibly fetched by two connections at once"""
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end  # Inclusive, as in HTTP Range headers
+        self.received = 0  # Furthest progress of any connection on this segment
+        self.started_at = None
+        self.progress_at = None  # when `received` last grew
+        self.finished_at = None
+        self.hedged = False
+        self.done = threading.Event()
+        self.responses = set()  # open responses of connections on this segment (closed to stop stalled ones)
+        self.lock = threading.Lock()
+
+    def get_rate(self, now):
+        """Average bytes per second since the segment started"""
+        elapsed = (self.finished_at or now) - self.started_at
+        return self.received / max(elapsed, 1e-6)
+
+    def close_responses(self):
+        """Close the connections still reading this segment so their threads end"""
+        with self.lock:
+            responses = list(self.responses)
+        for response in responses:
+            try:
+                response.close()
+            except Exception:
+                pass
+
+
+class RangedDownloader:
+    """Download result files as parallel HTTP Range segments with resume and hedged connections
+
+    A segment gets a hedge (second connection) when it has received no bytes for
+    `hedge_after` seconds, or when after `hedge_after` seconds its throughput is below
+    `slow_fraction` of the median segment throughput.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, limiter=None, enabled=True, segment_size_mb=4, max_connections=4,
+                 max_retries=3, hedge_after=5.0, max_hedges=2, slow_fraction=0.25):
+        self.limiter = limiter
+        self.enabled = enabled
+        self.segment_size = max(256 * 1024, int(segment_size_mb * 1024 * 1024))
+        self.max_connections = max(1, int(max_connections))
+        self.max_retries = max(0, int(max_retries))
+        self.hedge_after = hedge_after
+        self.max_hedges = max(0, int(max_hedges))
+        self.slow_fraction = slow_fraction
+
+    @classmethod
+    def from_config(cls, settings, limiter=None):
+        """Create downloader from the "ranged_download" config section"""
+        settings = settings or {}
+        return cls(
+            limiter,
+            enabled=settings.get("enabled", True),
+            segment_size_mb=settings.get("segment_size_mb", 4),
+            max_connections=settings.get("max_connections", 4),
+            max_retries=settings.get("max_retries", 3),
+            hedge_after=settings.get("hedge_after", 5.0),
+            max_hedges=settings.get("max_hedges", 2),
+            slow_fraction=settings.get("slow_fraction", 0.25)
+        )
+
+    def get_pool_size(self, concurrency):
+        """Connections one host may need when `concurrency` files download at once (segments, hedges and API request)"""
+        if not self.enabled:
+            return concurrency
+        return concurrency * (self.max_connections + self.max_hedges + 1)
+
+    def download(self, url, timeout, progress_callback=None):
+        """Download a URL and return its bytes, None on HTTP errors
+
+        Args:
+            progress_callback: Optional callable(received_bytes, total_bytes)
+        """
+        session = get_http_session()
+        if not self.enabled:
+            response = session.get(url, timeout=timeout, stream=True)
+            return self._read_whole(response, progress_callback)
+
+        # The first segment request doubles as the probe for range support and total size
+        response = session.get(url, timeout=timeout, stream=True,
+                               headers={"Range": f"bytes=0-{self.segment_size - 1}"})
+        if response.status_code == 200:
+            # Server ignores Range - plain single-connection download
+            return self._read_whole(response, progress_callback)
+        total = self._parse_total(response)
+        if response.status_code != 206 or total is None:
+            response.close()
+            return None
+
+        buffer = bytearray(total)
+        segments = [_Segment(start, min(start + self.segment_size, total) - 1)
+                    for start in range(0, total, self.segment_size)]
+        progress_lock = threading.Lock()
+
+        def on_chunk(segment, offset, chunk):
+            # Hedged connections write identical bytes to the same offsets, so order doesn't matter
+            buffer[offset:offset + len(chunk)] = chunk
+            with progress_lock:
+                end = offset + len(chunk) - segment.start
+                if end > segment.received:
+                    segment.received = end
+                    segment.progress_at = time.monotonic()
+                received = sum(s.received for s in segments)
+            if progress_callback:
+                progress_callback(received, total)
+
+        # No "with" blocks - leaving one would wait for a stalled connection whose segment a hedge already finished
+        pool = ThreadPoolExecutor(max_workers=self.max_connections)
+        hedge_pool = ThreadPoolExecutor(max_workers=max(1, self.max_hedges))
+        try:
+            pending = {pool.submit(self._fetch_segment, url, timeout, segments[0], on_chunk, response)}
+            pending.update(pool.submit(self._fetch_segment, url, timeout, segment, on_chunk)
+                           for segment in segments[1:])
+
+            hedges_used = 0
+            while pending and not all(segment.done.is_set() for segment in segments):
+                _, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+
+                # Open a second connection for segments that have stalled or fallen far behind the others
+                now = time.monotonic()
+                with progress_lock:
+                    hedge_candidates = [segment for segment in segments if self._needs_hedge(segment, segments, now)]
+                for segment in hedge_candidates:
+                    if hedges_used >= self.max_hedges:
+                        break
+                    segment.hedged = True
+                    hedges_used += 1
+                    pending.add(hedge_pool.submit(self._fetch_segment, url, timeout, segment, on_chunk))
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+            hedge_pool.shutdown(wait=False, cancel_futures=True)
+            # Connections still reading a finished segment stop at their next chunk or when closed
+            for segment in segments:
+                segment.close_responses()
+
+        if not all(segment.done.is_set() for segment in segments):
+            return None
+        return bytes(buffer)
+
+    def _needs_hedge(self, segment, segments, now):
+        """Whether a running segment is stalled or much slower than the median segment"""
+        if segment.started_at is None or segment.hedged or segment.done.is_set():
+            return False
+        if now - segment.progress_at > self.hedge_after:
+            return True
+        if not self.slow_fraction or now - segment.started_at <= self.hedge_after:
+            return False
+        rates = sorted(s.get_rate(now) for s in segments if s.started_at is not None)
+        median = rates[len(rates) // 2]
+        return segment.get_rate(now) < median * self.slow_fraction
+
+    def _fetch_segment(self, url, timeout, segment, on_chunk, response=None):
+        """Fetch one segment, resuming from the last received byte after connection failures"""
+        if segment.started_at is None:
+            segment.progress_at = segment.started_at = time.monotonic()
+        # A hedge picks up where the slow connection has got to instead of refetching the whole segment
+        offset = segment.start + segment.received
+        attempts = 0
+
+        while not segment.done.is_set():
+            try:
+                if response is None:
+                    response = get_http_session().get(url, timeout=timeout, stream=True,
+                                                      headers={"Range": f"bytes={offset}-{segment.end}"})
+                    if response.status_code != 206:
+                        raise IOError(f"HTTP {response.status_code} for range request")
+
+                with segment.lock:
+                    segment.responses.add(response)
+                with response:
+                    for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                        if segment.done.is_set():
+                            return  # The other connection finished this segment first
+                        chunk = chunk[:segment.end + 1 - offset]
+                        if self.limiter:
+                            self.limiter.throttle_download(len(chunk))
+                        on_chunk(segment, offset, chunk)
+                        offset += len(chunk)
+                        if offset > segment.end:
+                            break
+
+                if offset > segment.end:
+                    segment.finished_at = time.monotonic()
+                    segment.done.set()
+                    return
+                raise IOError("connection closed before the segment ended")
+
+            except Exception as e:
+                if segment.done.is_set():
+                    return  # Closed after the segment was finished elsewhere
+                if not isinstance(e, (requests.exceptions.RequestException, IOError)):
+                    raise
+                attempts += 1
+                if attempts > self.max_retries:
+                    print(f"Giving up on bytes {offset}-{segment.end} of {url}: {e}")
+                    return
+                print(f"Resuming download at byte {offset} after error: {e}")
+                time.sleep(min(0.5 * 2 ** attempts, 5))
+            finally:
+                if response is not None:
+                    with segment.lock:
+                        segment.responses.discard(response)
+                response = None
+
+    def _read_whole(self, response, progress_callback):
+        """Read a non-ranged response in chunks"""
+        with response:
+            if response.status_code != 200:
+                return None
+            total = int(response.headers.get('Content-Length', 0) or 0)
+            received = 0
+            chunks = []
+            for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                if self.limiter:
+                    self.limiter.throttle_download(len(chunk))
+                chunks.append(chunk)
+                received += len(chunk)
+                if progress_callback and total:
+                    progress_callback(min(received, total), total)
+            return b"".join(chunks)
+
+    @staticmethod
+    def _parse_total(response):
+        """Get the full size from a "Content-Range: bytes 0-999/12345" header"""
+        match = re.search(r'/(\d+)\s*$', response.headers.get('Content-Range', ''))
+        return int(match.group(1)) if match else None
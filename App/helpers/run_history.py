@@ -0,0 +1,192 @@
+import csv
+import json
+import sqlite3
+
+
+class RunHistory:
+    """SQLite store of finished runs and their per-file results"""
+
+    FILE_COLUMNS = ("input", "output", "success", "method", "attempts", "bytes_up", "bytes_down", "credits",
+                    "upload_seconds", "server_seconds", "download_seconds", "write_seconds", "input_bytes", "megapixels")
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            started_at TEXT NOT NULL,
+            finished_at TEXT NOT NULL,
+            action TEXT NOT NULL,
+            output_folder TEXT,
+            status TEXT NOT NULL,
+            total INTEGER, processed INTEGER, failed INTEGER,
+            credits INTEGER, bytes_up INTEGER, bytes_down INTEGER,
+            duration_seconds REAL,
+            parameters TEXT
+        );
+        CREATE TABLE IF NOT EXISTS run_files (
+            run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+            input TEXT NOT NULL, output TEXT, success INTEGER, method TEXT, attempts INTEGER,
+            bytes_up INTEGER, bytes_down INTEGER, credits INTEGER,
+            upload_seconds REAL, server_seconds REAL, download_seconds REAL, write_seconds REAL,
+            input_bytes INTEGER, megapixels REAL
+        );
+        CREATE INDEX IF NOT EXISTS run_files_run ON run_files(run_id);
+        CREATE TABLE IF NOT EXISTS credit_balances (
+            recorded_at TEXT NOT NULL,
+            remaining INTEGER NOT NULL,
+            total INTEGER
+        );
+    """
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        conn = self._connect()
+        try:
+            conn.executescript(self.SCHEMA)
+            conn.commit()
+        finally:
+            conn.close()
+
+    @classmethod
+    def from_config(cls, config_manager):
+        """Open the history database next to the app config, None when history is disabled"""
+        settings = config_manager.get("run_history", {})
+        if not settings.get("enabled", True):
+            return None
+        return cls(config_manager.base_dir / "App" / "config" / settings.get("database", "run_history.db"))
+
+    def _connect(self):
+        # One short-lived connection per call - the worker thread writes, the GUI thread reads
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def record_run(self, run, file_details):
+        """Store a finished run
+
+        Args:
+            run (dict): started_at/finished_at (datetime), action, output_folder, status, total,
+                processed, failed, duration_seconds, parameters (dict)
+            file_details (dict): input file -> detail dict from RunMetrics.get_file_details()
+
+        Returns:
+            int: New run id
+        """
+        rows = []
+        for input_file, detail in file_details.items():
+            timings = detail.get("timings", {})
+            rows.append((
+                input_file, detail.get("output", ""), int(bool(detail.get("success"))), detail.get("method", "api"),
+                detail.get("attempts", 0), detail.get("bytes_up", 0), detail.get("bytes_down", 0), detail.get("credits", 0),
+                timings.get("upload", 0.0), timings.get("server", 0.0), timings.get("download", 0.0), timings.get("write", 0.0),
+                detail.get("input_bytes"), detail.get("megapixels")
+            ))
+
+        conn = self._connect()
+        try:
+            with conn:
+                cursor = conn.execute(
+                    "INSERT INTO runs (started_at, finished_at, action, output_folder, status, total, processed, failed, "
+                    "credits, bytes_up, bytes_down, duration_seconds, parameters) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (run["started_at"].isoformat(timespec="seconds"), run["finished_at"].isoformat(timespec="seconds"),
+                     run["action"], run.get("output_folder", ""), run["status"], run.get("total", 0),
+                     run.get("processed", 0), run.get("failed", 0),
+                     sum(row[7] for row in rows), sum(row[5] for row in rows), sum(row[6] for row in rows),
+                     run.get("duration_seconds", 0.0), json.dumps(run.get("parameters", {})))
+                )
+                run_id = cursor.lastrowid
+                conn.executemany(
+                    f"INSERT INTO run_files (run_id, {', '.join(self.FILE_COLUMNS)}) VALUES (?, {', '.join('?' * len(self.FILE_COLUMNS))})",
+                    [(run_id,) + row for row in rows]
+                )
+            return run_id
+        finally:
+            conn.close()
+
+    def get_runs(self, limit=200):
+        """Get the most recent runs as dicts, newest first"""
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT * FROM runs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+            return [dict(row) for row in rows]
+        finally:
+            conn.close()
+
+    def get_run_files(self, run_id):
+        """Get the per-file rows of a run as dicts"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(f"SELECT {', '.join(self.FILE_COLUMNS)} FROM run_files WHERE run_id = ? ORDER BY rowid",
+                                (run_id,)).fetchall()
+            return [dict(row) for row in rows]
+        finally:
+            conn.close()
+
+    def get_latency_samples(self, action, limit=2000):
+        """Get (input_bytes, megapixels, seconds) of recent successful API files of an action, oldest first"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT f.input_bytes, f.megapixels, "
+                "f.upload_seconds + f.server_seconds + f.download_seconds + f.write_seconds AS seconds "
+                "FROM run_files f JOIN runs r ON r.id = f.run_id "
+                "WHERE r.action = ? AND f.method = 'api' AND f.success = 1 ORDER BY f.rowid DESC LIMIT ?",
+                (action, limit)
+            ).fetchall()
+            return [(row["input_bytes"], row["megapixels"], row["seconds"]) for row in reversed(rows)]
+        finally:
+            conn.close()
+
+    def record_balance(self, recorded_at, remaining, total):
+        """Store a credit balance sample if it differs from the last one"""
+        conn = self._connect()
+        try:
+            with conn:
+                last = conn.execute("SELECT remaining, total FROM credit_balances ORDER BY rowid DESC LIMIT 1").fetchone()
+                if last and last["remaining"] == remaining and last["total"] == total:
+                    return False
+                conn.execute("INSERT INTO credit_balances (recorded_at, remaining, total) VALUES (?, ?, ?)",
+                             (recorded_at.isoformat(timespec="seconds"), remaining, total))
+            return True
+        finally:
+            conn.close()
+
+    def get_balances(self, since):
+        """Get (recorded_at, remaining) balance samples since a datetime, oldest first"""
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT recorded_at, remaining FROM credit_balances WHERE recorded_at >= ? ORDER BY rowid",
+                                (since.isoformat(timespec="seconds"),)).fetchall()
+            return [(row["recorded_at"], row["remaining"]) for row in rows]
+        finally:
+            conn.close()
+
+    def get_run_credits(self, since):
+        """Get (finished_at, credits) of runs finished since a datetime, oldest first"""
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT finished_at, credits FROM runs WHERE finished_at >= ? ORDER BY id",
+                                (since.isoformat(timespec="seconds"),)).fetchall()
+            return [(row["finished_at"], row["credits"] or 0) for row in rows]
+        finally:
+            conn.close()
+
+    def export(self, file_path, run_ids):
+        """Export runs with their files to a .json or .csv file (one row per file for CSV)"""
+        runs = {run["id"]: run for run in self.get_runs(limit=-1) if run["id"] in set(run_ids)}
+        if file_path.lower().endswith(".json"):
+            data = [dict(runs[run_id], parameters=json.loads(runs[run_id]["parameters"] or "{}"),
+                         files=self.get_run_files(run_id)) for run_id in run_ids if run_id in runs]
+            with open(file_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            return
+
+        with open(file_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(("run_id", "started_at", "action", "status") + self.FILE_COLUMNS)
+            for run_id in run_ids:
+                run = runs.get(run_id)
+                if not run:
+                    continue
+                for row in self.get_run_files(run_id):
+                    writer.writerow((run_id, run["started_at"], run["action"], run["status"])
+                                    + tuple(row[column] for column in self.FILE_COLUMNS))
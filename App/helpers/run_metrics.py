@@ -0,0 +1,173 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from App.helpers import tracing
+
+
+class RunMetrics:
+    """Thread-safe counters and per-stage latency samples of a processing run, read by the statistics panel"""
+
+    STAGES = ("upload", "server", "download", "write")
+
+    def __init__(self, limiter=None, window=500):
+        self.limiter = limiter  # source of transferred byte counts
+        self.eta_provider = None  # optional callable returning remaining seconds (replaces the files/second ETA)
+        self.lock = threading.Lock()
+        self.started_at = time.monotonic()
+        self.finished_at = None
+        self.total = 0
+        self.completed = 0
+        self.failed = 0
+        self.in_flight = 0
+        # Only the most recent samples are kept so percentiles follow the current network conditions
+        self.samples = {stage: deque(maxlen=window) for stage in self.STAGES}
+        # Per-file totals kept for the run history (input file -> detail dict)
+        self.file_details = {}
+
+    def set_total(self, total):
+        """Set the number of files in the run"""
+        with self.lock:
+            self.total = total
+
+    def file_started(self):
+        """Count a file as in flight"""
+        with self.lock:
+            self.in_flight += 1
+
+    def file_ended(self):
+        """Remove a file from the in-flight count"""
+        with self.lock:
+            self.in_flight = max(0, self.in_flight - 1)
+
+    def file_finished(self, success, file_path=None, output_file=""):
+        """Count a finished file (including duplicates that received a copy)"""
+        with self.lock:
+            self.completed += 1
+            if not success:
+                self.failed += 1
+            if file_path:
+                detail = self._get_detail(file_path)
+                detail["success"] = success
+                detail["output"] = output_file
+
+    def record(self, stage, seconds, file_path=None):
+        """Add a latency sample for a stage, also adding it to the file's stage total"""
+        tracing.record(stage, seconds, file=file_path or "")
+        with self.lock:
+            self.samples[stage].append(seconds)
+            if file_path:
+                timings = self._get_detail(file_path)["timings"]
+                timings[stage] = timings.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def measure(self, stage, file_path=None):
+        """Time the enclosed block as a stage sample"""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record(stage, time.monotonic() - start, file_path)
+
+    def add_file_detail(self, file_path, key, amount):
+        """Add to a per-file counter (attempts, bytes_up, bytes_down, credits)"""
+        with self.lock:
+            detail = self._get_detail(file_path)
+            detail[key] = detail.get(key, 0) + amount
+
+    def set_file_method(self, file_path, method):
+        """Record how a file was produced (api, local, skipped, duplicate)"""
+        self.set_file_detail(file_path, "method", method)
+
+    def set_file_detail(self, file_path, key, value):
+        """Set a per-file value (method, input_bytes, megapixels)"""
+        with self.lock:
+            self._get_detail(file_path)[key] = value
+
+    def get_file_latency(self, file_path):
+        """Sum of a file's stage timings so far"""
+        with self.lock:
+            detail = self.file_details.get(file_path)
+            return sum(detail["timings"].values()) if detail else 0.0
+
+    def get_file_details(self):
+        """Get a copy of the per-file details"""
+        with self.lock:
+            return {path: dict(detail, timings=dict(detail["timings"])) for path, detail in self.file_details.items()}
+
+    def _get_detail(self, file_path):
+        """Get or create a file's detail dict (caller holds the lock)"""
+        detail = self.file_details.get(file_path)
+        if detail is None:
+            detail = self.file_details[file_path] = {"method": "api", "timings": {}, "attempts": 0,
+                                                     "bytes_up": 0, "bytes_down": 0, "credits": 0}
+        return detail
+
+    def finish(self):
+        """Freeze the elapsed time at the end of the run"""
+        with self.lock:
+            self.finished_at = time.monotonic()
+
+    def snapshot(self):
+        """Get the current metrics as a dict"""
+        with self.lock:
+            elapsed = max(0.001, (self.finished_at or time.monotonic()) - self.started_at)
+            samples = {stage: sorted(values) for stage, values in self.samples.items()}
+            completed, failed, total, in_flight = self.completed, self.failed, self.total, self.in_flight
+
+        files_per_second = completed / elapsed
+        remaining = max(0, total - completed)
+        if self.finished_at:
+            eta = None
+        elif self.eta_provider:
+            eta = self.eta_provider()
+        else:
+            eta = remaining / files_per_second if files_per_second else None
+        stats = self.limiter.get_stats() if self.limiter else {}
+        return {
+            "elapsed": elapsed,
+            "completed": completed,
+            "failed": failed,
+            "total": total,
+            "in_flight": in_flight,
+            "files_per_minute": files_per_second * 60,
+            "error_rate": failed / completed if completed else 0.0,
+            "eta": eta,
+            "bytes_uploaded": stats.get("bytes_uploaded", 0),
+            "bytes_downloaded": stats.get("bytes_downloaded", 0),
+            "upload_rate": stats.get("upload_rate", 0),
+            "download_rate": stats.get("download_rate", 0),
+            "latency": {stage: self._percentiles(values) for stage, values in samples.items() if values},
+        }
+
+    @staticmethod
+    def _percentiles(sorted_values):
+        """p50/p95/p99 of sorted samples (nearest rank)"""
+        last = len(sorted_values) - 1
+        return {p: sorted_values[min(last, int(round(p / 100 * last)))] for p in (50, 95, 99)}
+
+    @staticmethod
+    def format_snapshot(snapshot):
+        """Format a snapshot for the statistics panel"""
+        mb = 1024 * 1024
+        lines = [
+            f"{snapshot['completed']}/{snapshot['total']} files, {snapshot['in_flight']} in flight, "
+            f"{snapshot['files_per_minute']:.1f} files/min",
+            f"Up {snapshot['bytes_uploaded'] / mb:.1f} MB ({snapshot['upload_rate'] / mb:.2f} MB/s), "
+            f"down {snapshot['bytes_downloaded'] / mb:.1f} MB ({snapshot['download_rate'] / mb:.2f} MB/s)",
+            f"Errors {snapshot['error_rate'] * 100:.1f}%"
+            + (f", ETA {RunMetrics.format_duration(snapshot['eta'])}" if snapshot["eta"] is not None else ""),
+        ]
+        for stage in RunMetrics.STAGES:
+            latency = snapshot["latency"].get(stage)
+            if latency:
+                lines.append(f"{stage.capitalize()}: p50 {latency[50]:.2f}s, p95 {latency[95]:.2f}s, p99 {latency[99]:.2f}s")
+        return "\n".join(lines)
+
+    @staticmethod
+    def format_duration(seconds):
+        """Format seconds as m:ss or h:mm:ss"""
+        seconds = int(seconds)
+        hours, rest = divmod(seconds, 3600)
+        minutes, seconds = divmod(rest, 60)
+        return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
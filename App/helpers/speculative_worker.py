@@ -0,0 +1,165 @@
+import os
+import time
+import threading
+from PySide6.QtCore import QThread, Signal
+from App.helpers.input_cache import get_input_cache
+from App.helpers.preflight import PreflightValidator
+from App.helpers.action_registry import ActionRegistry
+from App.helpers.http_session import warm_connection, ensure_pool_size
+from App.helpers.ranged_downloader import RangedDownloader
+from App.helpers.url_source import is_url
+from App.helpers.alpha_prefilter import AlphaPrefilter
+from App.helpers import profiling
+
+
+class PreparedBatch:
+    """Results of idle-time work for one action, handed to the processor when Run is pressed"""
+
+    def __init__(self, action):
+        self.action = action
+        self.lock = threading.Lock()
+        self.preflight_results = {}  # file cache key -> (status, value)
+        self.cutouts = {}  # file cache key -> already has a transparent background
+        self.validator = None  # Owns the temp folder of pre-transcoded uploads
+        self.disk_used = 0
+        self.closed = False
+
+    def get_preflight(self, file_path):
+        """Get the earlier preflight (status, value) for a file, None if it must be checked again"""
+        key = self._get_key(file_path)
+        with self.lock:
+            return self.preflight_results.get(key)
+
+    def is_cutout(self, file_path):
+        """Get the earlier alpha prefilter result for a file, None if it must be checked again"""
+        key = self._get_key(file_path)
+        with self.lock:
+            return self.cutouts.get(key)
+
+    def record(self, file_path, preflight_result=None, added_bytes=0, is_cutout=None):
+        """Store results for a file, returns False if the batch was closed meanwhile"""
+        key = self._get_key(file_path)
+        with self.lock:
+            if self.closed or key is None:
+                return False
+            if preflight_result:
+                self.preflight_results[key] = preflight_result
+            if is_cutout is not None:
+                self.cutouts[key] = is_cutout
+            self.disk_used += added_bytes
+            return True
+
+    def get_summary_text(self):
+        """Format a short summary of prepared work"""
+        with self.lock:
+            fixed_count = sum(1 for status, _ in self.preflight_results.values() if status == "fixed")
+            return (f"Prepared {len(self.preflight_results)} files "
+                    f"({fixed_count} pre-transcoded, {self.disk_used / (1024 * 1024):.1f} MB)")
+
+    def cleanup(self):
+        """Close the batch and remove pre-transcoded files"""
+        with self.lock:
+            self.closed = True
+            self.preflight_results.clear()
+            if self.validator:
+                self.validator.cleanup()
+
+    @staticmethod
+    def _get_key(file_path):
+        try:
+            return get_input_cache().make_key(file_path)
+        except OSError:
+            return None
+
+
+class SpeculativePrepWorker(QThread):
+    """Low-priority worker that prepares loaded files while the user is still choosing output and action"""
+
+    progress_updated = Signal(int, int)  # prepared files, total files
+    preparation_completed = Signal(str)  # summary text
+
+    def __init__(self, config_manager, files, action):
+        super().__init__()
+        self.config_manager = config_manager
+        self.files = list(files)
+        self.action = action
+        self.is_cancelled = False
+
+        settings = config_manager.get("speculative_prep", {})
+        self.warm_connection = settings.get("warm_connection", True)
+        # Fraction of wall time this thread may spend working (the rest it sleeps)
+        self.cpu_duty_cycle = min(1.0, max(0.05, settings.get("cpu_duty_cycle", 0.5)))
+        self.disk_budget_bytes = int(settings.get("disk_budget_mb", 512) * 1024 * 1024)
+
+        self.batch = PreparedBatch(action)
+
+    def cancel(self):
+        """Stop preparing (finished results stay usable)"""
+        self.is_cancelled = True
+
+    @profiling.profiled_thread("prep")
+    def run(self):
+        """Preflight and pre-transcode files, then warm the API connection"""
+        try:
+            profile = ActionRegistry(self.config_manager).get(self.action)
+            if not profile:
+                return
+
+            validator = PreflightValidator.from_config(self.config_manager.get("preflight", {}), profile)
+            self.batch.validator = validator
+            self.alpha_prefilter = AlphaPrefilter.from_config(self.config_manager.get("alpha_prefilter", {}), self.action)
+
+            total = len(self.files)
+            for index, file_path in enumerate(self.files):
+                if self.is_cancelled:
+                    return
+
+                started = time.monotonic()
+                try:
+                    self.prepare_file(file_path, validator)
+                except Exception as e:
+                    # The processor will simply do this file's work itself
+                    print(f"Speculative preparation failed for {file_path}: {e}")
+                self.progress_updated.emit(index + 1, total)
+
+                # Stay within the CPU budget by sleeping in proportion to the work just done
+                busy = time.monotonic() - started
+                idle = busy * (1 - self.cpu_duty_cycle) / self.cpu_duty_cycle
+                while idle > 0 and not self.is_cancelled:
+                    time.sleep(min(idle, 0.1))
+                    idle -= 0.1
+
+            # Warm last so the pooled connection is still fresh when Run is pressed
+            if self.warm_connection and profile.endpoint_url and not self.is_cancelled:
+                # Size the pool the way the processor will, so the warm connection isn't dropped by a resize
+                downloader = RangedDownloader.from_config(self.config_manager.get("ranged_download", {}))
+                ensure_pool_size(downloader.get_pool_size(profile.concurrency))
+                warm_connection(profile.endpoint_url)
+
+            if not self.is_cancelled:
+                self.preparation_completed.emit(self.batch.get_summary_text())
+        except Exception as e:
+            print(f"Speculative preparation error: {e}")
+
+    def prepare_file(self, file_path, validator):
+        """Do all speculative work for one file"""
+        if is_url(file_path):
+            # Hosted images are sent as URLs, there are no local bytes to prepare
+            return
+
+        result = None
+        added_bytes = 0
+        if validator:
+            allow_fix = self.batch.disk_used < self.disk_budget_bytes
+            status, value = validator.check_file(file_path, allow_fix=allow_fix)
+            if status == "fixed":
+                added_bytes = os.path.getsize(value)
+            # Deferred files are left for the processor to fix when Run is pressed
+            if status != "deferred":
+                result = (status, value)
+
+        is_cutout = self.alpha_prefilter.is_cutout(file_path) if self.alpha_prefilter else None
+        
+        if not self.batch.record(file_path, result, added_bytes, is_cutout) and result and result[0] == "fixed":
+            # Batch was discarded while this file was being transcoded
+            validator.cleanup()
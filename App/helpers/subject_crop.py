@@ -0,0 +1,140 @@
+import os
+import shutil
+import tempfile
+import threading
+import numpy as np
+from PIL import Image, ImageOps
+from App.helpers.input_cache import get_input_cache
+
+
+class SubjectCropper:
+    """Crop uploads to the subject's bounding box and re-pad results to the original canvas"""
+
+    def __init__(self, margin=0.05, min_saving=0.25, threshold=24, sample_size=512):
+        self.margin = margin
+        self.min_saving = min_saving
+        self.threshold = threshold
+        self.sample_size = sample_size
+        self.temp_dir = None
+        self.lock = threading.Lock()  # Files are cropped on several pool threads
+
+    @classmethod
+    def from_config(cls, settings, action):
+        """Create cropper from the "subject_crop" config section, None if it doesn't apply to the action"""
+        settings = settings or {}
+        if not settings.get("enabled", False) or action not in settings.get("actions", ["Remove Bg"]):
+            return None
+        return cls(
+            margin=settings.get("margin", 0.05),
+            min_saving=settings.get("min_saving", 0.25),
+            threshold=settings.get("threshold", 24),
+            sample_size=settings.get("sample_size", 512)
+        )
+
+    def find_box(self, img):
+        """Find the subject bounding box (left, top, right, bottom) in full-resolution pixels, None if not worth cropping
+
+        The box is in EXIF-upright orientation. The image is shrunk in place (JPEG draft, then reduce)
+        before any conversion - reopen it to crop.
+        """
+        full_width, full_height = img.size
+        if img.getexif().get(0x0112, 1) in (5, 6, 7, 8):
+            # 90-degree orientations swap the upright canvas
+            full_width, full_height = full_height, full_width
+        img.draft("RGB", (self.sample_size, self.sample_size))
+        img.thumbnail((self.sample_size, self.sample_size), Image.Resampling.BILINEAR)
+        pixels = np.asarray(ImageOps.exif_transpose(img).convert("RGB"), dtype=np.int16)
+        height, width = pixels.shape[:2]
+        if height < 8 or width < 8:
+            return None
+
+        # Studio backdrops are near-uniform - estimate the backdrop from the outermost pixels
+        border = np.concatenate([pixels[0], pixels[-1], pixels[:, 0], pixels[:, -1]])
+        backdrop = np.median(border, axis=0)
+        mask = np.abs(pixels - backdrop).max(axis=2) > self.threshold
+
+        # Ignore rows/columns with only a few stray pixels (noise, dust, vignetting)
+        rows = np.flatnonzero(mask.sum(axis=1) > max(1, width // 200))
+        cols = np.flatnonzero(mask.sum(axis=0) > max(1, height // 200))
+        if not len(rows) or not len(cols):
+            return None
+
+        scale_x, scale_y = full_width / width, full_height / height
+        margin_x = int(full_width * self.margin)
+        margin_y = int(full_height * self.margin)
+        box = (
+            max(0, int(cols[0] * scale_x) - margin_x),
+            max(0, int(rows[0] * scale_y) - margin_y),
+            min(full_width, int((cols[-1] + 1) * scale_x) + margin_x),
+            min(full_height, int((rows[-1] + 1) * scale_y) + margin_y),
+        )
+
+        box_area = (box[2] - box[0]) * (box[3] - box[1])
+        if box_area > full_width * full_height * (1 - self.min_saving):
+            return None
+        return box
+
+    def prepare(self, file_path):
+        """Write a cropped upload file
+
+        Returns:
+            tuple: (crop_path, box, original_size) or None when the image should be sent whole
+
+        The crop and original_size are EXIF-upright, so the re-padded result is upright too.
+        """
+        try:
+            img = get_input_cache().open_image(file_path)
+            if img is None:
+                return None
+            with img:
+                box = self.find_box(img)
+            if not box:
+                return None
+            img = get_input_cache().open_image(file_path)
+            if img is None:
+                return None
+            with img:
+                is_jpeg = img.format == "JPEG"
+                upright = ImageOps.exif_transpose(img)
+                cropped = upright.crop(box)
+                original_size = upright.size
+
+            with self.lock:
+                if not self.temp_dir:
+                    self.temp_dir = tempfile.mkdtemp(prefix="pikselcat_crop_")
+            stem = os.path.splitext(os.path.basename(file_path))[0]
+            fd, crop_path = tempfile.mkstemp(prefix=f"{stem}_", suffix=".jpg" if is_jpeg else ".png", dir=self.temp_dir)
+            os.close(fd)
+            if is_jpeg:
+                cropped.convert("RGB").save(crop_path, "JPEG", quality=95)
+            else:
+                cropped.save(crop_path, "PNG")
+            return crop_path, box, original_size
+        except Exception as e:
+            print(f"Subject crop failed for {file_path}: {e}")
+            return None
+
+    def repad(self, result_path, box, original_size):
+        """Place a cut-out result back onto a transparent canvas of the original size"""
+        with Image.open(result_path) as result:
+            result = result.convert("RGBA")
+        box_size = (box[2] - box[0], box[3] - box[1])
+        if result.size != box_size:
+            result = result.resize(box_size, Image.Resampling.LANCZOS)
+
+        canvas = Image.new("RGBA", original_size, (0, 0, 0, 0))
+        canvas.paste(result, box[:2])
+        canvas.save(result_path, "PNG")
+
+    def release(self, crop_path):
+        """Remove a cropped upload once it has been sent"""
+        try:
+            os.remove(crop_path)
+        except OSError:
+            pass
+
+    def cleanup(self):
+        """Remove the temporary crop folder"""
+        if self.temp_dir:
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+            self.temp_dir = None
@@ -0,0 +1,114 @@
+import atexit
+import json
+import os
+import threading
+import time
+
+# Set PIKSELCAT_TRACE=<file.json> (or enable "tracing" in the config) to record a Chrome trace / Perfetto timeline
+TRACE_ENV = "PIKSELCAT_TRACE"
+
+_lock = threading.Lock()
+_events = []
+_thread_names = {}
+_output_path = None
+_pid = os.getpid()
+
+
+class _NullSpan:
+    """Span used while tracing is off - entering and leaving it does nothing"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Span that records a complete ("X") event when it ends"""
+
+    __slots__ = ("name", "category", "args", "start")
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        _add_event(self.name, self.category, self.start, time.perf_counter() - self.start, self.args)
+        return False
+
+
+def configure(config_manager=None):
+    """Enable tracing from the environment variable or the "tracing" config section"""
+    output_path = os.environ.get(TRACE_ENV)
+    settings = config_manager.get("tracing", {}) if config_manager else {}
+    if not output_path and settings.get("enabled", False):
+        output_path = settings.get("output", "pikselcat_trace.json")
+        if config_manager and not os.path.isabs(output_path):
+            output_path = os.path.join(str(config_manager.base_dir), output_path)
+    if output_path:
+        enable(output_path)
+
+
+def enable(output_path):
+    """Start recording spans, saved to output_path by save() and at exit"""
+    global _output_path
+    if _output_path is None:
+        atexit.register(save)
+    _output_path = output_path
+    print(f"Tracing enabled, writing {output_path}")
+
+
+def is_enabled():
+    """Check whether spans are being recorded"""
+    return _output_path is not None
+
+
+def span(name, category="pipeline", **args):
+    """Context manager timing a block as a trace span (shared no-op object when tracing is off)"""
+    if _output_path is None:
+        return _NULL_SPAN
+    return _Span(name, category, args)
+
+
+def record(name, seconds, category="pipeline", **args):
+    """Record a span that ended just now and lasted `seconds` (for intervals measured elsewhere)"""
+    if _output_path is None:
+        return
+    _add_event(name, category, time.perf_counter() - seconds, seconds, args)
+
+
+def _add_event(name, category, start, duration, args):
+    thread_id = threading.get_ident()
+    event = {"name": name, "cat": category, "ph": "X", "pid": _pid, "tid": thread_id,
+             "ts": start * 1_000_000, "dur": duration * 1_000_000}
+    if args:
+        event["args"] = {key: str(value) for key, value in args.items()}
+    with _lock:
+        if thread_id not in _thread_names:
+            _thread_names[thread_id] = threading.current_thread().name
+        _events.append(event)
+
+
+def save():
+    """Write all recorded spans as Chrome trace JSON (opens in chrome://tracing and ui.perfetto.dev)"""
+    if _output_path is None:
+        return
+    with _lock:
+        events = list(_events)
+        thread_names = dict(_thread_names)
+    metadata = [{"name": "thread_name", "ph": "M", "pid": _pid, "tid": thread_id, "args": {"name": name}}
+                for thread_id, name in thread_names.items()]
+    try:
+        with open(_output_path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)
+    except OSError as e:
+        print(f"Error writing trace {_output_path}: {e}")
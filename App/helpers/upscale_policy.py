@@ -0,0 +1,103 @@
+import io
+import math
+import shutil
+from PIL import Image
+from App.helpers.input_cache import get_input_cache
+
+
+class UpscalePolicy:
+    """Choose 2x, 4x or no upscale per file to reach a target size, then optionally fit the result to it"""
+
+    SCALES = (2, 4)
+
+    def __init__(self, target_long_edge=0, target_megapixels=0, downscale=True, fit_skipped=False, scale_param="scale"):
+        self.target_long_edge = target_long_edge or 0
+        self.target_megapixels = target_megapixels or 0
+        self.downscale = downscale
+        self.fit_skipped = fit_skipped  # also downscale files copied without upscaling
+        self.scale_param = scale_param
+
+    @classmethod
+    def from_profile(cls, profile):
+        """Create policy from an action profile's "policy" settings, None for fixed-scale actions or a policy without a target"""
+        settings = profile.settings.get("policy") if profile else None
+        if not settings:
+            return None
+        if not settings.get("target_long_edge") and not settings.get("target_megapixels"):
+            # Without a target every file would look large enough and be copied without upscaling
+            print(f"Upscale policy of {profile.name} has no target size - using the fixed scale")
+            return None
+        return cls(
+            target_long_edge=settings.get("target_long_edge", 0),
+            target_megapixels=settings.get("target_megapixels", 0),
+            downscale=settings.get("downscale", True),
+            fit_skipped=settings.get("fit_skipped", False),
+            scale_param=settings.get("scale_param", "scale")
+        )
+
+    def get_required_factor(self, width, height):
+        """Linear scale factor needed to reach the target (<= 1 means already large enough)"""
+        factor = 0.0
+        if self.target_long_edge:
+            factor = max(factor, self.target_long_edge / max(1, width, height))
+        if self.target_megapixels:
+            factor = max(factor, math.sqrt(self.target_megapixels * 1_000_000 / max(1, width * height)))
+        return factor
+
+    def choose_scale(self, file_path):
+        """Pick the smallest upscale reaching the target from the image header, None to skip"""
+        header = get_input_cache().get_header(file_path)
+        if not header:
+            return self.SCALES[0]
+        return self.choose_scale_for_size(header["width"], header["height"])
+
+    def choose_scale_for_data(self, data):
+        """Pick the upscale for image bytes fetched from a URL, None to skip"""
+        try:
+            with Image.open(io.BytesIO(data)) as img:
+                width, height = img.size
+        except Exception:
+            return self.SCALES[0]
+        return self.choose_scale_for_size(width, height)
+
+    def choose_scale_for_size(self, width, height):
+        """Pick the smallest upscale reaching the target for an image size, None to skip"""
+        factor = self.get_required_factor(width, height)
+        if factor <= 1.0:
+            return None
+        for scale in self.SCALES:
+            if scale >= factor:
+                return scale
+        return self.SCALES[-1]
+
+    def get_target_size(self, width, height):
+        """Get the size that exactly meets the target, keeping aspect ratio"""
+        factor = self.get_required_factor(width, height)
+        return max(1, round(width * factor)), max(1, round(height * factor))
+
+    def fit_to_target(self, file_path):
+        """Downscale a result in place if it overshoots the target"""
+        if not self.downscale:
+            return False
+        with Image.open(file_path) as img:
+            img.load()
+            target_size = self.get_target_size(img.width, img.height)
+            if target_size[0] >= img.width:
+                return False
+            resized = img.resize(target_size, Image.Resampling.LANCZOS)
+            save_kwargs = {"quality": 95} if img.format == "JPEG" else {}
+            if "icc_profile" in img.info:
+                save_kwargs["icc_profile"] = img.info["icc_profile"]
+            image_format = img.format
+        resized.save(file_path, image_format, **save_kwargs)
+        return True
+
+    def write_skipped(self, source, output_path):
+        """Copy a file (path or fetched bytes) that already meets the target to its output, unchanged unless fit_skipped is set"""
+        if isinstance(source, bytes):
+            with open(output_path, 'wb') as f:
+                f.write(source)
+        else:
+            shutil.copyfile(source, output_path)
+        if self.fit_skipped:
+            self.fit_to_target(output_path)
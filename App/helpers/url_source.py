@@ -0,0 +1,86 @@
+import os
+import re
+import csv
+import hashlib
+from urllib.parse import urlparse, unquote
+
+
+# Text and CSV files whose cells are image URLs
+URL_LIST_EXTENSIONS = {'.txt', '.csv'}
+
+_URL_PATTERN = re.compile(r'https?://[^\s,;"\'<>]+', re.IGNORECASE)
+
+# Leading bytes of image formats the API can return -> file extension
+_IMAGE_SIGNATURES = ((b"\x89PNG", ".png"), (b"\xff\xd8\xff", ".jpg"), (b"GIF8", ".gif"),
+                     (b"II*\x00", ".tif"), (b"MM\x00*", ".tif"))
+
+
+def is_url(value):
+    """Check whether an input entry is a remote http(s) URL instead of a local path"""
+    return isinstance(value, str) and value[:8].lower().startswith(("http://", "https://"))
+
+
+def extract_urls(text):
+    """Extract http(s) URLs from pasted text, keeping order and dropping duplicates"""
+    seen = set()
+    urls = []
+    for match in _URL_PATTERN.findall(text or ""):
+        url = match.rstrip(").]")
+        if url not in seen:
+            seen.add(url)
+            urls.append(url)
+    return urls
+
+
+def is_url_list_file(file_path):
+    """Check whether a local file is a .txt/.csv list of URLs"""
+    return os.path.splitext(file_path)[1].lower() in URL_LIST_EXTENSIONS
+
+
+def read_url_list(file_path):
+    """Read image URLs from a text file (one per line) or any cell of a CSV file"""
+    try:
+        with open(file_path, 'r', encoding='utf-8-sig', errors='replace', newline='') as f:
+            if file_path.lower().endswith('.csv'):
+                return extract_urls("\n".join(cell for row in csv.reader(f) for cell in row))
+            return extract_urls(f.read())
+    except OSError as e:
+        print(f"Error reading URL list {file_path}: {e}")
+        return []
+
+
+def expand_url_lists(files):
+    """Replace .txt/.csv URL list files in an input list with the URLs they contain"""
+    expanded = []
+    for file_path in files:
+        if not is_url(file_path) and is_url_list_file(file_path):
+            expanded.extend(read_url_list(file_path))
+        else:
+            expanded.append(file_path)
+    return expanded
+
+
+def get_url_filename(url):
+    """Get a file name for a URL from its path, used for display and output naming"""
+    name = unquote(os.path.basename(urlparse(url).path))
+    # Decoded names may contain characters that are not valid in Windows file names
+    name = re.sub(r'[<>:"/\\|?*\x00-\x1f]', '_', name)
+    if not os.path.splitext(name)[1]:
+        # Extension-less URLs (CDN ids, query-string images) get a short URL hash so names stay unique
+        name = f"{name or 'image'}_{hashlib.sha1(url.encode('utf-8')).hexdigest()[:8]}"
+    return name
+
+
+def get_image_extension(data, default=".png"):
+    """Get the file extension matching image bytes (for outputs of extension-less URLs)"""
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return ".webp"
+    for signature, extension in _IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return extension
+    return default
+
+
+def get_url_host(url):
+    """Get the host name of a URL"""
+    return urlparse(url).netloc
@@ -1,4 +1,5 @@
 from PySide6.QtCore import QTimer, QObject, Signal
+from App.helpers import tracing
 import os
 
 class WidgetCreationManager(QObject):
@@ -61,7 +62,8 @@ class WidgetCreationManager(QObject):
         try:
             # Create widget (this happens in main thread)
             from App.controller.loaded_item_widget import LoadedItemWidget
-            widget = LoadedItemWidget(file_path, self.parent_widget)
+            with tracing.span("create_widget", file=file_path):
+                widget = LoadedItemWidget(file_path, self.parent_widget)
             
             # Check cancellation after widget creation
             if self.cancelled:
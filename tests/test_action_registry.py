@@ -0,0 +1,52 @@
+from App.helpers.action_registry import ActionProfile, ActionRegistry
+
+ENDPOINTS = {"upscale": "https://api.example.com/v1/upscale", "remove_background": "https://api.example.com/v1/remove"}
+
+
+class Config:
+    def __init__(self, **sections):
+        self.sections = sections
+
+    def get(self, key, default=None):
+        return self.sections.get(key, default)
+
+
+def test_default_profiles_when_config_has_none():
+    registry = ActionRegistry(Config(api_endpoints=ENDPOINTS))
+    assert registry.names() == list(ActionRegistry.DEFAULT_PROFILES)
+    remove_bg = registry.get("Remove Bg")
+    assert remove_bg.endpoint_url == ENDPOINTS["remove_background"]
+    assert remove_bg.params == {"format": "png"}
+    assert registry.get_cost("Upscale 4x") == 10
+    assert ActionRegistry().get("Upscale 2x").endpoint_url is None
+
+
+def test_configured_profiles_replace_the_defaults():
+    profiles = {"Fast Cut": {"endpoint": "https://other.example.com/cut", "params": {"format": "png", "crop": True},
+                             "concurrency": 8, "timeout": 120, "download_timeout": 15, "request_interval": 0.1,
+                             "cost": 3, "constraints": {"max_megapixels": 25}}}
+    registry = ActionRegistry(Config(action_profiles=profiles, api_endpoints=ENDPOINTS))
+    assert registry.names() == ["Fast Cut"]
+    profile = registry.get("Fast Cut")
+    assert profile.endpoint_url == "https://other.example.com/cut"
+    # Form parameters are strings, JSON parameters keep their types
+    assert profile.params == {"format": "png", "crop": "True"}
+    assert profile.json_params == {"format": "png", "crop": True}
+    assert (profile.concurrency, profile.timeout, profile.download_timeout, profile.request_interval) == (8, 120, 15, 0.1)
+    assert profile.constraints == {"max_megapixels": 25}
+    assert registry.get("Remove Bg") is None and registry.get_cost("Remove Bg") == 0
+
+
+def test_profile_defaults():
+    profile = ActionProfile("Plain", {"endpoint": "upscale", "concurrency": 0}, ENDPOINTS)
+    assert profile.concurrency == 1
+    assert (profile.timeout, profile.download_timeout, profile.request_interval) == (60, 30, 0.5)
+    assert profile.url_param is None and profile.cost == 0
+
+
+def test_output_filenames():
+    remove_bg = ActionRegistry().get("Remove Bg")
+    upscale = ActionRegistry().get("Upscale 2x")
+    assert remove_bg.get_output_filename("/in/photo.jpg") == "photo_removed_bg.png"
+    assert upscale.get_output_filename("/in/photo.jpg") == "photo_upscaled_2x.jpg"
+    assert upscale.get_output_filename("https://cdn.com/shop/shoe.webp?w=100") == "shoe_upscaled_2x.webp"
@@ -0,0 +1,65 @@
+import numpy as np
+from PIL import Image
+from App.helpers.alpha_prefilter import AlphaPrefilter
+
+
+def cutout_alpha(size=100, subject=(30, 70)):
+    alpha = np.zeros((size, size), dtype=np.uint8)
+    alpha[subject[0]:subject[1], subject[0]:subject[1]] = 255
+    return alpha
+
+
+def save(path, img):
+    img.save(path)
+    return str(path)
+
+
+def test_transparent_border_with_subject_is_a_cutout():
+    assert AlphaPrefilter().classify_alpha(cutout_alpha())
+
+
+def test_opaque_or_empty_images_are_not_cutouts():
+    prefilter = AlphaPrefilter()
+    assert not prefilter.classify_alpha(np.full((100, 100), 255, dtype=np.uint8))
+    assert not prefilter.classify_alpha(np.zeros((100, 100), dtype=np.uint8))
+
+
+def test_subject_touching_the_border_is_not_a_cutout():
+    assert not AlphaPrefilter().classify_alpha(cutout_alpha(subject=(0, 100)))
+
+
+def test_files_are_checked_by_header_and_alpha(tmp_path):
+    rgba = Image.new("RGBA", (200, 200), (0, 0, 0, 0))
+    rgba.paste((255, 0, 0, 255), (50, 50, 150, 150))
+    cutout = save(tmp_path / "cutout.png", rgba)
+    opaque = save(tmp_path / "opaque.jpg", Image.new("RGB", (200, 200), "white"))
+    palette = save(tmp_path / "palette.png", Image.new("P", (200, 200)))
+
+    prefilter = AlphaPrefilter()
+    assert prefilter.is_cutout(cutout)
+    assert not prefilter.is_cutout(opaque)
+    assert not prefilter.is_cutout(palette)
+    assert not prefilter.is_cutout("https://example.com/cutout.png")
+
+
+def test_find_cutouts_uses_lookup_and_stops_when_cancelled(tmp_path):
+    opaque = save(tmp_path / "opaque.jpg", Image.new("RGB", (50, 50)))
+    prefilter = AlphaPrefilter()
+    assert prefilter.find_cutouts([opaque, "known.png"], lookup=lambda f: True if f == "known.png" else None) == ["known.png"]
+    assert prefilter.find_cutouts([opaque], is_cancelled=lambda: True) == []
+
+
+def test_from_config_only_for_listed_actions():
+    assert AlphaPrefilter.from_config({}, "Remove Bg") is not None
+    assert AlphaPrefilter.from_config({}, "Upscale") is None
+    assert AlphaPrefilter.from_config({"enabled": False}, "Remove Bg") is None
+
+
+def test_missing_file_is_not_a_cutout(tmp_path):
+    rgba = Image.new("RGBA", (200, 200), (0, 0, 0, 0))
+    rgba.paste((255, 0, 0, 255), (50, 50, 150, 150))
+    cutout = save(tmp_path / "cutout.png", rgba)
+    missing = str(tmp_path / "moved.png")
+    prefilter = AlphaPrefilter()
+    assert not prefilter.is_cutout(missing)
+    assert prefilter.find_cutouts([missing, cutout]) == [cutout]
@@ -0,0 +1,69 @@
+import time
+from datetime import datetime
+from App.helpers import bandwidth_limiter
+from App.helpers.bandwidth_limiter import BandwidthLimiter, TokenBucket
+
+
+def freeze_time(monkeypatch, moment):
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return moment
+    monkeypatch.setattr(bandwidth_limiter, "datetime", FrozenDatetime)
+
+
+def test_unlimited_bucket_never_waits():
+    bucket = TokenBucket(0)
+    start = time.monotonic()
+    bucket.consume(100 * 1024 * 1024)
+    assert time.monotonic() - start < 0.05
+
+
+def test_bucket_paces_to_rate():
+    bucket = TokenBucket(100_000, burst_bytes=10_000)
+    start = time.monotonic()
+    bucket.consume(30_000)
+    # Starts empty, so 30 KB at 100 KB/s take about 0.3 s
+    assert 0.2 < time.monotonic() - start < 1.0
+
+
+def test_default_burst_is_a_quarter_second():
+    assert TokenBucket(400_000).burst == 100_000
+    assert TokenBucket(1000).burst == 16 * 1024
+
+
+def test_disabled_limiter_has_no_limits():
+    limiter = BandwidthLimiter({"enabled": False, "upload_kbps": 100})
+    assert limiter.get_current_limits() == (0, 0)
+    assert limiter.upload_bucket.rate == 0
+
+
+def test_schedule_window_overrides_defaults(monkeypatch):
+    settings = {"enabled": True, "upload_kbps": 100, "download_kbps": 200,
+                "schedule": [{"start": "09:00", "end": "17:00", "upload_kbps": 10, "download_kbps": 20}]}
+    freeze_time(monkeypatch, datetime(2024, 1, 1, 12, 0))
+    limiter = BandwidthLimiter(settings)
+    assert limiter.get_current_limits() == (10, 20)
+    assert limiter.upload_bucket.rate == 10 * 1024
+    freeze_time(monkeypatch, datetime(2024, 1, 1, 18, 0))
+    assert limiter.get_current_limits() == (100, 200)
+
+
+def test_schedule_window_wraps_midnight_and_filters_days(monkeypatch):
+    settings = {"enabled": True, "schedule": [{"start": "22:00", "end": "06:00", "days": [0], "upload_kbps": 5}]}
+    limiter = BandwidthLimiter(settings)
+    freeze_time(monkeypatch, datetime(2024, 1, 1, 23, 30))  # Monday
+    assert limiter.get_current_limits() == (5, 0)
+    freeze_time(monkeypatch, datetime(2024, 1, 1, 3, 0))
+    assert limiter.get_current_limits() == (5, 0)
+    freeze_time(monkeypatch, datetime(2024, 1, 2, 23, 30))  # Tuesday
+    assert limiter.get_current_limits() == (0, 0)
+
+
+def test_stats_count_transferred_bytes():
+    limiter = BandwidthLimiter()
+    limiter.throttle_upload(1000)
+    limiter.throttle_download(3000)
+    stats = limiter.get_stats()
+    assert (stats["bytes_uploaded"], stats["bytes_downloaded"]) == (1000, 3000)
+    assert limiter.get_stats_text().startswith("up ")
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+from App.helpers.credit_forecast import CreditForecast
+
+NOW = datetime(2024, 5, 15, 12, 0, 0)
+
+
+class FakeHistory:
+    def __init__(self, balances=(), run_credits=()):
+        self.balances = [((NOW - timedelta(days=days)).isoformat(), remaining) for days, remaining in balances]
+        self.run_credits = [((NOW - timedelta(days=days)).isoformat(), credits) for days, credits in run_credits]
+
+    def get_balances(self, since):
+        return [b for b in self.balances if b[0] >= since.isoformat()]
+
+    def get_run_credits(self, since):
+        return [r for r in self.run_credits if r[0] >= since.isoformat()]
+
+
+def test_burn_rate_from_balance_drops_ignores_top_ups():
+    # 100 used, then a top-up, then 50 used, over 5 days
+    history = FakeHistory(balances=[(5, 1000), (3, 900), (2, 2000), (1, 1950)])
+    assert CreditForecast(history).get_burn_rate(NOW) == 30.0
+
+
+def test_burn_rate_falls_back_to_run_credits():
+    history = FakeHistory(balances=[(3, 500)], run_credits=[(4, 20), (2, 20)])
+    assert CreditForecast(history).get_burn_rate(NOW) == 10.0
+
+
+def test_short_span_is_stretched_to_the_minimum():
+    history = FakeHistory(run_credits=[(1 / 24, 48)])
+    assert CreditForecast(history, min_span_days=1.0).get_burn_rate(NOW) == 48.0
+
+
+def test_samples_outside_the_window_are_ignored():
+    history = FakeHistory(balances=[(30, 5000), (20, 100)])
+    assert CreditForecast(history, window_days=14).get_burn_rate(NOW) == 0.0
+
+
+def test_forecast_projects_depletion_before_expiry():
+    forecast = CreditForecast(FakeHistory(run_credits=[(10, 100)])).forecast(50, 30, {"Remove Bg": 1, "Upscale": 3, "Free": 0}, NOW)
+    assert forecast["burn_rate"] == 10.0
+    assert forecast["days_left"] == 5.0
+    assert forecast["depletion_date"] == NOW + timedelta(days=5)
+    assert forecast["runs_out_first"]
+    assert forecast["coverage"] == {"Remove Bg": 50, "Upscale": 16}
+    text = CreditForecast.format_forecast(forecast)
+    assert "runs out ~2024-05-20" in text and "before the period expires" in text
+
+
+def test_forecast_without_usage():
+    forecast = CreditForecast(FakeHistory()).forecast(50, 30, {}, NOW)
+    assert forecast["days_left"] is None and not forecast["runs_out_first"]
+    assert CreditForecast.format_forecast(forecast) == "Burn rate: no usage recorded yet"
+
+
+def test_batch_warning_uses_cached_rate():
+    forecaster = CreditForecast(FakeHistory(run_credits=[(10, 100)]), warn_days=3)
+    assert forecaster.get_batch_warning(5) is None  # not computed yet
+    forecaster.refresh_burn_rate(NOW)
+    assert forecaster.get_batch_warning(40) is None
+    assert forecaster.get_batch_warning(15) == "leaves ~1.5 days of credits at 10/day"
@@ -0,0 +1,54 @@
+import os
+from App.helpers.duplicate_finder import DuplicateFinder, fan_out
+
+
+def write(path, data):
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_identical_files_are_grouped_in_batch_order(tmp_path):
+    payload = os.urandom(200 * 1024)
+    a = write(tmp_path / "a.jpg", payload)
+    b = write(tmp_path / "b.jpg", payload)
+    c = write(tmp_path / "c.jpg", payload)
+    unique = write(tmp_path / "unique.jpg", os.urandom(1000))
+    assert DuplicateFinder().find_groups([b, unique, a, c]) == {b: [a, c]}
+
+
+def test_same_size_and_ends_but_different_middle(tmp_path):
+    edge = os.urandom(DuplicateFinder.EDGE_SIZE)
+    a = write(tmp_path / "a.jpg", edge + b"\x00" * 1000 + edge)
+    b = write(tmp_path / "b.jpg", edge + b"\x01" * 1000 + edge)
+    assert DuplicateFinder().find_groups([a, b]) == {}
+
+
+def test_urls_and_missing_files_are_ignored(tmp_path):
+    a = write(tmp_path / "a.jpg", b"same")
+    files = [a, "https://example.com/a.jpg", str(tmp_path / "missing.jpg")]
+    assert DuplicateFinder().find_groups(files) == {}
+
+
+def test_cancel_returns_no_groups(tmp_path):
+    a = write(tmp_path / "a.jpg", b"same")
+    b = write(tmp_path / "b.jpg", b"same")
+    assert DuplicateFinder().find_groups([a, b], is_cancelled=lambda: True) == {}
+
+
+def test_fan_out_copy_and_hardlink(tmp_path):
+    source = write(tmp_path / "result.png", b"result")
+    target = str(tmp_path / "copy.png")
+    assert fan_out(source, target, "copy") == "copy"
+    assert open(target, "rb").read() == b"result"
+
+    # An existing target is replaced
+    assert fan_out(source, target, "hardlink") == "hardlink"
+    assert os.path.samefile(source, target)
+
+
+def test_fan_out_auto_produces_a_file(tmp_path):
+    source = write(tmp_path / "result.png", b"result")
+    target = str(tmp_path / "dup.png")
+    assert fan_out(source, target) in ("reflink", "hardlink", "copy")
+    assert open(target, "rb").read() == b"result"
+    assert fan_out(source, source) == "same"
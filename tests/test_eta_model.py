@@ -0,0 +1,67 @@
+import pytest
+from App.helpers.eta_model import EtaModel
+
+MB = 1024 * 1024
+
+
+def trained_model(samples=20):
+    # latency = 1 + 2 s/MB + 0.5 s/MP
+    model = EtaModel(forgetting=1.0)
+    for i in range(samples):
+        size_mb, megapixels = 1 + i % 5, 2 + (i * 3) % 7
+        model.update(size_mb * MB, megapixels, 1 + 2 * size_mb + 0.5 * megapixels)
+    return model
+
+
+def test_default_latency_before_any_observation():
+    model = EtaModel()
+    assert model.predict(MB, 1.0) == EtaModel.DEFAULT_LATENCY
+    assert model.predict_total(2, 2 * MB, 2.0, unknown_count=1) == 3 * EtaModel.DEFAULT_LATENCY
+
+
+def test_fitted_model_recovers_linear_latency():
+    model = trained_model()
+    assert model.predict(3 * MB, 4.0) == pytest.approx(9.0, rel=1e-3)
+    # Linear model - the sum of the features predicts the sum of the latencies
+    assert model.predict_total(2, 4 * MB, 6.0) == pytest.approx(model.predict(MB, 2.0) + model.predict(3 * MB, 4.0), rel=1e-3)
+
+
+def test_unsized_files_use_the_mean_latency():
+    model = EtaModel()
+    model.update(None, None, 4.0)
+    model.update(None, None, 14.0)
+    assert model.count == 0
+    assert model.predict(None, None) == pytest.approx(5.0)
+
+
+def test_non_positive_latency_is_ignored():
+    model = EtaModel()
+    model.update(MB, 1.0, 0.0)
+    assert model.count == 0 and model.mean_latency is None
+
+
+def test_remaining_time_divides_work_by_concurrency():
+    model = EtaModel()
+    model.update(None, None, 10.0)
+    # Four pending files of 10 s on two slots, plus one in-flight file that is 4 s in
+    assert model.estimate_remaining((0, 0, 0.0, 4), [(None, None, 4.0)], concurrency=2) == pytest.approx(23.0)
+
+
+def test_request_interval_bounds_the_estimate():
+    model = EtaModel()
+    model.update(None, None, 1.0)
+    assert model.estimate_remaining((0, 0, 0.0, 10), [], concurrency=10, request_interval=2.0) == 20.0
+
+
+def test_from_history_prefits_and_survives_errors():
+    class History:
+        def get_latency_samples(self, action, limit):
+            return [(MB, 1.0, 3.0)] * 6
+
+    class BrokenHistory:
+        def get_latency_samples(self, action, limit):
+            raise OSError("database is locked")
+
+    assert EtaModel.from_history(History(), "Remove Bg").count == 6
+    assert EtaModel.from_history(BrokenHistory(), "Remove Bg").count == 0
+    assert EtaModel.from_history(None, "Remove Bg").count == 0
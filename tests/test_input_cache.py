@@ -0,0 +1,85 @@
+import os
+from PIL import Image
+from App.helpers.input_cache import InputCache
+
+
+def make_image(path, size=(40, 30), mode="RGB"):
+    Image.new(mode, size).save(path)
+    return str(path)
+
+
+def test_bytes_are_read_once(tmp_path):
+    cache = InputCache()
+    path = make_image(tmp_path / "a.png")
+    first = cache.get_bytes(path)
+    assert cache.get_bytes(path) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_header_reads_size_and_mode(tmp_path):
+    cache = InputCache()
+    path = make_image(tmp_path / "a.png", (40, 30), "RGBA")
+    header = cache.get_header(path)
+    assert (header["format"], header["width"], header["height"], header["mode"]) == ("PNG", 40, 30, "RGBA")
+    # Header parsing does not pull the file into the byte cache
+    assert cache.get_cached_bytes(path) is None
+
+
+def test_unreadable_header_is_none(tmp_path):
+    cache = InputCache()
+    path = tmp_path / "broken.png"
+    path.write_bytes(b"not an image")
+    assert cache.get_header(str(path)) is None
+
+
+def test_edited_file_is_not_served_stale(tmp_path):
+    cache = InputCache()
+    path = make_image(tmp_path / "a.png", (10, 10))
+    cache.get_bytes(path)
+    make_image(path, (20, 20))
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+    assert cache.get_header(path)["width"] == 20
+    assert cache.get_bytes(path) == open(path, "rb").read()
+
+
+def test_memory_budget_evicts_oldest(tmp_path):
+    cache = InputCache()
+    paths = [make_image(tmp_path / f"{i}.png") for i in range(3)]
+    size = os.path.getsize(paths[0])
+    cache.configure({"max_memory_mb": (size * 2 + 1) / (1024 * 1024)})
+    for path in paths:
+        cache.get_bytes(path)
+    assert cache.get_cached_bytes(paths[0]) is None
+    assert cache.get_cached_bytes(paths[2]) is not None
+    assert cache.get_stats()["entries"] == 2
+
+
+def test_oversized_file_is_not_cached(tmp_path):
+    cache = InputCache(max_file_mb=0)
+    path = make_image(tmp_path / "a.png")
+    assert cache.get_bytes(path)
+    assert cache.get_cached_bytes(path) is None
+
+
+def test_release_drops_bytes_but_keeps_header(tmp_path):
+    cache = InputCache()
+    path = make_image(tmp_path / "a.png")
+    cache.get_bytes(path)
+    cache.get_header(path)
+    cache.release(path)
+    stats = cache.get_stats()
+    assert (stats["entries"], stats["bytes"], stats["headers"]) == (0, 0, 1)
+
+
+def test_missing_file_is_not_a_readable_image(tmp_path):
+    cache = InputCache()
+    missing = str(tmp_path / "moved.png")
+    assert cache.get_header(missing) is None
+    assert cache.get_cached_bytes(missing) is None
+    assert cache.open_image(missing) is None
+
+
+def test_open_image_of_a_non_image_is_none(tmp_path):
+    path = tmp_path / "notes.png"
+    path.write_bytes(b"not an image")
+    assert InputCache().open_image(str(path)) is None
@@ -0,0 +1,69 @@
+from datetime import datetime
+import pytest
+
+pytest.importorskip("PySide6")
+from App.helpers import lag_monitor  # noqa: E402
+from App.helpers.lag_monitor import LagMonitor  # noqa: E402
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = Clock()
+    monkeypatch.setattr(lag_monitor.time, "perf_counter", fake)
+    return fake
+
+
+def ticking_monitor(clock, tmp_path, **kwargs):
+    monitor = LagMonitor(interval_ms=50, stall_threshold_ms=200, log_path=str(tmp_path / "lag.log"), **kwargs)
+    monitor.last_tick = clock.now  # skip the first tick, which starts the watchdog thread
+    return monitor
+
+
+def test_on_time_ticks_have_no_lag(clock, tmp_path):
+    monitor = ticking_monitor(clock, tmp_path)
+    for _ in range(3):
+        clock.now += 0.05
+        monitor.on_tick()
+    snapshot = monitor.snapshot()
+    assert snapshot["samples"] == 3 and snapshot["max"] == 0.0 and snapshot["stall_count"] == 0
+
+
+def test_late_tick_counts_as_stall_and_is_logged(clock, tmp_path):
+    monitor = ticking_monitor(clock, tmp_path)
+    clock.now += 0.05
+    monitor.on_tick()
+    clock.now += 0.35  # 300 ms late
+    monitor.on_tick()
+    snapshot = monitor.snapshot()
+    assert snapshot["stall_count"] == 1
+    assert snapshot["longest_stall"] == pytest.approx(300)
+    assert snapshot["percentiles"][99] == pytest.approx(300)
+    assert "UI thread stalled for 300 ms" in (tmp_path / "lag.log").read_text(encoding="utf-8")
+
+
+def test_format_snapshot():
+    assert LagMonitor.format_snapshot({"percentiles": {}}) == "Measuring event loop latency..."
+    text = LagMonitor.format_snapshot({"percentiles": {50: 1.0, 95: 12.0, 99: 40.0}, "max": 310.0, "stall_count": 2,
+                                       "longest_stall": 310.0, "last_stall_at": datetime(2024, 1, 1, 9, 30, 5)})
+    assert text.splitlines() == ["Event loop lag: p50 1 ms, p95 12 ms, p99 40 ms, max 310 ms",
+                                 "Stalls: 2, longest 310 ms, last at 09:30:05"]
+
+
+def test_disabled_by_default(tmp_path, monkeypatch):
+    monkeypatch.delenv(lag_monitor.LAG_MONITOR_ENV, raising=False)
+
+    class Config:
+        base_dir = tmp_path
+
+        def get(self, key, default=None):
+            return default
+
+    assert LagMonitor.from_config(Config()) is None
@@ -0,0 +1,78 @@
+import io
+import numpy as np
+import pytest
+from PIL import Image
+from App.helpers.local_matting import LocalMatting, _connected_background, matte_flat_background
+
+
+def studio_shot(path, size=(300, 200), subject=(100, 50, 200, 150), backdrop=(250, 250, 250), exif_orientation=None):
+    img = Image.new("RGB", size, backdrop)
+    img.paste((30, 80, 160), subject)
+    if exif_orientation:
+        exif = Image.Exif()
+        exif[0x0112] = exif_orientation
+        img.save(path, "JPEG", quality=95, exif=exif.tobytes())
+    else:
+        img.save(path)
+    return str(path)
+
+
+def test_flat_backdrop_is_removed(tmp_path):
+    confidence, png_bytes = matte_flat_background(studio_shot(tmp_path / "shot.png"))
+    assert confidence > 0.9
+    with Image.open(io.BytesIO(png_bytes)) as result:
+        assert result.mode == "RGBA" and result.size == (300, 200)
+        assert result.getpixel((5, 5))[3] == 0
+        assert result.getpixel((150, 100)) == (30, 80, 160, 255)
+
+
+def test_enclosed_backdrop_colour_stays_opaque(tmp_path):
+    path = str(tmp_path / "ring.png")
+    img = Image.new("RGB", (300, 200), (250, 250, 250))
+    img.paste((30, 80, 160), (80, 40, 220, 160))
+    img.paste((250, 250, 250), (120, 80, 180, 120))  # backdrop-coloured hole inside the subject
+    img.save(path)
+    _, png_bytes = matte_flat_background(path)
+    with Image.open(io.BytesIO(png_bytes)) as result:
+        assert result.getpixel((150, 100))[3] == 255
+
+
+def test_busy_border_is_declined(tmp_path):
+    path = str(tmp_path / "noise.png")
+    Image.fromarray(np.random.default_rng(0).integers(0, 255, (100, 100, 3), dtype=np.uint8)).save(path)
+    assert matte_flat_background(path) == (0.0, None)
+
+
+def test_rotated_jpeg_is_matted_upright(tmp_path):
+    path = studio_shot(tmp_path / "rotated.jpg", exif_orientation=6)
+    _, png_bytes = matte_flat_background(path)
+    with Image.open(io.BytesIO(png_bytes)) as result:
+        assert result.size == (200, 300)
+
+
+def test_connected_background_grows_from_the_border():
+    candidate = np.ones((5, 5), dtype=bool)
+    candidate[1:4, 1:4] = False
+    candidate[2, 2] = True  # enclosed candidate cell
+    region = _connected_background(candidate)
+    assert region[0].all() and not region[2, 2]
+
+
+@pytest.fixture
+def matting():
+    local = LocalMatting(workers=1)
+    yield local
+    local.shutdown()
+
+
+def test_try_file_returns_bytes_only_when_confident(tmp_path, matting):
+    assert matting.try_file(studio_shot(tmp_path / "shot.png")).startswith(b"\x89PNG")
+    busy = str(tmp_path / "busy.png")
+    Image.fromarray(np.random.default_rng(0).integers(0, 255, (64, 64, 3), dtype=np.uint8)).save(busy)
+    assert matting.try_file(busy) is None
+    assert matting.try_file(str(tmp_path / "missing.png")) is None
+
+
+def test_from_config_is_off_by_default():
+    assert LocalMatting.from_config({}, "Remove Bg") is None
+    assert LocalMatting.from_config({"enabled": True}, "Upscale") is None
@@ -0,0 +1,86 @@
+import io
+import pytest
+from PIL import Image
+from App.helpers.metadata_splice import MetadataSplicer, read_metadata, reset_orientation
+
+ICC = b"fake icc profile " * 8
+LARGE_ICC = bytes(range(256)) * 300  # spans two JPEG APP2 segments
+
+
+def make_source(path, fmt, icc=ICC, orientation=6):
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    exif[0x010F] = "Camera maker"
+    Image.new("RGB", (40, 30), "red").save(path, fmt, icc_profile=icc, exif=exif.tobytes())
+    return str(path)
+
+
+def encode_result(fmt, mode="RGBA"):
+    data = io.BytesIO()
+    Image.new(mode, (40, 30), (0, 255, 0, 128) if mode == "RGBA" else (0, 255, 0)).save(data, fmt)
+    return data.getvalue()
+
+
+@pytest.mark.parametrize("fmt", ["JPEG", "PNG", "WEBP"])
+def test_read_metadata(tmp_path, fmt):
+    icc, exif = read_metadata(make_source(tmp_path / f"source.{fmt.lower()}", fmt))
+    assert icc == ICC
+    assert exif[:2] in (b"II", b"MM")
+    parsed = Image.Exif()
+    parsed.load(exif)
+    assert parsed[0x0112] == 6
+
+
+@pytest.mark.parametrize("result_format,mode", [("PNG", "RGBA"), ("JPEG", "RGB"), ("WEBP", "RGBA"), ("WEBP", "RGB")])
+def test_splice_round_trip(tmp_path, result_format, mode):
+    source = make_source(tmp_path / "source.jpg", "JPEG")
+    spliced = MetadataSplicer().splice(source, encode_result(result_format, mode))
+    with Image.open(io.BytesIO(spliced)) as img:
+        img.load()
+        assert img.format == result_format and img.size == (40, 30)
+        assert img.info.get("icc_profile") == ICC
+        exif = img.getexif()
+        assert exif[0x010F] == "Camera maker"
+        # The result pixels are already upright
+        assert exif[0x0112] == 1
+
+
+def test_large_icc_profile_is_split_over_jpeg_segments(tmp_path):
+    source = make_source(tmp_path / "source.png", "PNG", icc=LARGE_ICC)
+    spliced = MetadataSplicer().splice(source, encode_result("JPEG", "RGB"))
+    assert spliced.count(b"ICC_PROFILE\x00") == 2
+    with Image.open(io.BytesIO(spliced)) as img:
+        assert img.info["icc_profile"] == LARGE_ICC
+
+
+def test_disabled_parts_and_sources_without_metadata(tmp_path):
+    source = make_source(tmp_path / "source.jpg", "JPEG")
+    result = encode_result("PNG")
+    spliced = MetadataSplicer(copy_icc=False, normalize_orientation=False).splice(source, result)
+    with Image.open(io.BytesIO(spliced)) as img:
+        assert "icc_profile" not in img.info
+        assert img.getexif()[0x0112] == 6
+
+    plain = str(tmp_path / "plain.png")
+    Image.new("RGB", (4, 4)).save(plain)
+    assert MetadataSplicer().splice(plain, result) is result
+    assert MetadataSplicer().splice(source, b"unknown format") == b"unknown format"
+
+
+def test_splice_file_rewrites_output(tmp_path):
+    source = make_source(tmp_path / "source.jpg", "JPEG")
+    output = tmp_path / "result.png"
+    output.write_bytes(encode_result("PNG"))
+    MetadataSplicer().splice_file(source, str(output))
+    with Image.open(output) as img:
+        assert img.info["icc_profile"] == ICC
+
+
+def test_reset_orientation_ignores_invalid_exif():
+    assert reset_orientation(b"junk") == b"junk"
+    assert reset_orientation(b"II*\x00\xff\xff\xff\xff") == b"II*\x00\xff\xff\xff\xff"
+
+
+def test_from_config_is_off_by_default():
+    assert MetadataSplicer.from_config({}) is None
+    assert MetadataSplicer.from_config({"enabled": True, "exif": False}).copy_exif is False
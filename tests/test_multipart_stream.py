@@ -0,0 +1,53 @@
+from email.parser import BytesParser
+from email.policy import HTTP
+from App.helpers.multipart_stream import MultipartStream
+
+
+def parse(stream):
+    body = b"".join(stream)
+    message = BytesParser(policy=HTTP).parsebytes(f"Content-Type: {stream.content_type}\r\n\r\n".encode() + body)
+    return {part.get_param("name", header="content-disposition"): part.get_payload(decode=True) for part in message.iter_parts()}
+
+
+def test_body_from_bytes_parses_as_multipart():
+    payload = bytes(range(256)) * 1000
+    with MultipartStream([("format", "png"), ("scale", "2")], "image", payload, chunk_size=4096) as stream:
+        parts = parse(stream)
+        assert len(stream) == stream.sent
+    assert parts == {"format": b"png", "scale": b"2", "image": payload}
+
+
+def test_body_from_file_is_memory_mapped(tmp_path):
+    path = tmp_path / "input.jpg"
+    path.write_bytes(b"\xff\xd8" + b"x" * 200_000)
+    stream = MultipartStream([], "image", str(path))
+    try:
+        assert stream._mmap is not None
+        assert parse(stream)["image"] == path.read_bytes()
+    finally:
+        stream.close()
+    assert stream._file is None
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.jpg"
+    path.write_bytes(b"")
+    with MultipartStream([], "image", str(path)) as stream:
+        assert parse(stream)["image"] == b""
+
+
+def test_progress_and_limiter_see_every_byte():
+    class Limiter:
+        uploaded = 0
+
+        def throttle_upload(self, amount):
+            self.uploaded += amount
+
+    limiter, progress = Limiter(), []
+    stream = MultipartStream([("a", "b")], "image", b"z" * 10_000, limiter=limiter,
+                             progress_callback=lambda sent, total: progress.append((sent, total)), chunk_size=1000)
+    body = b"".join(stream)
+    assert len(body) == len(stream) == limiter.uploaded
+    assert progress[-1] == (len(stream), len(stream))
+    assert all(a[0] < b[0] for a, b in zip(progress, progress[1:]))
+    assert stream.read() == b""
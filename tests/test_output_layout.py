@@ -0,0 +1,67 @@
+import os
+from App.helpers.output_layout import OutputLayoutPlanner
+
+
+def name(file_path):
+    return os.path.splitext(os.path.basename(file_path))[0] + "_out.png"
+
+
+def test_flat_layout_resolves_name_collisions(tmp_path):
+    planner = OutputLayoutPlanner(str(tmp_path), "flat")
+    files = [os.path.join("a", "img.jpg"), os.path.join("b", "img.jpg"), os.path.join("c", "img.jpg")]
+    paths = planner.plan(files, name)
+    assert [os.path.basename(paths[f]) for f in files] == ["img_out.png", "img_out_1.png", "img_out_2.png"]
+
+
+def test_reruns_replace_earlier_outputs_by_default(tmp_path):
+    (tmp_path / "img_out.png").write_bytes(b"earlier run")
+    paths = OutputLayoutPlanner(str(tmp_path), "flat").plan(["img.jpg"], name)
+    assert paths["img.jpg"] == os.path.join(str(tmp_path), "img_out.png")
+
+
+def test_keep_existing_suffixes_around_earlier_outputs(tmp_path):
+    (tmp_path / "img_out.png").write_bytes(b"earlier run")
+    (tmp_path / "img_out_1.png").write_bytes(b"earlier run")
+    planner = OutputLayoutPlanner.from_config(str(tmp_path), {"keep_existing": True})
+    assert planner.plan(["img.jpg"], name)["img.jpg"] == os.path.join(str(tmp_path), "img_out_2.png")
+
+
+def test_mirror_layout_keeps_the_input_tree(tmp_path):
+    root = tmp_path / "in"
+    files = [str(root / "x" / "one.jpg"), str(root / "y" / "z" / "two.jpg")]
+    paths = OutputLayoutPlanner(str(tmp_path / "out"), "mirror").plan(files, name)
+    assert paths[files[0]] == os.path.join(str(tmp_path / "out"), "x", "one_out.png")
+    assert paths[files[1]] == os.path.join(str(tmp_path / "out"), "y", "z", "two_out.png")
+
+
+def test_mirror_layout_maps_urls_to_host_folders(tmp_path):
+    url = "https://cdn.example.com:8080/shop/items/shoe.jpg"
+    paths = OutputLayoutPlanner(str(tmp_path), "mirror").plan([url], lambda f: "shoe_out.png")
+    assert paths[url] == os.path.join(str(tmp_path), "cdn.example.com_8080", "shop", "items", "shoe_out.png")
+
+
+def test_hash_layout_is_stable_and_sharded(tmp_path):
+    planner = OutputLayoutPlanner(str(tmp_path), "hash", hash_levels=2)
+    first = planner.plan(["photo.jpg"], name)["photo.jpg"]
+    second = planner.plan(["photo.jpg"], name)["photo.jpg"]
+    assert first == second
+    shards = os.path.relpath(os.path.dirname(first), str(tmp_path)).split(os.sep)
+    assert len(shards) == 2 and all(len(part) == 2 for part in shards)
+
+
+def test_bucket_layout_fills_numbered_folders(tmp_path):
+    files = [f"{i}.jpg" for i in range(5)]
+    paths = OutputLayoutPlanner(str(tmp_path), "bucket", bucket_size=2).plan(files, name)
+    assert [os.path.basename(os.path.dirname(paths[f])) for f in files] == ["0000", "0000", "0001", "0001", "0002"]
+
+
+def test_unknown_layout_falls_back_to_flat(tmp_path):
+    planner = OutputLayoutPlanner.from_config(str(tmp_path), {"mode": "spiral"})
+    assert planner.layout == "flat"
+
+
+def test_create_directories(tmp_path):
+    planner = OutputLayoutPlanner(str(tmp_path), "bucket", bucket_size=1)
+    paths = planner.plan(["a.jpg", "b.jpg"], name)
+    planner.create_directories(paths)
+    assert all(os.path.isdir(os.path.dirname(path)) for path in paths.values())
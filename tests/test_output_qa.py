@@ -0,0 +1,58 @@
+import io
+from PIL import Image
+from App.helpers.output_qa import OutputQA
+
+
+def encode(img, fmt="PNG"):
+    data = io.BytesIO()
+    img.save(data, fmt)
+    return data.getvalue()
+
+
+def cutout(size=(100, 100)):
+    img = Image.new("RGBA", size, (0, 0, 0, 0))
+    img.paste((200, 10, 10, 255), (30, 30, 70, 70))
+    return img
+
+
+def test_good_cutout_passes():
+    assert OutputQA(check_alpha=True).check(encode(cutout()), expected_size=(100, 100)) is None
+
+
+def test_truncated_result_is_retryable():
+    qa = OutputQA()
+    data = encode(cutout())
+    reason = qa.check(data[:len(data) // 2])
+    assert reason.startswith(OutputQA.DECODE_FAILED)
+    assert qa.is_retryable(reason)
+
+
+def test_alpha_coverage_checks():
+    qa = OutputQA(check_alpha=True)
+    assert qa.check(encode(Image.new("RGB", (50, 50)))) == "result has no transparency"
+    assert qa.check(encode(Image.new("RGBA", (50, 50), (0, 0, 0, 0)))) == "result is fully transparent"
+    reason = qa.check(encode(Image.new("RGBA", (50, 50), (9, 9, 9, 255))))
+    assert reason == "no background was removed" and not qa.is_retryable(reason)
+
+
+def test_size_check_allows_rotation_and_tolerance():
+    qa = OutputQA()
+    data = encode(cutout((200, 100)))
+    assert qa.check(data, expected_size=(100, 200)) is None
+    assert qa.check(data, expected_size=(202, 101)) is None
+    assert qa.check(data, expected_size=(400, 200)) == "result is 200x100, expected 400x200"
+
+
+def test_unchanged_result_is_rejected(tmp_path):
+    source = str(tmp_path / "input.png")
+    img = Image.linear_gradient("L").convert("RGB").resize((64, 64))
+    img.save(source)
+    qa = OutputQA()
+    assert qa.check(encode(img), source) == "result is identical to the input"
+    assert qa.check(encode(img.transpose(Image.Transpose.FLIP_TOP_BOTTOM)), source) is None
+
+
+def test_from_config():
+    assert OutputQA.from_config({"enabled": False}, "Remove Bg") is None
+    assert OutputQA.from_config({}, "Remove Bg").check_alpha
+    assert not OutputQA.from_config({}, "Upscale").check_alpha
@@ -0,0 +1,57 @@
+import numpy as np
+from PIL import Image
+from App.helpers.perceptual_hash import (cluster_hashes, dhash_batch, find_near_duplicates, popcount,
+                                         split_by_representative)
+
+
+def brute_force_pairs(hashes, max_distance):
+    return {(a, b) for a in range(len(hashes)) for b in range(a + 1, len(hashes))
+            if bin(int(hashes[a]) ^ int(hashes[b])).count("1") <= max_distance}
+
+
+def test_popcount():
+    values = np.array([0, 1, 0xFF, 2 ** 64 - 1], dtype=np.uint64)
+    assert popcount(values).tolist() == [0, 1, 8, 64]
+
+
+def test_dhash_of_gradients():
+    rising = np.tile(np.arange(9, dtype=np.int16), (8, 1))
+    hashes = dhash_batch(np.stack([rising, rising[:, ::-1]]))
+    assert hashes.tolist() == [2 ** 64 - 1, 0]
+
+
+def test_clusters_match_brute_force():
+    rng = np.random.default_rng(1)
+    base = rng.integers(0, 2 ** 63, size=20, dtype=np.uint64)
+    # Near copies of the base hashes with one to three flipped bits
+    flips = [np.uint64(sum(1 << int(bit) for bit in rng.choice(64, size=rng.integers(1, 4), replace=False)))
+             for _ in base]
+    hashes = np.concatenate([base, base ^ np.array(flips, dtype=np.uint64)])
+    clusters = cluster_hashes(hashes, 3)
+    for a, b in brute_force_pairs(hashes, 3):
+        assert clusters[a] == clusters[b]
+    assert len(set(clusters)) <= len(base)
+
+
+def test_identical_hashes_share_a_cluster():
+    clusters = cluster_hashes(np.array([5, 5, 2 ** 40], dtype=np.uint64), 0)
+    assert clusters[0] == clusters[1] != clusters[2]
+
+
+def test_chained_cluster_is_split_by_representative():
+    # 0 -> 1 and 1 -> 2 differ by 4 bits each, but 0 and 2 are 8 bits apart
+    hashes = np.array([0x00, 0x0F, 0xFF], dtype=np.uint64)
+    assert len(set(cluster_hashes(hashes, 4))) == 1
+    assert split_by_representative([0, 1, 2], hashes, 4) == [[0, 1]]
+
+
+def test_find_near_duplicates_on_images(tmp_path):
+    gradient = np.tile(np.linspace(0, 255, 64, dtype=np.uint8), (48, 1))
+    paths = []
+    for name, pixels in (("a.png", gradient), ("b.png", gradient[:, ::-1]), ("a_copy.png", np.clip(gradient.astype(int) + 3, 0, 255))):
+        path = str(tmp_path / name)
+        Image.fromarray(pixels.astype(np.uint8), "L").save(path)
+        paths.append(path)
+    paths.append(str(tmp_path / "broken.png"))
+    (tmp_path / "broken.png").write_bytes(b"not an image")
+    assert find_near_duplicates(paths) == [[paths[0], paths[2]]]
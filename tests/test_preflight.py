@@ -0,0 +1,85 @@
+import os
+from PIL import Image
+from App.helpers.preflight import PreflightValidator
+
+
+def make_image(path, size=(100, 80), mode="RGB"):
+    Image.new(mode, size).save(path)
+    return str(path)
+
+
+def test_file_within_constraints_is_ok(tmp_path):
+    validator = PreflightValidator({"max_dimension": 200, "supported_modes": ["RGB"]})
+    assert validator.check_file(make_image(tmp_path / "a.png")) == ("ok", None)
+
+
+def test_oversized_image_is_downscaled(tmp_path):
+    validator = PreflightValidator({"max_dimension": 50})
+    status, fixed_path = validator.check_file(make_image(tmp_path / "a.png", (100, 80)))
+    try:
+        assert status == "fixed"
+        with Image.open(fixed_path) as img:
+            assert img.size == (50, 40)
+    finally:
+        validator.cleanup()
+    assert not os.path.exists(fixed_path)
+
+
+def test_convertible_mode_is_converted(tmp_path):
+    validator = PreflightValidator({"supported_modes": ["RGB", "RGBA"]})
+    path = str(tmp_path / "a.jpg")
+    Image.new("CMYK", (20, 20)).save(path)
+    status, fixed_path = validator.check_file(path)
+    try:
+        assert status == "fixed"
+        with Image.open(fixed_path) as img:
+            assert img.mode == "RGB"
+    finally:
+        validator.cleanup()
+
+
+def test_problems_are_rejected_without_auto_fix(tmp_path):
+    validator = PreflightValidator({"max_megapixels": 0.001}, auto_fix=False)
+    status, reason = validator.check_file(make_image(tmp_path / "a.png"))
+    assert status == "rejected" and "megapixels" in reason
+
+
+def test_fix_can_be_deferred(tmp_path):
+    validator = PreflightValidator({"max_dimension": 50})
+    status, _ = validator.check_file(make_image(tmp_path / "a.png"), allow_fix=False)
+    assert status == "deferred"
+
+
+def test_unreadable_file_is_rejected(tmp_path):
+    path = tmp_path / "broken.png"
+    path.write_bytes(b"not an image")
+    validator = PreflightValidator({"max_dimension": 50})
+    assert validator.check_file(str(path))[0] == "rejected"
+    assert validator.check_file(str(tmp_path / "missing.png"))[0] == "rejected"
+
+
+def test_run_sorts_files_and_uses_lookup(tmp_path):
+    validator = PreflightValidator({"max_dimension": 200}, auto_fix=False)
+    ok = make_image(tmp_path / "ok.png")
+    large = make_image(tmp_path / "large.png", (300, 10))
+    known = str(tmp_path / "known.png")
+    progress = []
+    results = validator.run([ok, large, known], lambda done, total: progress.append((done, total)),
+                            lookup=lambda f: ("fixed", "prepared.jpg") if f == known else None)
+    assert results["ok"] == [ok]
+    assert results["fixed"] == {known: "prepared.jpg"}
+    assert list(results["rejected"]) == [large]
+    assert progress[-1] == (3, 3)
+    assert PreflightValidator.get_summary_text(results) == "Preflight: 1 ok, 1 auto-fixed, 1 rejected"
+
+
+def test_run_stops_when_cancelled(tmp_path):
+    validator = PreflightValidator({"max_dimension": 200})
+    files = [make_image(tmp_path / f"{i}.png") for i in range(3)]
+    results = validator.run(files, is_cancelled=lambda: True)
+    assert results == {"ok": [], "fixed": {}, "rejected": {}}
+
+
+def test_file_removed_before_fixing_is_rejected(tmp_path):
+    validator = PreflightValidator({"max_dimension": 50})
+    assert validator.fix_file(str(tmp_path / "gone.png"), {"mode": "RGB"}) == ("rejected", "Unreadable image")
@@ -0,0 +1,97 @@
+import os
+import time
+from collections import Counter
+from pathlib import Path
+import pytest
+from App.helpers import profiling
+
+
+class Config:
+    def __init__(self, base_dir, settings):
+        self.base_dir = Path(base_dir)
+        self.settings = settings
+
+    def get(self, key, default=None):
+        return self.settings if key == "profiling" else default
+
+
+@pytest.fixture(autouse=True)
+def fresh_profiler(monkeypatch):
+    monkeypatch.setattr(profiling, "_subsystems", set())
+    monkeypatch.setattr(profiling, "_mode", "deterministic")
+    monkeypatch.setattr(profiling, "_profiles", {})
+    monkeypatch.setattr(profiling, "_sampled_threads", {})
+    monkeypatch.setattr(profiling, "_active_keys", set())
+    monkeypatch.setattr(profiling, "_sample_interval", 0.001)
+    monkeypatch.setattr(profiling.atexit, "register", lambda func: None)
+    monkeypatch.delenv(profiling.PROFILE_ENV, raising=False)
+    monkeypatch.delenv(profiling.PROFILE_MODE_ENV, raising=False)
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(100))
+
+
+def test_unselected_subsystem_is_not_profiled():
+    with profiling.profiled("processor"):
+        pass
+    assert profiling._profiles == {}
+
+
+def test_configure_selects_subsystems_and_output_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling.sys, "version_info", (3, 11, 0))
+    profiling.configure(Config(tmp_path, {"subsystems": ["loader"], "output_dir": "profiles"}))
+    assert profiling.is_enabled("loader") and not profiling.is_enabled("processor")
+    assert profiling._mode == "deterministic"
+    assert profiling._output_dir == os.path.join(str(tmp_path), "profiles")
+
+
+def test_python_312_switches_to_sampling(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling.sys, "version_info", (3, 12, 0))
+    monkeypatch.setenv(profiling.PROFILE_ENV, "processor")
+    profiling.configure(Config(tmp_path, {}))
+    assert profiling._mode == "sampling"
+
+
+def test_already_active_cprofile_skips_the_thread(monkeypatch):
+    class BusyProfile:
+        def enable(self):
+            raise ValueError("Another profiling tool is already active")
+
+        def disable(self):
+            pass
+
+    monkeypatch.setattr(profiling.cProfile, "Profile", BusyProfile)
+    profiling._subsystems.add("processor")
+    with profiling.profiled("processor"):
+        pass
+    assert profiling._profiles == {} and profiling._active_keys == set()
+
+
+def test_sampled_profile_is_written_on_exit(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "_mode", "sampling")
+    monkeypatch.setattr(profiling, "_output_dir", str(tmp_path))
+    profiling._subsystems.add("loader")
+
+    @profiling.profiled_thread("loader")
+    def run():
+        busy(0.1)
+
+    run()
+    assert profiling._profiles == {}
+    written = sorted(os.listdir(tmp_path))
+    assert [os.path.splitext(name)[1] for name in written] == [".folded", ".txt"]
+    summary = (tmp_path / written[1]).read_text(encoding="utf-8")
+    assert "samples every" in summary and "busy (test_profiling.py" in summary
+
+
+def test_save_finished_only_keeps_active_threads(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "_output_dir", str(tmp_path))
+    profiling._profiles[("processor", "Pool-1")] = Counter({("work (x.py:1)",): 3})
+    profiling._profiles[("processor", "Pool-2")] = Counter({("work (x.py:1)",): 2})
+    profiling._active_keys.add(("processor", "Pool-2"))
+    profiling.save("processor", finished_only=True)
+    assert list(profiling._profiles) == [("processor", "Pool-2")]
+    assert any(name.startswith("processor-Pool-1") for name in os.listdir(tmp_path))
@@ -0,0 +1,124 @@
+import re
+import threading
+import pytest
+from App.helpers import ranged_downloader
+from App.helpers.ranged_downloader import RangedDownloader
+
+DATA = bytes(i % 251 for i in range(700 * 1024))
+SEGMENT_MB = 0.25  # the smallest segment size - DATA spans three segments
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=b"", headers=None, fail_after=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+        self.fail_after = fail_after
+
+    def iter_content(self, chunk_size):
+        for offset in range(0, len(self.body), chunk_size):
+            if self.fail_after is not None and offset >= self.fail_after:
+                raise IOError("connection reset")
+            yield self.body[offset:offset + chunk_size]
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class FakeSession:
+    """Serves DATA, optionally ignoring Range headers or dropping the first connection of a range"""
+
+    def __init__(self, ranges=True, drop_once_at=None):
+        self.ranges = ranges
+        self.drop_once_at = drop_once_at
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def get(self, url, timeout=None, stream=False, headers=None):
+        range_header = (headers or {}).get("Range")
+        with self.lock:
+            self.requests.append(range_header)
+        if not self.ranges or not range_header:
+            return FakeResponse(200, DATA, {"Content-Length": str(len(DATA))})
+        start, end = map(int, re.match(r"bytes=(\d+)-(\d+)", range_header).groups())
+        body = DATA[start:end + 1]
+        fail_after = None
+        with self.lock:
+            if self.drop_once_at is not None and start == 0:
+                fail_after, self.drop_once_at = self.drop_once_at, None
+        return FakeResponse(206, body, {"Content-Range": f"bytes {start}-{end}/{len(DATA)}"}, fail_after)
+
+
+@pytest.fixture
+def session(monkeypatch):
+    def install(**kwargs):
+        fake = FakeSession(**kwargs)
+        monkeypatch.setattr(ranged_downloader, "get_http_session", lambda: fake)
+        monkeypatch.setattr(ranged_downloader.time, "sleep", lambda seconds: None)
+        return fake
+    return install
+
+
+def test_ranged_download_reassembles_segments(session):
+    fake = session()
+    progress = []
+    data = RangedDownloader(segment_size_mb=SEGMENT_MB).download("https://x/result.png", 5,
+                                                                 lambda received, total: progress.append((received, total)))
+    assert data == DATA
+    assert len(fake.requests) == 3
+    assert progress[-1] == (len(DATA), len(DATA))
+
+
+def test_server_without_range_support(session):
+    fake = session(ranges=False)
+    assert RangedDownloader(segment_size_mb=SEGMENT_MB).download("https://x/result.png", 5) == DATA
+    assert len(fake.requests) == 1
+
+
+def test_dropped_connection_resumes_from_last_byte(session):
+    fake = session(drop_once_at=128 * 1024)
+    assert RangedDownloader(segment_size_mb=SEGMENT_MB).download("https://x/result.png", 5) == DATA
+    assert f"bytes={128 * 1024}-{256 * 1024 - 1}" in fake.requests
+
+
+def test_disabled_downloader_uses_one_request(session):
+    fake = session()
+    assert RangedDownloader(enabled=False).download("https://x/result.png", 5) == DATA
+    assert fake.requests == [None]
+
+
+def test_http_error_returns_none(monkeypatch):
+    monkeypatch.setattr(ranged_downloader, "get_http_session",
+                        lambda: type("Session", (), {"get": lambda self, *a, **k: FakeResponse(404)})())
+    assert RangedDownloader().download("https://x/missing.png", 5) is None
+
+
+def test_pool_size_covers_segments_and_hedges():
+    assert RangedDownloader(max_connections=4, max_hedges=2).get_pool_size(3) == 21
+    assert RangedDownloader(enabled=False).get_pool_size(3) == 3
+
+
+def running_segment(started_at, progress_at, received):
+    segment = ranged_downloader._Segment(0, 1024 * 1024 - 1)
+    segment.started_at, segment.progress_at, segment.received = started_at, progress_at, received
+    return segment
+
+
+def test_hedge_only_stalled_or_slow_segments():
+    downloader = RangedDownloader(hedge_after=5.0, slow_fraction=0.25)
+    steady = running_segment(0.0, 19.5, 400_000)  # slow but still receiving after 20 s
+    stalled = running_segment(0.0, 10.0, 300_000)
+    assert not downloader._needs_hedge(steady, [steady], 20.0)
+    assert downloader._needs_hedge(stalled, [stalled], 20.0)
+
+    crawling = running_segment(0.0, 19.9, 20_000)
+    fast = [running_segment(0.0, 19.9, 400_000) for _ in range(2)]
+    assert downloader._needs_hedge(crawling, fast + [crawling], 20.0)
+    assert not downloader._needs_hedge(crawling, fast + [crawling], 4.0)  # too early to judge throughput
+    assert not RangedDownloader(slow_fraction=0)._needs_hedge(crawling, fast + [crawling], 20.0)
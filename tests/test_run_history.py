@@ -0,0 +1,71 @@
+import csv
+import json
+from datetime import datetime, timedelta
+import pytest
+from App.helpers.run_history import RunHistory
+
+START = datetime(2024, 5, 1, 10, 0, 0)
+
+
+def file_detail(success=True, method="api", credits=1, upload=1.0, server=2.0, input_bytes=1000, megapixels=2.0):
+    return {"output": "out.png" if success else "", "success": success, "method": method, "attempts": 1,
+            "bytes_up": input_bytes, "bytes_down": 500, "credits": credits, "input_bytes": input_bytes,
+            "megapixels": megapixels, "timings": {"upload": upload, "server": server}}
+
+
+def run(action="Remove Bg", minutes=0, **overrides):
+    started = START + timedelta(minutes=minutes)
+    return dict({"started_at": started, "finished_at": started + timedelta(seconds=30), "action": action,
+                 "output_folder": "out", "status": "completed", "total": 2, "processed": 1, "failed": 1,
+                 "duration_seconds": 30.0, "parameters": {"format": "png"}}, **overrides)
+
+
+@pytest.fixture
+def history(tmp_path):
+    return RunHistory(tmp_path / "history.db")
+
+
+def test_record_and_read_runs(history):
+    run_id = history.record_run(run(), {"a.jpg": file_detail(), "b.jpg": file_detail(success=False, credits=0)})
+    runs = history.get_runs()
+    assert [r["id"] for r in runs] == [run_id]
+    assert (runs[0]["credits"], runs[0]["bytes_up"], runs[0]["status"]) == (1, 2000, "completed")
+    files = history.get_run_files(run_id)
+    assert [(f["input"], f["success"], f["upload_seconds"]) for f in files] == [("a.jpg", 1, 1.0), ("b.jpg", 0, 1.0)]
+
+
+def test_latency_samples_only_successful_api_files_of_the_action(history):
+    history.record_run(run(), {"a.jpg": file_detail(upload=1.0, server=2.0),
+                               "b.jpg": file_detail(method="local"),
+                               "c.jpg": file_detail(success=False)})
+    history.record_run(run(action="Upscale", minutes=1), {"d.jpg": file_detail()})
+    history.record_run(run(minutes=2), {"e.jpg": file_detail(upload=0.5, server=0.5, input_bytes=2000)})
+    assert history.get_latency_samples("Remove Bg") == [(1000, 2.0, 3.0), (2000, 2.0, 1.0)]
+    assert history.get_latency_samples("Remove Bg", limit=1) == [(2000, 2.0, 1.0)]
+
+
+def test_balances_skip_unchanged_samples(history):
+    assert history.record_balance(START, 100, 500)
+    assert not history.record_balance(START + timedelta(hours=1), 100, 500)
+    assert history.record_balance(START + timedelta(hours=2), 90, 500)
+    assert history.get_balances(START + timedelta(minutes=1)) == [((START + timedelta(hours=2)).isoformat(), 90)]
+
+
+def test_run_credits_since(history):
+    history.record_run(run(), {"a.jpg": file_detail(credits=2)})
+    history.record_run(run(minutes=60), {"b.jpg": file_detail(credits=3)})
+    assert [credits for _, credits in history.get_run_credits(START + timedelta(minutes=30))] == [3]
+
+
+def test_export_json_and_csv(history, tmp_path):
+    run_id = history.record_run(run(), {"a.jpg": file_detail()})
+    json_path = str(tmp_path / "runs.json")
+    history.export(json_path, [run_id])
+    exported = json.load(open(json_path, encoding="utf-8"))
+    assert exported[0]["parameters"] == {"format": "png"} and exported[0]["files"][0]["input"] == "a.jpg"
+
+    csv_path = str(tmp_path / "runs.csv")
+    history.export(csv_path, [run_id, 999])
+    rows = list(csv.reader(open(csv_path, newline="", encoding="utf-8")))
+    assert rows[0][:5] == ["run_id", "started_at", "action", "status", "input"]
+    assert len(rows) == 2 and rows[1][4] == "a.jpg"
@@ -0,0 +1,47 @@
+from App.helpers.run_metrics import RunMetrics
+
+
+def test_counters_and_file_details():
+    metrics = RunMetrics()
+    metrics.set_total(3)
+    metrics.file_started()
+    metrics.record("upload", 1.5, "a.jpg")
+    metrics.record("server", 0.5, "a.jpg")
+    metrics.add_file_detail("a.jpg", "bytes_up", 100)
+    metrics.file_finished(True, "a.jpg", "out/a.png")
+    metrics.file_ended()
+    metrics.file_finished(False, "b.jpg")
+
+    snapshot = metrics.snapshot()
+    assert (snapshot["completed"], snapshot["failed"], snapshot["total"], snapshot["in_flight"]) == (2, 1, 3, 0)
+    assert snapshot["error_rate"] == 0.5
+    assert metrics.get_file_latency("a.jpg") == 2.0
+    details = metrics.get_file_details()
+    assert details["a.jpg"]["output"] == "out/a.png" and details["a.jpg"]["bytes_up"] == 100
+    assert details["b.jpg"]["success"] is False
+
+
+def test_percentiles_use_nearest_rank():
+    metrics = RunMetrics()
+    for seconds in range(1, 101):
+        metrics.record("download", float(seconds))
+    latency = metrics.snapshot()["latency"]["download"]
+    assert (latency[50], latency[95], latency[99]) == (51.0, 95.0, 99.0)
+
+
+def test_eta_provider_replaces_rate_estimate_until_finished():
+    metrics = RunMetrics()
+    metrics.set_total(10)
+    metrics.eta_provider = lambda: 42.0
+    assert metrics.snapshot()["eta"] == 42.0
+    metrics.finish()
+    assert metrics.snapshot()["eta"] is None
+
+
+def test_format_duration_and_snapshot():
+    assert RunMetrics.format_duration(75) == "1:15"
+    assert RunMetrics.format_duration(3725) == "1:02:05"
+    metrics = RunMetrics()
+    metrics.record("write", 0.1)
+    text = RunMetrics.format_snapshot(metrics.snapshot())
+    assert "0/0 files" in text and text.splitlines()[-1].startswith("Write: p50 0.10s")
@@ -0,0 +1,73 @@
+import os
+from PIL import Image
+from App.helpers.subject_crop import SubjectCropper
+
+
+def studio_shot(path, size=(400, 300), subject=(150, 100, 250, 200), exif_orientation=None):
+    img = Image.new("RGB", size, "white")
+    img.paste((20, 60, 120), subject)
+    if exif_orientation:
+        exif = Image.Exif()
+        exif[0x0112] = exif_orientation
+        img.save(path, "JPEG", quality=95, exif=exif.tobytes())
+    else:
+        img.save(path)
+    return str(path)
+
+
+def test_box_covers_subject_plus_margin(tmp_path):
+    path = studio_shot(tmp_path / "shot.png")
+    with Image.open(path) as img:
+        box = SubjectCropper(margin=0.05).find_box(img)
+    left, top, right, bottom = box
+    assert left <= 150 and top <= 100 and right >= 250 and bottom >= 200
+    assert left >= 150 - 20 - 2 and right <= 250 + 20 + 2
+
+
+def test_large_subject_is_not_cropped(tmp_path):
+    path = studio_shot(tmp_path / "shot.png", subject=(10, 10, 390, 290))
+    with Image.open(path) as img:
+        assert SubjectCropper().find_box(img) is None
+
+
+def test_plain_backdrop_has_no_box(tmp_path):
+    path = tmp_path / "blank.png"
+    Image.new("RGB", (100, 100), "white").save(path)
+    with Image.open(path) as img:
+        assert SubjectCropper().find_box(img) is None
+
+
+def test_prepare_and_repad_round_trip(tmp_path):
+    cropper = SubjectCropper()
+    crop_path, box, original_size = cropper.prepare(studio_shot(tmp_path / "shot.png"))
+    try:
+        assert original_size == (400, 300)
+        assert Image.open(crop_path).size == (box[2] - box[0], box[3] - box[1])
+
+        # Simulate an API cut-out of the crop and put it back on the full canvas
+        result_path = str(tmp_path / "result.png")
+        Image.open(crop_path).convert("RGBA").save(result_path)
+        cropper.repad(result_path, box, original_size)
+        with Image.open(result_path) as result:
+            assert result.size == original_size and result.mode == "RGBA"
+            assert result.getpixel((0, 0))[3] == 0
+            assert result.getpixel((200, 150)) == (20, 60, 120, 255)
+        cropper.release(crop_path)
+        assert not os.path.exists(crop_path)
+    finally:
+        cropper.cleanup()
+    assert cropper.temp_dir is None
+
+
+def test_rotated_jpeg_is_cropped_upright(tmp_path):
+    # Orientation 6 displays the stored 400x300 image rotated to 300x400
+    path = studio_shot(tmp_path / "rotated.jpg", subject=(20, 20, 120, 120), exif_orientation=6)
+    cropper = SubjectCropper()
+    try:
+        crop_path, box, original_size = cropper.prepare(path)
+        assert original_size == (300, 400)
+        assert box[2] <= 300 and box[3] <= 400
+        # Stored top-left corner ends up at the upright top-right
+        assert box[0] > 150 and box[1] < 150
+    finally:
+        cropper.cleanup()
@@ -0,0 +1,53 @@
+import json
+from pathlib import Path
+import pytest
+from App.helpers import tracing
+
+
+class Config:
+    def __init__(self, base_dir, settings):
+        self.base_dir = Path(base_dir)
+        self.settings = settings
+
+    def get(self, key, default=None):
+        return self.settings.get(key, default)
+
+
+@pytest.fixture(autouse=True)
+def fresh_tracer(monkeypatch):
+    monkeypatch.setattr(tracing, "_output_path", None)
+    monkeypatch.setattr(tracing, "_events", [])
+    monkeypatch.setattr(tracing, "_thread_names", {})
+    monkeypatch.setattr(tracing.atexit, "register", lambda func: None)
+    monkeypatch.delenv(tracing.TRACE_ENV, raising=False)
+
+
+def test_spans_are_no_ops_while_disabled():
+    with tracing.span("upload"):
+        pass
+    tracing.record("server", 1.0)
+    assert not tracing.is_enabled() and tracing._events == []
+
+
+def test_configured_path_is_relative_to_the_base_dir(tmp_path):
+    tracing.configure(Config(tmp_path, {"tracing": {"enabled": True}}))
+    assert tracing._output_path == str(tmp_path / "pikselcat_trace.json")
+
+
+def test_environment_path_is_used_as_given(tmp_path, monkeypatch):
+    monkeypatch.setenv(tracing.TRACE_ENV, "custom.json")
+    tracing.configure(Config(tmp_path, {}))
+    assert tracing._output_path == "custom.json"
+
+
+def test_saved_trace_is_chrome_trace_json(tmp_path):
+    output = tmp_path / "trace.json"
+    tracing.enable(str(output))
+    with tracing.span("file", file="a.jpg"):
+        tracing.record("upload", 0.25, file="a.jpg")
+    tracing.save()
+    events = json.loads(output.read_text())["traceEvents"]
+    spans = {event["name"]: event for event in events if event["ph"] == "X"}
+    assert spans["file"]["args"] == {"file": "a.jpg"}
+    assert spans["upload"]["dur"] == pytest.approx(250_000)
+    assert any(event["ph"] == "M" and event["name"] == "thread_name" for event in events)
@@ -0,0 +1,66 @@
+import io
+from PIL import Image
+from App.helpers.action_registry import ActionProfile
+from App.helpers.upscale_policy import UpscalePolicy
+
+
+def profile(policy):
+    return ActionProfile("Upscale Auto", {"endpoint": "upscale", "policy": policy} if policy is not None else {})
+
+
+def save(path, size):
+    Image.new("RGB", size, "gray").save(path)
+    return str(path)
+
+
+def test_smallest_scale_reaching_the_target():
+    policy = UpscalePolicy(target_long_edge=4000)
+    assert policy.choose_scale_for_size(2000, 1000) == 2
+    assert policy.choose_scale_for_size(1500, 1000) == 4
+    assert policy.choose_scale_for_size(500, 300) == 4  # capped at the largest step
+    assert policy.choose_scale_for_size(4000, 3000) is None
+
+
+def test_megapixel_target():
+    policy = UpscalePolicy(target_megapixels=4)
+    assert policy.choose_scale_for_size(1000, 1000) == 2
+    assert policy.choose_scale_for_size(2000, 2000) is None
+
+
+def test_scale_from_file_header_and_bytes(tmp_path):
+    policy = UpscalePolicy(target_long_edge=400)
+    assert policy.choose_scale(save(tmp_path / "small.png", (150, 100))) == 4
+    data = io.BytesIO()
+    Image.new("RGB", (250, 100)).save(data, "PNG")
+    assert policy.choose_scale_for_data(data.getvalue()) == 2
+    assert policy.choose_scale_for_data(b"not an image") == UpscalePolicy.SCALES[0]
+
+
+def test_fit_to_target_downscales_overshoot(tmp_path):
+    path = save(tmp_path / "result.png", (800, 400))
+    assert UpscalePolicy(target_long_edge=600).fit_to_target(path)
+    assert Image.open(path).size == (600, 300)
+    assert not UpscalePolicy(target_long_edge=600, downscale=False).fit_to_target(path)
+
+
+def test_write_skipped_copies_unchanged(tmp_path):
+    source = save(tmp_path / "large.png", (500, 500))
+    policy = UpscalePolicy(target_long_edge=400)
+    policy.write_skipped(source, str(tmp_path / "out.png"))
+    assert (tmp_path / "out.png").read_bytes() == open(source, "rb").read()
+    policy.write_skipped(open(source, "rb").read(), str(tmp_path / "from_url.png"))
+    assert (tmp_path / "from_url.png").read_bytes() == open(source, "rb").read()
+
+
+def test_write_skipped_fits_when_enabled(tmp_path):
+    source = save(tmp_path / "large.png", (500, 500))
+    UpscalePolicy(target_long_edge=400, fit_skipped=True).write_skipped(source, str(tmp_path / "out.png"))
+    assert Image.open(tmp_path / "out.png").size == (400, 400)
+    assert UpscalePolicy.from_profile(profile({"target_long_edge": 400})).fit_skipped is False
+
+
+def test_from_profile_needs_a_target():
+    assert UpscalePolicy.from_profile(None) is None
+    assert UpscalePolicy.from_profile(profile(None)) is None
+    assert UpscalePolicy.from_profile(profile({"target_long_edge": 0, "target_megapixels": 0})) is None
+    assert UpscalePolicy.from_profile(profile({"target_megapixels": 8})).target_megapixels == 8
@@ -0,0 +1,61 @@
+import re
+from App.helpers.url_source import (expand_url_lists, extract_urls, get_image_extension, get_url_filename,
+                                    get_url_host, is_url, is_url_list_file, read_url_list)
+
+
+def test_is_url():
+    assert is_url("https://example.com/a.jpg")
+    assert is_url("HTTP://example.com/a.jpg")
+    assert not is_url("C:/images/a.jpg")
+    assert not is_url("ftp://example.com/a.jpg")
+    assert not is_url(None)
+
+
+def test_extract_urls_keeps_order_and_drops_duplicates():
+    text = 'see (https://a.com/1.jpg), "https://b.com/2.png"; https://a.com/1.jpg\nhttp://c.com/3.webp]'
+    assert extract_urls(text) == ["https://a.com/1.jpg", "https://b.com/2.png", "http://c.com/3.webp"]
+    assert extract_urls(None) == []
+
+
+def test_read_url_list_from_text_and_csv(tmp_path):
+    text = tmp_path / "urls.txt"
+    text.write_text("https://a.com/1.jpg\n\nnot a url\nhttps://b.com/2.jpg\n", encoding="utf-8")
+    table = tmp_path / "urls.csv"
+    table.write_text("sku,image\n1,https://a.com/1.jpg\n2,https://c.com/3.jpg\n", encoding="utf-8-sig")
+    assert read_url_list(str(text)) == ["https://a.com/1.jpg", "https://b.com/2.jpg"]
+    assert read_url_list(str(table)) == ["https://a.com/1.jpg", "https://c.com/3.jpg"]
+    assert read_url_list(str(tmp_path / "missing.txt")) == []
+
+
+def test_expand_url_lists_replaces_list_files(tmp_path):
+    urls = tmp_path / "urls.txt"
+    urls.write_text("https://a.com/1.jpg", encoding="utf-8")
+    files = ["photo.jpg", str(urls), "https://b.com/2.jpg"]
+    assert is_url_list_file(str(urls)) and not is_url_list_file("photo.jpg")
+    assert expand_url_lists(files) == ["photo.jpg", "https://a.com/1.jpg", "https://b.com/2.jpg"]
+
+
+def test_url_filename_is_decoded_and_made_safe():
+    assert get_url_filename("https://cdn.com/img/red%20shoe.jpg?w=200") == "red shoe.jpg"
+    assert get_url_filename("https://cdn.com/a%3Ab%2A.png") == "a_b_.png"
+
+
+def test_extension_less_urls_get_unique_hashed_names():
+    first = get_url_filename("https://cdn.com/images/12345")
+    second = get_url_filename("https://cdn.com/images/12345?variant=2")
+    assert re.fullmatch(r"12345_[0-9a-f]{8}", first)
+    assert first != second
+    assert re.fullmatch(r"image_[0-9a-f]{8}", get_url_filename("https://cdn.com/"))
+
+
+def test_image_extension_from_bytes():
+    assert get_image_extension(b"\x89PNG\r\n\x1a\n...") == ".png"
+    assert get_image_extension(b"\xff\xd8\xff\xe0...") == ".jpg"
+    assert get_image_extension(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == ".webp"
+    assert get_image_extension(b"II*\x00") == ".tif"
+    assert get_image_extension(b"unknown") == ".png"
+    assert get_image_extension(b"unknown", default=".bin") == ".bin"
+
+
+def test_url_host():
+    assert get_url_host("https://cdn.example.com:8080/a.jpg") == "cdn.example.com:8080"